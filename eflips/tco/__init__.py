@@ -1,49 +1,93 @@
-from eflips.tco.data_queries import init_tco_parameters
+from eflips.tco.data_queries import init_tco_parameters, init_tco_parameters_many
 from eflips.tco.tco_calculator import TCOCalculator
+from eflips.tco.scenario_facts import ScenarioFacts
+from eflips.tco.cache import FactsCache
+from eflips.tco.tariffs import TariffPeriod, TariffSchedule
+from eflips.tco.batch import calculate_tco_many, TCOError
 
 from typing import Union, Optional, Any, Dict
 from eflips.model import Scenario
 from eflips.tco.util import create_session
 import logging
 
+_DUMMY_TCO_BY_TYPE = {
+    "INFRASTRUCTURE": 1.0,
+    "STAFF": 1.0,
+    "BATTERY": 1.0,
+    "MAINTENANCE": 1.0,
+    "VEHICLE": 1.0,
+    "OTHER": 1.0,
+    "ENERGY": 1.0,
+}
+"The dummy data returned by :func:`calculate_tco` if the calculation cannot be initialized."
 
-def calculate_tco(scenario: Union[Scenario, int, Any],
-                  database_url: Optional[str] = None) -> Dict[str, float]:
+
+def __getattr__(name: str) -> Any:
+    # The asyncio API is imported on first use, as it requires the optional asyncio dependencies of SQLAlchemy
+    if name in ("calculate_tco_async", "load_scenario_facts_async"):
+        from eflips.tco import async_api
+
+        return getattr(async_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def calculate_tco(
+    scenario: Union[Scenario, int, ScenarioFacts, Any],
+    database_url: Optional[str] = None,
+    cache: Optional[FactsCache] = None,
+) -> Dict[str, float]:
     """
     This function calculates the Total Cost of Ownership (TCO) for a given scenario and returns a dictionary
     with the TCO values categorized by type. If there is an error during the calculation, it returns a dictionary
     with dummy data.
 
-    :param scenario: Either a :class:`eflips.model.Scenario` object or an integer specifying the ID of a scenario in the
-        database.
+    :param scenario: Either a :class:`eflips.model.Scenario` object, an integer specifying the ID of a scenario in the
+        database, or a :class:`ScenarioFacts` object.
     :param database_url: Optional database URL to connect to if the scenario is provided as an integer.
+    :param cache: Optional :class:`eflips.tco.cache.FactsCache` to reuse the facts of an unchanged scenario.
     :return: A dictionary with TCO values categorized by type.
 
     """
-    logger = logging.getLogger(__name__)
+    if isinstance(scenario, ScenarioFacts):
+        return _calculate_tco_by_type(scenario)
+
     with create_session(scenario, database_url) as (session, scenario):
         if isinstance(scenario, int):
             scenario = session.query(Scenario).filter(Scenario.id == scenario).one()
         elif not isinstance(scenario, Scenario):
             raise ValueError("scenario must be either an integer or a Scenario object")
 
-        try:
-            tco_calculator = TCOCalculator(scenario, energy_consumption_mode="constant")
-        except Exception as e:
-            logger.warning("Error in initializing TCOCalculator: %s. Returning dummy data instead", e)
-
-            return {
-                "INFRASTRUCTURE": 1.0,
-                "STAFF": 1.0,
-                "BATTERY": 1.0,
-                "MAINTENANCE": 1.0,
-                "VEHICLE": 1.0,
-                "OTHER": 1.0,
-                "ENERGY": 1.0
-            }
-
-        tco_calculator.calculate()
-        result = tco_calculator.tco_by_type
-        result["INFRASTRUCTURE"] += result.get("CHARGING_POINT", 0.0)
-        result.pop("CHARGING_POINT", None)
-        return result
+        return _calculate_tco_by_type(scenario, cache)
+
+
+def _calculate_tco_by_type(
+    scenario: Union[Scenario, ScenarioFacts], cache: Optional[FactsCache] = None
+) -> Dict[str, float]:
+    logger = logging.getLogger(__name__)
+
+    try:
+        tco_calculator = TCOCalculator(
+            scenario, energy_consumption_mode="constant", cache=cache
+        )
+    except Exception as e:
+        logger.warning(
+            "Error in initializing TCOCalculator: %s. Returning dummy data instead", e
+        )
+
+        return dict(_DUMMY_TCO_BY_TYPE)
+
+    return _tco_by_type(tco_calculator)
+
+
+def _tco_by_type(tco_calculator: TCOCalculator) -> Dict[str, float]:
+    """
+    Calculate the TCO and merge the charging points into the infrastructure, as returned by :func:`calculate_tco`.
+
+    :param tco_calculator: A :class:`TCOCalculator` with the scenario loaded.
+    :return: A dictionary with TCO values categorized by type.
+    """
+    tco_calculator.calculate()
+    result = tco_calculator.tco_by_type
+    result["INFRASTRUCTURE"] += result.get("CHARGING_POINT", 0.0)
+    result.pop("CHARGING_POINT", None)
+    return result
@@ -0,0 +1,245 @@
+# This file contains the allocation of the TCO to rotations and lines.
+
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+from eflips.model import Scenario
+
+from eflips.tco.data_queries import (
+    QueryContext,
+    get_line_mileage_per_rotation,
+    get_rotation_statistics,
+)
+from eflips.tco.tco_calculator import TCOCalculator
+
+ALLOCATION_KEYS = ("mileage", "driving_hours", "energy_consumption", "rotations")
+"""
+The quantities of the rotations by which costs can be allocated. "rotations" splits the cost evenly between the
+rotations.
+"""
+
+DEFAULT_ALLOCATION_KEYS = {
+    "VEHICLE": "driving_hours",
+    "BATTERY": "energy_consumption",
+    "CHARGING_POINT": "energy_consumption",
+    "INFRASTRUCTURE": "energy_consumption",
+    "STAFF": "driving_hours",
+    "ENERGY": "energy_consumption",
+    "MAINTENANCE": "mileage",
+    "OTHER": "driving_hours",
+}
+"The allocation key of each item type used by :func:`allocate_to_rotations` if no other key is given."
+
+
+@dataclass
+class AllocatedTCO:
+    """
+    The TCO allocated to rotations or lines by :func:`allocate_to_rotations` or :func:`allocate_to_lines`. Each array
+    has one entry per rotation or line.
+    """
+
+    ids: np.ndarray
+    "The ids of the rotations or lines."
+
+    annual_mileage: np.ndarray
+    "The annual mileage in km."
+
+    cost: np.ndarray
+    "The present value of the allocated costs over the project duration."
+
+    tco_unit_distance: np.ndarray
+    "The specific TCO per km. NaN without any mileage."
+
+    tco_by_type: Dict[str, np.ndarray]
+    "The specific TCO per km by cost type."
+
+    def to_pandas(self, index_name: str = "Id"):
+        """
+        Export the result as a :class:`pandas.DataFrame` with one row per rotation or line.
+
+        :param index_name: The name of the index.
+        :return: A :class:`pandas.DataFrame` indexed by the ids.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "Annual Mileage": self.annual_mileage,
+                "Cost": self.cost,
+                "Specific Cost": self.tco_unit_distance,
+                **self.tco_by_type,
+            },
+            index=pd.Index(self.ids, name=index_name),
+        )
+
+
+def _allocated_costs(
+    tco_calculator: TCOCalculator,
+    rotations: Dict[str, np.ndarray],
+    keys: Optional[Mapping[str, str]],
+) -> np.ndarray:
+    """
+    Allocate the cost of each item to the rotations.
+
+    :param tco_calculator: A :class:`TCOCalculator` on which :meth:`TCOCalculator.calculate` was called.
+    :param rotations: The quantities of the rotations, see :func:`eflips.tco.data_queries.get_rotation_statistics`.
+    :param keys: The allocation keys by item type or item name, see :func:`allocate_to_rotations`.
+    :return: The allocated costs, with one row per item and one column per rotation.
+    """
+    keys = {**DEFAULT_ALLOCATION_KEYS, **(keys or {})}
+    for key in keys.values():
+        if key not in ALLOCATION_KEYS:
+            raise ValueError(
+                f"Unknown allocation key {key}. It must be one of {', '.join(ALLOCATION_KEYS)}."
+            )
+
+    weights_by_key = np.stack(
+        [
+            rotations["mileage"],
+            rotations["driving_hours"],
+            rotations["energy_consumption"],
+            np.ones(len(rotations["rotation_id"])),
+        ]
+    )
+
+    items = list(tco_calculator.capex_items) + list(tco_calculator.opex_items)
+    key_index = np.array(
+        [
+            ALLOCATION_KEYS.index(
+                keys.get(item.name, keys.get(item.type.name, "mileage"))
+            )
+            for item in items
+        ],
+        dtype=np.intp,
+    )
+    # Vehicles and batteries are only allocated to the rotations of their vehicle type
+    item_vehicle_types = np.array(
+        [getattr(item, "vehicle_type_id", None) or -1 for item in items], dtype=np.int64
+    )[:, np.newaxis]
+    mask = (item_vehicle_types == -1) | (
+        item_vehicle_types == rotations["vehicle_type_id"][np.newaxis, :]
+    )
+
+    weights = weights_by_key[key_index] * mask
+    totals = weights.sum(axis=1, keepdims=True)
+    # Fall back to the mileage of all rotations, e.g. if the vehicle type of an item has no rotations
+    fallback = rotations["mileage"][np.newaxis, :] / max(
+        rotations["mileage"].sum(), np.finfo(float).tiny
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(totals > 0, weights / totals, fallback)
+
+    return shares * tco_calculator.result.cost[:, np.newaxis]
+
+
+def _allocated_tco(
+    tco_calculator: TCOCalculator,
+    ids: np.ndarray,
+    annual_mileage: np.ndarray,
+    allocated_costs: np.ndarray,
+) -> AllocatedTCO:
+    result = tco_calculator.result
+    cost_by_type = np.zeros((len(result.type_names), allocated_costs.shape[1]))
+    np.add.at(cost_by_type, result.type_codes, allocated_costs)
+
+    total_distance = annual_mileage * tco_calculator.project_duration
+    cost = allocated_costs.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return AllocatedTCO(
+            ids=ids,
+            annual_mileage=annual_mileage,
+            cost=cost,
+            tco_unit_distance=cost / total_distance,
+            tco_by_type={
+                type_name: cost_by_type[code] / total_distance
+                for code, type_name in enumerate(result.type_names)
+            },
+        )
+
+
+def allocate_to_rotations(
+    tco_calculator: TCOCalculator, session, keys: Optional[Mapping[str, str]] = None
+) -> AllocatedTCO:
+    """
+    Allocate the TCO of a scenario to its rotations.
+
+    The cost of each item is split between the rotations in proportion to an allocation key, which is one of
+    :data:`ALLOCATION_KEYS`. The keys are given by item type (e.g. ``"STAFF"``) or by item name (e.g. ``"Depot"``),
+    the item name takes precedence. Item types without a key use :data:`DEFAULT_ALLOCATION_KEYS`. Vehicles and
+    batteries are only allocated to the rotations of their vehicle type. The quantities of the rotations are aggregated
+    in the database, see :func:`eflips.tco.data_queries.get_rotation_statistics`.
+
+    :param tco_calculator: A :class:`TCOCalculator` of the scenario. :meth:`TCOCalculator.calculate` is called first if
+        it has not been called yet.
+    :param session: A session object connected to the database of the scenario.
+    :param keys: Optional allocation keys by item type or item name, e.g. ``{"INFRASTRUCTURE": "rotations"}``.
+    :return: An :class:`AllocatedTCO` with one entry per rotation, ordered by the rotation id.
+    """
+    if tco_calculator.result is None:
+        tco_calculator.calculate()
+    scenario = (
+        session.query(Scenario)
+        .filter(Scenario.id == tco_calculator.facts.scenario_id)
+        .one()
+    )
+
+    rotations = get_rotation_statistics(session, scenario)
+    return _allocated_tco(
+        tco_calculator,
+        rotations["rotation_id"],
+        rotations["mileage"],
+        _allocated_costs(tco_calculator, rotations, keys),
+    )
+
+
+def allocate_to_lines(
+    tco_calculator: TCOCalculator, session, keys: Optional[Mapping[str, str]] = None
+) -> AllocatedTCO:
+    """
+    Allocate the TCO of a scenario to its lines.
+
+    The TCO is allocated to the rotations first, see :func:`allocate_to_rotations`. The cost of each rotation is then
+    split between the lines it serves in proportion to its mileage on each line. Costs of rotations without trips are
+    not allocated to any line.
+
+    :param tco_calculator: A :class:`TCOCalculator` of the scenario.
+    :param session: A session object connected to the database of the scenario.
+    :param keys: Optional allocation keys by item type or item name, see :func:`allocate_to_rotations`.
+    :return: An :class:`AllocatedTCO` with one entry per line, ordered by the line id. Routes without a line are
+        combined with the id -1.
+    """
+    if tco_calculator.result is None:
+        tco_calculator.calculate()
+    scenario = (
+        session.query(Scenario)
+        .filter(Scenario.id == tco_calculator.facts.scenario_id)
+        .one()
+    )
+
+    context = QueryContext(session, scenario)
+    rotations = get_rotation_statistics(session, scenario, context=context)
+    line_mileage = get_line_mileage_per_rotation(session, scenario, context=context)
+    allocated_costs = _allocated_costs(tco_calculator, rotations, keys)
+
+    # The share of the mileage of each rotation driven on each line
+    rotation_index = np.searchsorted(
+        rotations["rotation_id"], line_mileage["rotation_id"]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        line_shares = np.nan_to_num(
+            line_mileage["mileage"] / rotations["mileage"][rotation_index]
+        )
+
+    line_ids, line_index = np.unique(line_mileage["line_id"], return_inverse=True)
+    costs = np.zeros((allocated_costs.shape[0], len(line_ids)))
+    np.add.at(costs.T, line_index, (allocated_costs[:, rotation_index] * line_shares).T)
+
+    return _allocated_tco(
+        tco_calculator,
+        line_ids,
+        np.bincount(
+            line_index, weights=line_mileage["mileage"], minlength=len(line_ids)
+        ),
+        costs,
+    )
@@ -1,109 +1,105 @@
-# This file contains the sensitivity analysis and is only required for the Bachelor thesis.
+# This file contains the sensitivity analysis of the TCO and plots to compare the results of scenarios.
+
+from typing import Optional, Sequence
 
-import parameters as p
-import eflips.tco.tco_utils as f
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import colormaps as cm
 import json
 import warnings as w
 
+from eflips.tco.tco_calculator import TCOCalculator
 
-# Conduct a sensitivity analysis
-def sensitivity_analysis(
-    capex_input, opex_input, general_input, parameter_list, scenario_id, save_fig=False
-):
-    Fig = plt.figure(1, (8, 6))
-    ax = Fig.add_subplot(111)
-
-    resolution = 101
 
+def sensitivity_analysis(
+    tco_calculator: TCOCalculator,
+    parameter_list: Optional[Sequence[str]] = None,
+    variation: Sequence[float] = np.linspace(-40, 40, num=81),
+) -> np.ndarray:
+    """
+    Conduct a one-at-a-time sensitivity analysis of the specific TCO.
+
+    Each parameter is changed by the given percentages while all other parameters keep their values. All variants of
+    all parameters are evaluated in a single call of :meth:`TCOCalculator.calculate_many`, so no database access is
+    needed.
+
+    Integer parameters such as the useful life and the project duration are varied continuously, as the present value
+    interpolates between whole years. Parameters with a value of zero (e.g. a cost escalation of 0 %) do not change
+    and show no sensitivity.
+
+    :param tco_calculator: A :class:`TCOCalculator` with the scenario loaded.
+    :param parameter_list: The parameters to vary, as accepted by :meth:`TCOCalculator.calculate_many`. Defaults to
+        all parameters of the calculator, i.e. all numeric scenario tco parameters and all CAPEX item parameters.
+    :param variation: The changes of each parameter in percent.
+    :return: A structured array with one row per parameter and variation and the fields ``parameter``,
+        ``parameter_change`` (in %), ``tco_unit_distance`` (in EUR/km) and ``tco_change`` (in %).
+    """
+    base_values = tco_calculator.parameter_values()
+    if parameter_list is None:
+        parameter_list = list(base_values.keys())
     for parameter in parameter_list:
-        input_parameter = 0
-        j = 0
-        tco_array = np.zeros(resolution)
-        x_array = np.linspace(-40, 40, num=resolution)
-
-        if parameter == "useful_life" or parameter == "procurement":
-            input_parameter = []
-            keys = []
-            for key, data in capex_input.items():
-                if parameter == "useful_life":
-                    input_parameter.append(data["useful_life"])
-                else:
-                    input_parameter.append(data["procurement_cost"])
-                keys.append(key)
-
-            input_array = np.array(input_parameter)
-            analysis_array = np.linspace(
-                input_array * 0.6, input_array * 1.4, num=resolution
+        if parameter not in base_values:
+            raise ValueError(
+                f"The parameter {parameter} cannot be varied. Please check the spelling."
             )
 
-            for i in range(len(analysis_array)):
-                for x in range(len(keys)):
-                    if parameter == "procurement":
-                        capex_input[keys[x]]["procurement_cost"] = analysis_array[i, x]
-                    else:
-                        # only interger values are permitted for the useful life
-                        capex_input[keys[x]]["useful_life"] = int(analysis_array[i, x])
-
-                tco_array[i] = f.tco_calculation(
-                    capex_input, opex_input, general_input
-                ).get("Specific_TCO_over_PD")
-
-            # As the useful life can only be an integer, linear regression is used to obtain a linear graph.
-            c = np.polyfit(x_array, tco_array, 1)
-            tco_array = np.polyval(c, x_array)
-        # For the other parameters the usual approach can be used.
-        else:
-            try:
-                try:
-                    input_parameter = opex_input[parameter].get("cost")
-                    j = 2
-                except KeyError:
-                    pass
-                try:
-                    input_parameter = general_input[parameter]
-                    j = 3
-                except KeyError:
-                    pass
-                if input_parameter == 0:
-                    raise KeyError(
-                        "The parameter {} was not found in the input dictionary. Please check that your spelling "
-                        "matches the spelling in the input dictionaries".format(
-                            input_parameter
-                        )
-                    )
-            except KeyError as e:
-                print(e)
-
-            analysis_array = np.linspace(
-                input_parameter * 0.6, input_parameter * 1.4, num=resolution
-            )
+    variation = np.asarray(variation, dtype=float)
+    number_of_parameters = len(parameter_list)
+    number_of_variations = len(variation)
+
+    # One block of rows per parameter. The other parameters are NaN in this block, i.e. keep their values. The last
+    # row keeps all values and yields the base TCO.
+    parameter_table = {}
+    for i, parameter in enumerate(parameter_list):
+        column = np.full(number_of_parameters * number_of_variations + 1, np.nan)
+        column[i * number_of_variations : (i + 1) * number_of_variations] = base_values[
+            parameter
+        ] * (1 + variation / 100)
+        parameter_table[parameter] = column
+
+    tco = tco_calculator.calculate_many(parameter_table).tco_unit_distance
+    tco, base_tco = tco[:-1], tco[-1]
+
+    result = np.zeros(
+        number_of_parameters * number_of_variations,
+        dtype=[
+            ("parameter", f"U{max(len(parameter) for parameter in parameter_list)}"),
+            ("parameter_change", float),
+            ("tco_unit_distance", float),
+            ("tco_change", float),
+        ],
+    )
+    result["parameter"] = np.repeat(parameter_list, number_of_variations)
+    result["parameter_change"] = np.tile(variation, number_of_parameters)
+    result["tco_unit_distance"] = tco
+    result["tco_change"] = (tco / base_tco - 1) * 100
+    return result
+
+
+def plot_sensitivity_analysis(result: np.ndarray, scenario_id=None, save_fig=False):
+    """
+    Plot the result of :func:`sensitivity_analysis` as one line per parameter.
+
+    :param result: The structured array returned by :func:`sensitivity_analysis`.
+    :param scenario_id: The id of the scenario, used in the title and the file name.
+    :param save_fig: Whether to save the figure as a png file.
+    :return: Nothing.
+    """
+    Fig = plt.figure(1, (8, 6))
+    ax = Fig.add_subplot(111)
 
-            for i in range(len(analysis_array)):
-                if j == 2:
-                    opex_input[parameter]["cost"] = analysis_array[i]
-                if j == 3:
-                    general_input[parameter] = analysis_array[i]
-                tco_array[i] = f.tco_calculation(
-                    capex_input, opex_input, general_input
-                ).get("Specific_TCO_over_PD")
-        # get the percent change
-        base_tco = tco_array[np.where(x_array == 0)]
-        tco_array /= base_tco * 0.01
-        tco_array -= 100
-        ax.plot(x_array, tco_array, label=parameter)
-        plt.xlim(-40, 40)
-        plt.ylim(-20, 20)
+    for parameter in dict.fromkeys(result["parameter"]):
+        rows = result[result["parameter"] == parameter]
+        ax.plot(rows["parameter_change"], rows["tco_change"], label=parameter)
 
+    plt.xlim(result["parameter_change"].min(), result["parameter_change"].max())
+    plt.ylim(-20, 20)
     plt.ylabel("Change of specific TCO in %")
     plt.xlabel("Change of parameter in %")
     plt.legend(bbox_to_anchor=(0.5, -0.11), loc="upper center", ncol=2)
     plt.title(
         "Sensitivity Analysis of the specific TCO in Scenario {}".format(scenario_id)
     )
-    plt.axis("equal")
     plt.grid()
     plt.tight_layout()
     plt.show()
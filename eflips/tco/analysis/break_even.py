@@ -0,0 +1,194 @@
+# This file contains the break-even and goal-seek analysis of the TCO.
+
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+import numpy as np
+
+from eflips.tco.tco_calculator import TCOCalculator
+
+
+@dataclass
+class GoalSeekResult:
+    """The result of :func:`goal_seek` and :func:`break_even`."""
+
+    parameter: str
+    "The name of the varied parameter."
+
+    value: float
+    "The value of the parameter at which the goal is reached."
+
+    tco_unit_distance: float
+    "The specific TCO per km of the (first) calculator at this value."
+
+    iterations: int
+    "The number of calls of :meth:`TCOCalculator.calculate_many`."
+
+
+def find_root(
+    function: Callable[[np.ndarray], np.ndarray],
+    bounds: Tuple[float, float],
+    tolerance: float = 1e-9,
+    grid_size: int = 64,
+    max_iterations: int = 50,
+) -> Tuple[float, int]:
+    """
+    Find the smallest root of a function within the bounds by repeatedly evaluating it on a grid.
+
+    The function is evaluated on ``grid_size`` points at once. The first interval in which the sign changes is taken as
+    the new bounds, which shrinks them by a factor of ``grid_size - 1`` per iteration. Finally, the root is interpolated
+    linearly within the remaining interval.
+
+    :param function: A vectorized function, mapping an array of parameter values to an array of function values.
+    :param bounds: The lower and upper bound of the parameter.
+    :param tolerance: The maximum width of the final interval, relative to the magnitude of the root (at least one).
+    :param grid_size: The number of points evaluated at once.
+    :param max_iterations: The maximum number of iterations.
+    :return: The root and the number of iterations.
+    """
+    lower, upper = float(bounds[0]), float(bounds[1])
+    if not lower < upper:
+        raise ValueError(
+            f"The lower bound {lower} must be smaller than the upper bound {upper}."
+        )
+    if grid_size < 2:
+        raise ValueError("The grid must have at least two points.")
+
+    for iteration in range(1, max_iterations + 1):
+        grid = np.linspace(lower, upper, grid_size)
+        values = function(grid)
+
+        exact = np.flatnonzero(values == 0.0)
+        sign_changes = np.flatnonzero(np.signbit(values[:-1]) != np.signbit(values[1:]))
+        if len(exact) > 0 and (len(sign_changes) == 0 or exact[0] <= sign_changes[0]):
+            return float(grid[exact[0]]), iteration
+        if len(sign_changes) == 0:
+            raise ValueError(
+                f"The goal is not reached between {lower} and {upper}: the difference is {values[0]} at the lower and "
+                f"{values[-1]} at the upper bound. Please widen the bounds."
+            )
+
+        index = sign_changes[0]
+        lower, upper = grid[index], grid[index + 1]
+        if upper - lower <= tolerance * max(1.0, abs(lower)):
+            # Interpolate linearly between the last two points
+            value_lower, value_upper = values[index], values[index + 1]
+            return (
+                float(
+                    lower - value_lower * (upper - lower) / (value_upper - value_lower)
+                ),
+                iteration,
+            )
+
+    raise ValueError(f"The root was not found within {max_iterations} iterations.")
+
+
+def goal_seek(
+    tco_calculator: TCOCalculator,
+    parameter: str,
+    target: float,
+    bounds: Tuple[float, float],
+    tolerance: float = 1e-9,
+    grid_size: int = 64,
+) -> GoalSeekResult:
+    """
+    Find the value of a parameter at which the specific TCO reaches a target, e.g. the maximum battery price per kWh
+    for a TCO of 5 EUR/km::
+
+        goal_seek(tco_calculator, "Battery type 1.procurement_cost", 5.0, (0.0, 1000.0))
+
+    The TCO is evaluated with :meth:`TCOCalculator.calculate_many` on the scenario data already loaded in the
+    calculator, see :func:`find_root`. If the target is reached several times within the bounds, the smallest value is
+    returned. Integer parameters such as the useful life are treated as continuous, round the result as needed.
+
+    :param tco_calculator: A :class:`TCOCalculator` with the scenario loaded.
+    :param parameter: The name of the parameter, as accepted by :meth:`TCOCalculator.calculate_many`.
+    :param target: The target of the specific TCO per km.
+    :param bounds: The lower and upper bound of the parameter.
+    :param tolerance: The relative tolerance of the parameter value.
+    :param grid_size: The number of values evaluated at once.
+    :return: A :class:`GoalSeekResult`.
+    """
+    if parameter not in tco_calculator.parameter_values():
+        raise ValueError(
+            f"The parameter {parameter} cannot be varied. Please check the spelling."
+        )
+
+    def difference(values: np.ndarray) -> np.ndarray:
+        return (
+            tco_calculator.calculate_many({parameter: values}).tco_unit_distance
+            - target
+        )
+
+    value, iterations = find_root(difference, bounds, tolerance, grid_size)
+    return GoalSeekResult(
+        parameter=parameter,
+        value=value,
+        tco_unit_distance=float(
+            tco_calculator.calculate_many({parameter: [value]}).tco_unit_distance[0]
+        ),
+        iterations=iterations,
+    )
+
+
+def break_even(
+    tco_calculator: TCOCalculator,
+    other: TCOCalculator,
+    parameter: str,
+    bounds: Tuple[float, float],
+    vary_other: bool = False,
+    tolerance: float = 1e-9,
+    grid_size: int = 64,
+) -> GoalSeekResult:
+    """
+    Find the value of a parameter at which two configurations have the same specific TCO, e.g. the electricity price
+    at which an electric fleet reaches parity with a diesel fleet::
+
+        break_even(electric_calculator, diesel_calculator, "fuel_cost", (0.0, 1.0))
+
+    By default, the parameter is only varied in ``tco_calculator`` and the TCO of ``other`` is constant. See
+    :func:`goal_seek`.
+
+    :param tco_calculator: A :class:`TCOCalculator` with the scenario loaded.
+    :param other: A :class:`TCOCalculator` of the configuration to compare with.
+    :param parameter: The name of the parameter, as accepted by :meth:`TCOCalculator.calculate_many`.
+    :param bounds: The lower and upper bound of the parameter.
+    :param vary_other: Whether to vary the parameter in ``other`` as well, e.g. for the project duration.
+    :param tolerance: The relative tolerance of the parameter value.
+    :param grid_size: The number of values evaluated at once.
+    :return: A :class:`GoalSeekResult` with the TCO of ``tco_calculator`` at the break-even value.
+    """
+    if parameter not in tco_calculator.parameter_values():
+        raise ValueError(
+            f"The parameter {parameter} cannot be varied. Please check the spelling."
+        )
+    if vary_other:
+        if parameter not in other.parameter_values():
+            raise ValueError(
+                f"The parameter {parameter} cannot be varied in the other configuration."
+            )
+
+        def other_tco(values: np.ndarray) -> np.ndarray:
+            return other.calculate_many({parameter: values}).tco_unit_distance
+
+    else:
+        if other.result is None:
+            other.calculate()
+
+        def other_tco(values: np.ndarray) -> np.ndarray:
+            return np.full(len(values), other.tco_unit_distance)
+
+    def difference(values: np.ndarray) -> np.ndarray:
+        return tco_calculator.calculate_many(
+            {parameter: values}
+        ).tco_unit_distance - other_tco(values)
+
+    value, iterations = find_root(difference, bounds, tolerance, grid_size)
+    return GoalSeekResult(
+        parameter=parameter,
+        value=value,
+        tco_unit_distance=float(
+            tco_calculator.calculate_many({parameter: [value]}).tco_unit_distance[0]
+        ),
+        iterations=iterations,
+    )
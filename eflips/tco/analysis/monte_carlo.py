@@ -0,0 +1,164 @@
+# This file contains the Monte Carlo uncertainty analysis of the TCO.
+
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from eflips.tco.tco_calculator import TCOCalculator
+
+
+@dataclass
+class Normal:
+    """A normal distribution."""
+
+    mean: float
+    std: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.normal(self.mean, self.std, size)
+
+
+@dataclass
+class Uniform:
+    """A uniform distribution between low and high."""
+
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+@dataclass
+class Triangular:
+    """A triangular distribution between left and right with its peak at mode."""
+
+    left: float
+    mode: float
+    right: float
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.triangular(self.left, self.mode, self.right, size)
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    The samples and results of :func:`monte_carlo`. All arrays have one entry per sample.
+    """
+
+    samples: Dict[str, np.ndarray]
+    "The sampled values of each parameter."
+
+    tco_unit_distance: np.ndarray
+    "The specific TCO per km."
+
+    tco_by_type: Dict[str, np.ndarray] = field(default_factory=dict)
+    "The specific TCO per km by cost type."
+
+    def percentiles(self, q: Sequence[float] = (10, 50, 90)) -> Dict[str, np.ndarray]:
+        """
+        Get percentiles of the specific TCO and of each cost type.
+
+        :param q: The percentiles to compute, between 0 and 100. Defaults to P10, P50 and P90.
+        :return: A dictionary with the key ``tco_unit_distance`` and one key per cost type. Each value is an array with
+            one entry per percentile.
+        """
+        result = {"tco_unit_distance": np.percentile(self.tco_unit_distance, q)}
+        for item_type, values in self.tco_by_type.items():
+            result[item_type] = np.percentile(values, q)
+        return result
+
+
+def parameter_rng(seed: Optional[int], parameter: str) -> np.random.Generator:
+    """
+    Create the random number generator of one parameter.
+
+    Each parameter draws from its own stream, which is derived from the seed and the name of the parameter. The samples
+    of a parameter therefore do not change if distributions are added to or removed from the study.
+
+    :param seed: The seed of the study. If None, fresh entropy is used.
+    :param parameter: The name of the parameter.
+    :return: A :class:`numpy.random.Generator`.
+    """
+    seed_sequence = np.random.SeedSequence(
+        seed, spawn_key=(zlib.crc32(parameter.encode()),)
+    )
+    return np.random.default_rng(seed_sequence)
+
+
+def monte_carlo(
+    tco_calculator: TCOCalculator,
+    distributions: Dict[str, object],
+    number_of_samples: int = 100_000,
+    seed: Optional[int] = None,
+    chunk_size: int = 50_000,
+) -> MonteCarloResult:
+    """
+    Propagate the uncertainty of the parameters to the TCO by Monte Carlo sampling.
+
+    The samples are evaluated with :meth:`TCOCalculator.calculate_many` on the scenario data already loaded in the
+    calculator, in chunks of ``chunk_size`` samples to limit the memory usage. Parameters without a distribution keep
+    their values.
+
+    Example, with the battery price per kWh and the escalation of the fuel price uncertain::
+
+        result = monte_carlo(
+            tco_calculator,
+            {
+                "Battery type 1.procurement_cost": Triangular(150, 190, 260),
+                "pef_fuel": Normal(0.038, 0.01),
+            },
+            seed=42,
+        )
+        result.percentiles((10, 50, 90))
+
+    :param tco_calculator: A :class:`TCOCalculator` with the scenario loaded.
+    :param distributions: A dictionary from parameter names, as accepted by :meth:`TCOCalculator.calculate_many`, to
+        distributions (:class:`Normal`, :class:`Uniform`, :class:`Triangular` or any object with a
+        ``sample(rng, size)`` method).
+    :param number_of_samples: The number of samples.
+    :param seed: The seed of the random number generators. The same seed yields the same samples.
+    :param chunk_size: The number of samples evaluated at once.
+    :return: A :class:`MonteCarloResult`.
+    """
+    if len(distributions) == 0:
+        raise ValueError("At least one parameter must have a distribution.")
+    base_values = tco_calculator.parameter_values()
+    for parameter in distributions:
+        if parameter not in base_values:
+            raise ValueError(
+                f"The parameter {parameter} cannot be varied. Please check the spelling."
+            )
+
+    rngs = {parameter: parameter_rng(seed, parameter) for parameter in distributions}
+
+    samples: Dict[str, list] = {parameter: [] for parameter in distributions}
+    tco_unit_distance = []
+    tco_by_type: Dict[str, list] = {}
+    for start in range(0, number_of_samples, chunk_size):
+        size = min(chunk_size, number_of_samples - start)
+        parameter_table = {
+            parameter: distribution.sample(rngs[parameter], size)
+            for parameter, distribution in distributions.items()
+        }
+        result = tco_calculator.calculate_many(parameter_table)
+
+        for parameter, values in parameter_table.items():
+            samples[parameter].append(values)
+        tco_unit_distance.append(result.tco_unit_distance)
+        for item_type, values in result.tco_by_type.items():
+            tco_by_type.setdefault(item_type, []).append(values)
+
+    return MonteCarloResult(
+        samples={
+            parameter: np.concatenate(values) for parameter, values in samples.items()
+        },
+        tco_unit_distance=np.concatenate(tco_unit_distance),
+        tco_by_type={
+            item_type: np.concatenate(values)
+            for item_type, values in tco_by_type.items()
+        },
+    )
@@ -0,0 +1,196 @@
+# This file contains the asyncio API of the TCO calculation, built on the asyncio extension of SQLAlchemy. It needs the
+# optional dependencies of the "async" extra and is only imported when it is used.
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple, TypeVar, Union
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from eflips.model import Scenario
+
+from eflips.tco.data_queries import (
+    QueryContext,
+    _query_simulation_period,
+    get_charging_energy_profile,
+    get_vehicle_type_statistics,
+    load_capex_items_battery,
+    load_capex_items_infrastructure,
+    load_capex_items_vehicle,
+)
+from eflips.tco.scenario_facts import ScenarioFacts
+from eflips.tco.util import engine_options
+
+T = TypeVar("T")
+
+_async_engines: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], AsyncEngine] = {}
+"The engines created by :func:`get_async_engine`, by database URL and options."
+
+_async_engines_lock = threading.Lock()
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+"The async drivers used for database URLs with a synchronous driver."
+
+
+def get_async_engine(database_url: str, **options) -> AsyncEngine:
+    """
+    Get the async engine of a database URL, see :func:`eflips.tco.util.get_engine`.
+
+    URLs with the default synchronous driver are converted to the asyncpg driver for PostgreSQL and to the aiosqlite
+    driver for SQLite, so the same ``DATABASE_URL`` can be used for both APIs. The driver must be installed.
+
+    :param database_url: The database URL.
+    :param options: The pool options, see :func:`eflips.tco.util.engine_options`.
+    :return: A :class:`sqlalchemy.ext.asyncio.AsyncEngine`.
+    """
+    options = engine_options(database_url, **options)
+    key = (database_url, tuple(sorted(options.items())))
+    with _async_engines_lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            url = make_url(database_url)
+            if url.drivername in _ASYNC_DRIVERS:
+                url = url.set(drivername=_ASYNC_DRIVERS[url.drivername])
+            engine = create_async_engine(url, **options)
+            _async_engines[key] = engine
+        return engine
+
+
+def _reset_async_engines_after_fork() -> None:
+    global _async_engines_lock
+    _async_engines_lock = threading.Lock()
+    for engine in _async_engines.values():
+        engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_async_engines_after_fork)
+
+
+async def _run_sync(
+    engine: AsyncEngine, scenario_id: int, function: Callable[[Any, Scenario], T]
+) -> T:
+    # Each query runs in its own session, as a session can only run one query at a time
+    async with AsyncSession(engine) as session:
+
+        def run(sync_session):
+            scenario = (
+                sync_session.query(Scenario).filter(Scenario.id == scenario_id).one()
+            )
+            return function(sync_session, scenario)
+
+        return await session.run_sync(run)
+
+
+async def load_scenario_facts_async(
+    scenario_id: int,
+    engine: Union[AsyncEngine, str, None] = None,
+    energy_consumption_mode: str = "simulated",
+) -> ScenarioFacts:
+    """
+    Extract the facts of a scenario with an async engine, see :meth:`ScenarioFacts.from_session`.
+
+    The loaders of :mod:`eflips.tco.data_queries` run concurrently, each on its own connection. The simulation period,
+    which most of them need, is queried once beforehand.
+
+    :param scenario_id: The id of the scenario.
+    :param engine: An :class:`sqlalchemy.ext.asyncio.AsyncEngine` or a database URL. Defaults to the environment
+        variable ``DATABASE_URL``.
+    :param energy_consumption_mode: Either "simulated" or "constant", see :meth:`ScenarioFacts.from_session`.
+    :return: A :class:`ScenarioFacts` object.
+    """
+    if energy_consumption_mode not in ("simulated", "constant"):
+        raise ValueError(f"Unknown energy consumption mode: {energy_consumption_mode}")
+
+    if engine is None:
+        if "DATABASE_URL" in os.environ:
+            engine = os.environ.get("DATABASE_URL")
+        else:
+            raise ValueError("No database URL specified.")
+    if isinstance(engine, str):
+        engine = get_async_engine(engine)
+
+    simulation_period = await _run_sync(engine, scenario_id, _query_simulation_period)
+
+    def with_context(loader):
+        def run(session, scenario):
+            return loader(
+                session,
+                scenario,
+                context=QueryContext(session, scenario, simulation_period),
+            )
+
+        return run
+
+    loaders = [
+        lambda session, scenario: dict(scenario.tco_parameters),
+        load_capex_items_vehicle,
+        load_capex_items_battery,
+        load_capex_items_infrastructure,
+        with_context(get_vehicle_type_statistics),
+    ]
+    tco_parameters, vehicles, batteries, infrastructure, vehicle_type_statistics = (
+        await asyncio.gather(
+            *(_run_sync(engine, scenario_id, loader) for loader in loaders)
+        )
+    )
+
+    # The charging energy profile depends on the tco parameters, see ScenarioFacts.from_session
+    charging_energy_profile = None
+    if "electricity_tariff" in tco_parameters:
+        charging_energy_profile = await _run_sync(
+            engine, scenario_id, with_context(get_charging_energy_profile)
+        )
+
+    return ScenarioFacts.from_vehicle_type_statistics(
+        scenario_id=scenario_id,
+        tco_parameters=tco_parameters,
+        capex_items=list(vehicles) + list(batteries) + list(infrastructure),
+        vehicle_type_statistics=vehicle_type_statistics,
+        energy_consumption_mode=energy_consumption_mode,
+        charging_energy_profile=charging_energy_profile,
+    )
+
+
+async def calculate_tco_async(
+    scenario_id: int,
+    engine: Union[AsyncEngine, str, None] = None,
+) -> Dict[str, float]:
+    """
+    The asyncio version of :func:`eflips.tco.calculate_tco`.
+
+    The scenario facts are extracted with :func:`load_scenario_facts_async`, the cost calculation itself does not access
+    the database.
+
+    :param scenario_id: The id of the scenario.
+    :param engine: An :class:`sqlalchemy.ext.asyncio.AsyncEngine` or a database URL. Defaults to the environment
+        variable ``DATABASE_URL``.
+    :return: A dictionary with TCO values categorized by type.
+    """
+    # Imported here, as this module is imported by eflips.tco itself
+    from eflips.tco import _DUMMY_TCO_BY_TYPE, calculate_tco
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        facts = await load_scenario_facts_async(
+            scenario_id, engine, energy_consumption_mode="constant"
+        )
+    except NoResultFound:
+        # The scenario does not exist
+        raise
+    except Exception as e:
+        logger.warning(
+            "Error in initializing TCOCalculator: %s. Returning dummy data instead", e
+        )
+        return dict(_DUMMY_TCO_BY_TYPE)
+
+    return calculate_tco(facts)
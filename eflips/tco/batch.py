@@ -0,0 +1,126 @@
+# This file contains the calculation of the TCO of many scenarios in parallel processes.
+
+import logging
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from eflips.model import Scenario
+
+from eflips.tco.tco_calculator import TCOCalculator
+from eflips.tco.util import get_engine
+
+_worker_engine = None
+"The engine of a worker process, created by :func:`_init_worker`."
+
+
+@dataclass
+class TCOError:
+    """An error that occurred while calculating the TCO of a scenario in :func:`calculate_tco_many`."""
+
+    scenario_id: int
+    "The id of the scenario."
+
+    error_type: str
+    "The name of the exception class."
+
+    message: str
+    "The exception message."
+
+    traceback: str
+    "The formatted traceback of the exception in the worker process."
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_engine
+    _worker_engine = get_engine(database_url)
+
+
+def _calculate_tco_worker(scenario_id: int) -> Union[Dict[str, float], TCOError]:
+    # Imported here, as this module is imported by eflips.tco itself
+    from eflips.tco import _tco_by_type
+
+    # Unlike calculate_tco, a failing extraction is reported instead of returning dummy data
+    try:
+        with Session(_worker_engine) as session:
+            scenario = session.query(Scenario).filter(Scenario.id == scenario_id).one()
+            tco_calculator = TCOCalculator(scenario, energy_consumption_mode="constant")
+            return _tco_by_type(tco_calculator)
+    except Exception as e:
+        return TCOError(
+            scenario_id=scenario_id,
+            error_type=type(e).__name__,
+            message=str(e),
+            traceback=traceback.format_exc(),
+        )
+
+
+def calculate_tco_many(
+    scenario_ids: Iterable[int],
+    database_url: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[int, Union[Dict[str, float], TCOError]]]:
+    """
+    Calculate the TCO of many scenarios in a pool of worker processes, see :func:`eflips.tco.calculate_tco`.
+
+    Each worker process owns its own database engine. The results are yielded as soon as they are complete, so they
+    are not in the order of ``scenario_ids``. A failing scenario does not stop the others, its result is a
+    :class:`TCOError` instead of the dummy data of :func:`eflips.tco.calculate_tco`. Use
+    ``dict(calculate_tco_many(...))`` to collect all results in a dictionary.
+
+    :param scenario_ids: The ids of the scenarios.
+    :param database_url: The database URL. Defaults to the environment variable ``DATABASE_URL``.
+    :param max_workers: The number of worker processes. Defaults to the number of CPUs.
+    :return: Yield tuples of the scenario id and either the TCO values categorized by type or a :class:`TCOError`.
+    """
+    logger = logging.getLogger(__name__)
+
+    if database_url is None:
+        if "DATABASE_URL" in os.environ:
+            database_url = os.environ.get("DATABASE_URL")
+        else:
+            raise ValueError("No database URL specified.")
+
+    scenario_ids = list(scenario_ids)
+    if len(scenario_ids) == 0:
+        return
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(scenario_ids))
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(database_url,)
+    ) as executor:
+        futures = {
+            executor.submit(_calculate_tco_worker, scenario_id): scenario_id
+            for scenario_id in scenario_ids
+        }
+        try:
+            for future in as_completed(futures):
+                scenario_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself failed, e.g. it was killed or the result could not be pickled
+                    result = TCOError(
+                        scenario_id=scenario_id,
+                        error_type=type(e).__name__,
+                        message=str(e),
+                        traceback=traceback.format_exc(),
+                    )
+                if isinstance(result, TCOError):
+                    logger.warning(
+                        "Calculating the TCO of scenario %s failed: %s",
+                        scenario_id,
+                        result.message,
+                    )
+                yield scenario_id, result
+        finally:
+            # Do not start the remaining scenarios if the caller stops iterating early
+            for future in futures:
+                future.cancel()
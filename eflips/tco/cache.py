@@ -0,0 +1,262 @@
+# This file contains the on-disk cache of the scenario facts.
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from eflips.model import (
+    Area,
+    BatteryType,
+    ChargingPointType,
+    Event,
+    Scenario,
+    Station,
+    Trip,
+    Vehicle,
+    VehicleType,
+)
+from sqlalchemy import func
+from sqlalchemy.engine import URL, make_url
+
+from eflips.tco.scenario_facts import ScenarioFacts
+
+
+def default_cache_dir() -> Path:
+    """
+    Get the default cache directory. It is read from the environment variable ``EFLIPS_TCO_CACHE_DIR`` and defaults to
+    ``~/.cache/eflips-tco``.
+
+    :return: The path of the cache directory.
+    """
+    if "EFLIPS_TCO_CACHE_DIR" in os.environ:
+        return Path(os.environ["EFLIPS_TCO_CACHE_DIR"])
+    return Path.home() / ".cache" / "eflips-tco"
+
+
+def scenario_fingerprint(
+    session, scenario: Scenario, energy_consumption_mode: str = "simulated"
+) -> str:
+    """
+    Compute a cheap fingerprint of everything the scenario facts are extracted from.
+
+    The simulation results are represented by the count and the maximum id of the events, trips and vehicles of the
+    scenario. Rerunning the simulation deletes and recreates the events, which changes their maximum id. The tco
+    parameters and the assignment of charging point types are small and are hashed completely, so that a call to
+    :func:`eflips.tco.init_tco_parameters` also invalidates the cache.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param energy_consumption_mode: The energy consumption mode the facts are extracted for.
+    :return: The fingerprint as a hex string.
+    """
+    content: dict[str, Any] = {
+        # Entries stored before fields were added to the facts are outdated
+        "facts_fields": [facts_field.name for facts_field in fields(ScenarioFacts)],
+        # Entries stored before the charging energy profile was extracted in the mode "constant" are outdated
+        "facts_version": 2,
+        "energy_consumption_mode": energy_consumption_mode,
+        "tco_parameters": scenario.tco_parameters,
+    }
+
+    for table in (Event, Trip, Vehicle):
+        content[table.__tablename__] = list(
+            session.query(func.count(table.id), func.max(table.id))
+            .filter(table.scenario_id == scenario.id)
+            .one()
+        )
+
+    content["vehicle_types"] = [
+        list(row)
+        for row in session.query(
+            VehicleType.id,
+            VehicleType.name,
+            VehicleType.battery_capacity,
+            VehicleType.charging_efficiency,
+            VehicleType.battery_type_id,
+            VehicleType.tco_parameters,
+        )
+        .filter(VehicleType.scenario_id == scenario.id)
+        .order_by(VehicleType.id)
+    ]
+    content["battery_types"] = [
+        list(row)
+        for row in session.query(BatteryType.id, BatteryType.tco_parameters)
+        .filter(BatteryType.scenario_id == scenario.id)
+        .order_by(BatteryType.id)
+    ]
+    content["charging_point_types"] = [
+        list(row)
+        for row in session.query(ChargingPointType.id, ChargingPointType.tco_parameters)
+        .filter(ChargingPointType.scenario_id == scenario.id)
+        .order_by(ChargingPointType.id)
+    ]
+    content["stations"] = [
+        list(row)
+        for row in session.query(
+            Station.id,
+            Station.is_electrified,
+            Station.charge_type,
+            Station.charging_point_type_id,
+            Station.tco_parameters,
+        )
+        .filter(Station.scenario_id == scenario.id)
+        .order_by(Station.id)
+    ]
+    content["areas"] = [
+        list(row)
+        for row in session.query(Area.id, Area.charging_point_type_id)
+        .filter(Area.scenario_id == scenario.id)
+        .order_by(Area.id)
+    ]
+
+    serialized = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def database_key(database_url: Union[str, URL]) -> str:
+    """
+    Compute a short key of a database, so that the entries of scenarios with the same id in different databases do not
+    replace each other. The password is not part of the key.
+
+    :param database_url: The database URL, e.g. the ``url`` of the engine of a session.
+    :return: The key as a hex string.
+    """
+    url = make_url(database_url).render_as_string(hide_password=True)
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+class FactsCache:
+    """
+    A size-bounded on-disk cache of :class:`ScenarioFacts`.
+
+    Each entry is a JSON file named after the scenario id, the database (see :func:`database_key`) and the fingerprint
+    of the scenario (see :func:`scenario_fingerprint`). An entry is only used if the fingerprint still matches, so the cache is invalidated
+    automatically when the simulation is rerun or the tco parameters are changed. Outdated entries of a scenario are
+    removed when a new entry is stored. If the cache grows beyond ``max_size`` bytes, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_size: int = 256 * 1024**2,
+    ):
+        """
+        :param cache_dir: The directory of the cache files. Defaults to :func:`default_cache_dir`.
+        :param max_size: The maximum total size of the cache files in bytes.
+        """
+        self.cache_dir = (
+            Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        )
+        self.max_size = max_size
+
+    def _prefix(self, scenario_id: int, database_url: Union[str, URL]) -> str:
+        return f"scenario_{scenario_id}_{database_key(database_url)}_"
+
+    def _path(
+        self, scenario_id: int, database_url: Union[str, URL], fingerprint: str
+    ) -> Path:
+        prefix = self._prefix(scenario_id, database_url)
+        return self.cache_dir / f"{prefix}{fingerprint[:32]}.json"
+
+    def get(
+        self, session, scenario: Scenario, energy_consumption_mode: str = "simulated"
+    ) -> ScenarioFacts:
+        """
+        Get the facts of a scenario from the cache, or extract and store them if there is no valid entry.
+
+        :param session: A session object.
+        :param scenario: A scenario object.
+        :param energy_consumption_mode: Either "simulated" or "constant", see :meth:`ScenarioFacts.from_session`.
+        :return: A :class:`ScenarioFacts` object.
+        """
+        logger = logging.getLogger(__name__)
+
+        database_url = session.get_bind().url
+        fingerprint = scenario_fingerprint(session, scenario, energy_consumption_mode)
+        path = self._path(scenario.id, database_url, fingerprint)
+
+        if path.exists():
+            try:
+                with open(path) as f:
+                    facts = ScenarioFacts.from_dict(json.load(f))
+                # Mark the entry as recently used
+                os.utime(path)
+                logger.debug(
+                    "Loaded the facts of scenario %s from %s", scenario.id, path
+                )
+                return facts
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Ignoring the invalid cache entry %s: %s", path, e)
+
+        facts = ScenarioFacts.from_session(session, scenario, energy_consumption_mode)
+        self.put(facts, fingerprint, database_url)
+        return facts
+
+    def put(
+        self, facts: ScenarioFacts, fingerprint: str, database_url: Union[str, URL]
+    ) -> None:
+        """
+        Store the facts of a scenario, replacing all older entries of the same scenario in the same database.
+
+        :param facts: A :class:`ScenarioFacts` object.
+        :param fingerprint: The fingerprint of the scenario the facts were extracted from.
+        :param database_url: The URL of the database the facts were extracted from.
+        :return: Nothing.
+        """
+        logger = logging.getLogger(__name__)
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(facts.scenario_id, database_url, fingerprint)
+
+            prefix = self._prefix(facts.scenario_id, database_url)
+            for outdated in self.cache_dir.glob(f"{prefix}*.json"):
+                if outdated != path:
+                    outdated.unlink(missing_ok=True)
+
+            # Write to a temporary file first, so that concurrent readers never see a partial entry
+            temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary_path, "w") as f:
+                json.dump(facts.to_dict(), f)
+            os.replace(temporary_path, path)
+
+            self.evict()
+        except OSError as e:
+            logger.warning(
+                "Could not write to the cache directory %s: %s", self.cache_dir, e
+            )
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the total size of the cache is at most ``max_size`` bytes.
+
+        :return: Nothing.
+        """
+        entries = []
+        for path in self.cache_dir.glob("scenario_*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+
+        :return: Nothing.
+        """
+        for path in self.cache_dir.glob("scenario_*.json"):
+            path.unlink(missing_ok=True)
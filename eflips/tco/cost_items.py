@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from enum import Enum, auto
+from typing import Optional
 
-
+import numpy as np
 
 
 def net_present_value(cash_flow, years_after_base_year: int, discount_rate):
@@ -16,6 +17,211 @@ def net_present_value(cash_flow, years_after_base_year: int, discount_rate):
     npv = cash_flow / ((1 + discount_rate) ** years_after_base_year)
     return npv
 
+
+def _geometric_sum(log_ratio, number_of_terms):
+    """
+    Sum of the geometric series q^0 + q^1 + ... + q^(n-1) with q = exp(log_ratio).
+
+    The series is evaluated as ``expm1(n * log_ratio) / expm1(log_ratio)``, which stays accurate if the ratio is close
+    to one (e.g. if the cost escalation equals the discount rate). A ratio of exactly one yields ``n``.
+
+    :param log_ratio: The natural logarithm of the ratio of two consecutive terms.
+    :param number_of_terms: The number of terms of the series.
+    :return: The sum of the series.
+    """
+    log_ratio = np.asarray(log_ratio, dtype=float)
+    number_of_terms = np.asarray(number_of_terms, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        series = np.expm1(number_of_terms * log_ratio) / np.expm1(log_ratio)
+    return np.where(log_ratio == 0.0, number_of_terms, series)
+
+
+def annuity_factor(interest_rate, useful_life):
+    """
+    The annuity factor i / (1 - (1 + i)^(-n)), which turns a procurement price into equal annual payments over
+    the useful life. An interest rate of zero yields ``1 / useful_life``.
+
+    :param interest_rate: The interest rate. Scalar or array.
+    :param useful_life: The useful life in years. Scalar or array.
+    :return: The annuity factor.
+    """
+    interest_rate = np.asarray(interest_rate, dtype=float)
+    useful_life = np.asarray(useful_life, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = -interest_rate / np.expm1(-useful_life * np.log1p(interest_rate))
+    return np.where(interest_rate == 0.0, 1.0 / useful_life, factor)
+
+
+def capex_present_value(
+    procurement_cost,
+    useful_life,
+    cost_escalation,
+    project_duration,
+    interest_rate,
+    net_discount_rate,
+):
+    """
+    Closed-form and vectorized version of :meth:`CapexItem.calculate_total_procurement_cost`.
+
+    All arguments may be scalars or NumPy arrays, which are broadcast against each other. This allows evaluating all
+    CAPEX items of a scenario (and many parameter variants of them) at once.
+
+    Within the project duration D, the asset is procured F = D // L times for its full useful life L. Procurement k
+    is paid as an annuity P * a * (1 + e)^(k * L) over L years. If D is not a multiple of L, one more procurement
+    follows, of which only the fraction (D - F * L) / L is accounted for. Both sums over the years of a useful life and
+    over the procurements are geometric series, so the present value does not require a loop over the years.
+
+    :param procurement_cost: The procurement cost per unit in the base year.
+    :param useful_life: The useful life of the asset in years.
+    :param cost_escalation: The annual change of the procurement cost.
+    :param project_duration: The duration of the project in years.
+    :param interest_rate: The interest rate used for the annuities.
+    :param net_discount_rate: The discount rate used for the present value.
+    :return: The present value of all procurements of one unit over the project duration.
+    """
+    useful_life = np.asarray(useful_life, dtype=float)
+    project_duration = np.asarray(project_duration, dtype=float)
+
+    number_of_full_procurements = np.floor(project_duration / useful_life)
+    fraction_last_procurement = (
+        project_duration - number_of_full_procurements * useful_life
+    ) / useful_life
+
+    log_discount = -np.log1p(net_discount_rate)
+    discounted_annuities = annuity_factor(interest_rate, useful_life) * _geometric_sum(
+        log_discount, useful_life
+    )
+    log_ratio = useful_life * (np.log1p(cost_escalation) + log_discount)
+
+    procurements = _geometric_sum(
+        log_ratio, number_of_full_procurements
+    ) + fraction_last_procurement * np.exp(log_ratio * number_of_full_procurements)
+    return procurement_cost * discounted_annuities * procurements
+
+
+def opex_present_value(
+    unit_cost, usage_amount, cost_escalation, project_duration, net_discount_rate
+):
+    """
+    Closed-form and vectorized present value of an OPEX item over the project duration, i.e. the sum of
+    :meth:`OpexItem.future_cost` discounted to the base year for every year of the project.
+
+    All arguments may be scalars or NumPy arrays, which are broadcast against each other.
+
+    :param unit_cost: The unit cost in the base year.
+    :param usage_amount: The annual usage amount.
+    :param cost_escalation: The annual change of the unit cost.
+    :param project_duration: The duration of the project in years.
+    :param net_discount_rate: The discount rate used for the present value.
+    :return: The present value of the OPEX item over the project duration.
+    """
+    log_ratio = np.log1p(cost_escalation) - np.log1p(net_discount_rate)
+    return (
+        np.asarray(unit_cost, dtype=float)
+        * usage_amount
+        * _geometric_sum(log_ratio, project_duration)
+    )
+
+
+def capex_cash_flows(
+    procurement_cost,
+    useful_life,
+    cost_escalation,
+    project_duration,
+    interest_rate,
+    number_of_years: int,
+):
+    """
+    The nominal annual payments of a CAPEX item, i.e. the year-by-year version of :func:`capex_present_value`.
+
+    Procurement k is paid as an annuity P * a * (1 + e)^(k * L) in the years k * L to (k + 1) * L - 1. The last
+    procurement, which is only partly used within the project duration, is accounted for with the same fraction of
+    each of its annuities as in :func:`capex_present_value`. Its annuities may therefore extend beyond the project
+    duration. Discounting the payments of year t with (1 + r)^-t yields :func:`capex_present_value`.
+
+    All arguments except ``number_of_years`` may be scalars or NumPy arrays, which are broadcast against each other.
+
+    :param procurement_cost: The procurement cost per unit in the base year.
+    :param useful_life: The useful life of the asset in years.
+    :param cost_escalation: The annual change of the procurement cost.
+    :param project_duration: The duration of the project in years.
+    :param interest_rate: The interest rate used for the annuities.
+    :param number_of_years: The number of years of the result, starting with the base year.
+    :return: The payments per unit, with the years as an additional last axis.
+    """
+    useful_life = np.asarray(useful_life, dtype=float)[..., np.newaxis]
+    project_duration = np.asarray(project_duration, dtype=float)[..., np.newaxis]
+    cost_escalation = np.asarray(cost_escalation, dtype=float)[..., np.newaxis]
+    years = np.arange(number_of_years, dtype=float)
+
+    number_of_full_procurements = np.floor(project_duration / useful_life)
+    fraction_last_procurement = (
+        project_duration - number_of_full_procurements * useful_life
+    ) / useful_life
+
+    procurement = np.floor(years / useful_life)
+    share = np.where(
+        procurement < number_of_full_procurements,
+        1.0,
+        np.where(
+            procurement == number_of_full_procurements, fraction_last_procurement, 0.0
+        ),
+    )
+    annuity = (
+        np.asarray(procurement_cost, dtype=float)[..., np.newaxis]
+        * annuity_factor(
+            np.asarray(interest_rate, dtype=float)[..., np.newaxis], useful_life
+        )
+        * np.exp(procurement * useful_life * np.log1p(cost_escalation))
+    )
+    return annuity * share
+
+
+def opex_cash_flows(
+    unit_cost, usage_amount, cost_escalation, project_duration, number_of_years: int
+):
+    """
+    The nominal annual costs of an OPEX item, i.e. :meth:`OpexItem.future_cost` in each year of the project duration.
+    Discounting the costs of year t with (1 + r)^-t yields :func:`opex_present_value`.
+
+    All arguments except ``number_of_years`` may be scalars or NumPy arrays, which are broadcast against each other.
+
+    :param unit_cost: The unit cost in the base year.
+    :param usage_amount: The annual usage amount.
+    :param cost_escalation: The annual change of the unit cost.
+    :param project_duration: The duration of the project in years.
+    :param number_of_years: The number of years of the result, starting with the base year.
+    :return: The costs, with the years as an additional last axis. Years after the project duration are zero.
+    """
+    years = np.arange(number_of_years, dtype=float)
+    cost = (
+        np.asarray(unit_cost, dtype=float)[..., np.newaxis]
+        * np.asarray(usage_amount, dtype=float)[..., np.newaxis]
+        * np.exp(
+            years * np.log1p(np.asarray(cost_escalation, dtype=float)[..., np.newaxis])
+        )
+    )
+    return np.where(
+        years < np.asarray(project_duration, dtype=float)[..., np.newaxis], cost, 0.0
+    )
+
+
+def discount_cash_flows(cash_flows, net_discount_rate):
+    """
+    Discount annual cash flows to the base year.
+
+    :param cash_flows: The cash flows, with the years after the base year as the last axis.
+    :param net_discount_rate: The discount rate. Scalar or array broadcastable against the cash flows without the
+        year axis.
+    :return: The discounted cash flows.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    years = np.arange(cash_flows.shape[-1], dtype=float)
+    return cash_flows * np.exp(
+        -years * np.log1p(np.asarray(net_discount_rate, dtype=float)[..., np.newaxis])
+    )
+
+
 class CapexItemType(Enum):
     """ """
 
@@ -48,20 +254,50 @@ class CapexItem:
     useful_life: int
     procurement_cost: float
     cost_escalation: float
-    quantity: int
+    quantity: float
+    vehicle_type_id: Optional[int] = None
+    "The id of the vehicle type of a vehicle or battery item, if any."
 
     @staticmethod
     def from_dict(item_dict: dict) -> "CapexItem":
         """
         Create a CapexItem instance from a dictionary.
 
-        :param item_dict: Dictionary containing the parameters of the CapexItem.
+        :param item_dict: Dictionary containing the parameters of the CapexItem. The type may be given as a
+            :class:`CapexItemType` or as its name.
         :return: An instance of CapexItem.
         """
-        raise NotImplementedError(
-            "This method should be implemented to create a CapexItem from a dictionary."
+        item_type = item_dict["type"]
+        return CapexItem(
+            name=item_dict["name"],
+            type=(
+                item_type
+                if isinstance(item_type, CapexItemType)
+                else CapexItemType[item_type]
+            ),
+            useful_life=item_dict["useful_life"],
+            procurement_cost=item_dict["procurement_cost"],
+            cost_escalation=item_dict["cost_escalation"],
+            quantity=item_dict["quantity"],
+            vehicle_type_id=item_dict.get("vehicle_type_id"),
         )
 
+    def to_dict(self) -> dict:
+        """
+        Convert this CapexItem into a JSON-serializable dictionary, which can be read by :meth:`from_dict`.
+
+        :return: A dictionary containing the parameters of the CapexItem.
+        """
+        return {
+            "name": self.name,
+            "type": self.type.name,
+            "useful_life": self.useful_life,
+            "procurement_cost": self.procurement_cost,
+            "cost_escalation": self.cost_escalation,
+            "quantity": self.quantity,
+            "vehicle_type_id": self.vehicle_type_id,
+        }
+
     def replacement_cost(self, project_duration) -> list[tuple[float, int, bool]]:
         """
         In this method, the replacement costs of an asset are calculated considering the cost escalation.
@@ -80,7 +316,9 @@ class CapexItem:
         number_of_full_replacements = project_duration // self.useful_life
         for i in range(number_of_full_replacements + 1):
             # The new price is the baseprice multiplied by the cost escalation factor to the power of the years after the base year.
-            new_price = base_price * (1 + self.cost_escalation) ** (i * self.useful_life)
+            new_price = base_price * (1 + self.cost_escalation) ** (
+                i * self.useful_life
+            )
             # If the project ends before the useful life if the next replacement, the binary variable is set true in order
             # to account for that in the total_proc_cef function.
             years_used = (i + 1) * self.useful_life
@@ -100,7 +338,15 @@ class CapexItem:
         interest_rate: float,
         net_discount_rate: float,
     ):
-        """ """
+        """
+        Calculate the present value of all procurements of one unit of this asset over the project duration year by
+        year. :func:`capex_present_value` is the closed-form equivalent used by :class:`TCOCalculator`.
+
+        :param project_duration: The duration of the project in years.
+        :param interest_rate: The interest rate used for the annuities.
+        :param net_discount_rate: The discount rate used for the present value.
+        :return: The present value of all procurements of one unit.
+        """
         # Get a list with all procurements taking place over the project duration
         all_procurements = self.replacement_cost(
             project_duration,
@@ -113,10 +359,16 @@ class CapexItem:
         # remaining project duration.
         # Calculating all annuities over the project duration and saving them in a list
         for new_price, years_after_base_year, partially_used in all_procurements:
-            annuity_this_procurement = new_price * interest_rate / (1 - (1 + interest_rate) ** (-self.useful_life))
+            annuity_this_procurement = (
+                new_price
+                * interest_rate
+                / (1 - (1 + interest_rate) ** (-self.useful_life))
+            )
             if partially_used:
                 # Calculate the present value of the last replacement, scaled for partial use
-                annuities_last_replacement = [annuity_this_procurement] * self.useful_life
+                annuities_last_replacement = [
+                    annuity_this_procurement
+                ] * self.useful_life
                 pv_sum = sum(
                     net_present_value(ann, year, net_discount_rate)
                     for year, ann in enumerate(annuities_last_replacement)
@@ -169,6 +421,10 @@ class OpexItem:
     unit_cost: float
     usage_amount: float
     cost_escalation: float
+    unit_cost_parameter: Optional[str] = None
+    "The key in the scenario's tco_parameters the unit cost is taken from, if any."
+    cost_escalation_parameter: Optional[str] = None
+    "The key in the scenario's tco_parameters the cost escalation is taken from, if any."
 
     @staticmethod
     def from_dict(item_dict: dict) -> "OpexItem":
@@ -1,4 +1,6 @@
 import datetime
+from collections import Counter
+import os
 import warnings
 from typing import List, Tuple, Any, Dict, Optional, Union
 from eflips.model import (
@@ -7,7 +9,6 @@ from eflips.model import (
     VehicleType,
     Route,
     Trip,
-
     BatteryType,
     ChargeType,
     Scenario,
@@ -16,17 +17,54 @@ from eflips.model import (
     Process,
     Event,
     EventType,
-    Depot, Rotation,
+    Depot,
+    Rotation,
 )
 
 from sqlalchemy import or_, and_, distinct
-from sqlalchemy import func
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
 
 import warnings as w
 
+import numpy as np
+
 from eflips.tco.cost_items import CapexItemType, CapexItem, OpexItem
-from eflips.tco.util import create_session
-from eflips.eval.output.prepare import power_and_occupancy
+from eflips.tco.tariffs import bin_energy
+from eflips.tco.util import create_session, get_engine
+
+
+class QueryContext:
+    """
+    Intermediate results shared by the queries of one scenario.
+
+    A QueryContext is created once per extraction of the scenario facts and passed to the query functions, which then
+    compute shared quantities like the simulation period only once.
+    """
+
+    def __init__(
+        self,
+        session,
+        scenario,
+        simulation_period: Optional[Tuple[datetime.timedelta, float]] = None,
+    ):
+        """
+        :param session: A session object.
+        :param scenario: A scenario object.
+        :param simulation_period: Optional simulation period, if it is already known, e.g. from another session.
+        """
+        self.session = session
+        self.scenario = scenario
+        self._simulation_period = simulation_period
+
+    @property
+    def simulation_period(self) -> Tuple[datetime.timedelta, float]:
+        """The simulation period and the factor to obtain annual quantities, see :func:`get_simulation_period`."""
+        if self._simulation_period is None:
+            self._simulation_period = _query_simulation_period(
+                self.session, self.scenario
+            )
+        return self._simulation_period
 
 
 def load_capex_items_vehicle(session, scenario):
@@ -50,6 +88,7 @@ def load_capex_items_vehicle(session, scenario):
             procurement_cost=tco_parameters["procurement_cost"],
             cost_escalation=tco_parameters["cost_escalation"],
             quantity=vehicle_count,
+            vehicle_type_id=vehicle_type.id,
         )
         list_vt_asset.append(asset_this_vtype)
 
@@ -59,6 +98,10 @@ def load_capex_items_vehicle(session, scenario):
 def load_capex_items_battery(session, scenario):
     """
     This method gets the battery size from the session provided and returns it in a dictionary.
+
+    The procurement cost of a battery item is the cost per kWh as stored in the battery type's tco parameters, and its
+    quantity is the installed capacity in kWh (number of vehicles times battery capacity).
+
     :param session: A session object.
     :param scenario: A scenario object.
     :return: A dictionary including the name if the vehicle using this battery, battery capacity and the tco parameters.
@@ -83,36 +126,271 @@ def load_capex_items_battery(session, scenario):
             name="Battery type " + str(vehicle_type.battery_type_id),
             type=CapexItemType.BATTERY,
             useful_life=tco_battery["useful_life"],
-            procurement_cost=tco_battery["procurement_cost"] * battery_capacity,
+            procurement_cost=tco_battery["procurement_cost"],
             cost_escalation=tco_battery["cost_escalation"],
-            quantity=number,
+            quantity=number * battery_capacity,
+            vehicle_type_id=vehicle_type.id,
         )
         list_battery_asset.append(asset_this_battery)
     return list_battery_asset
 
 
+def _peak_occupancy(
+    group_ids: np.ndarray,
+    time_start: np.ndarray,
+    time_end: np.ndarray,
+    grid_origins: Dict[int, float],
+    temporal_resolution: int,
+) -> Dict[int, int]:
+    """
+    Calculate the peak number of concurrent events per group with a sweep line.
+
+    The occupancy is sampled on the same time grid as in :func:`eflips.eval.output.prepare.power_and_occupancy`: every
+    ``temporal_resolution`` seconds from the grid origin of the group, with an event counted at all grid points between
+    its start and ``temporal_resolution`` seconds before its end.
+
+    :param group_ids: The group (area or station id) of each event.
+    :param time_start: The start of each event as a unix timestamp.
+    :param time_end: The end of each event as a unix timestamp.
+    :param grid_origins: The origin of the time grid of each group as a unix timestamp.
+    :param temporal_resolution: The temporal resolution of the time grid in seconds.
+    :return: A dictionary from the group id to the peak occupancy. Groups without events have an occupancy of 0.
+    """
+    peak = {group_id: 0 for group_id in grid_origins}
+
+    origin = np.array([grid_origins[group_id] for group_id in group_ids], dtype=float)
+    first_index = np.ceil((time_start - origin) / temporal_resolution)
+    last_index = np.floor(
+        (time_end - temporal_resolution - origin) / temporal_resolution
+    )
+
+    # Events shorter than the temporal resolution may not cover any grid point
+    covers_grid_point = last_index >= first_index
+    group_ids = group_ids[covers_grid_point]
+    if group_ids.size == 0:
+        return peak
+
+    # +1 at the first grid point of each event, -1 after the last one. The deltas of each group sum up to zero, so the
+    # cumulative sum over the groups sorted one after another is the occupancy within each group. At the same grid
+    # point, ending events are processed before starting events.
+    groups = np.concatenate([group_ids, group_ids])
+    positions = np.concatenate(
+        [first_index[covers_grid_point], last_index[covers_grid_point] + 1]
+    )
+    deltas = np.concatenate(
+        [np.ones(group_ids.size, dtype=int), -np.ones(group_ids.size, dtype=int)]
+    )
+
+    order = np.lexsort((deltas, positions, groups))
+    groups = groups[order]
+    occupancy = np.cumsum(deltas[order])
+
+    group_starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    for group_id, group_peak in zip(
+        groups[group_starts], np.maximum.reduceat(occupancy, group_starts)
+    ):
+        peak[int(group_id)] = int(group_peak)
+    return peak
+
+
+class _PeakOccupancyAccumulator:
+    """
+    Incrementally calculate the peak occupancy per group from chunks of events sorted by their start time.
+
+    The events of earlier chunks that may still be active are carried over to the next chunk. As the events are sorted
+    by their start time, the occupancy at every grid point is complete when the chunk with the last event starting
+    before it is processed, so the maximum over all chunks is the peak occupancy.
+    """
+
+    def __init__(self, grid_origins: Dict[int, float], temporal_resolution: int):
+        self.grid_origins = grid_origins
+        self.temporal_resolution = temporal_resolution
+        self.peak = {group_id: 0 for group_id in grid_origins}
+        self._active = (np.empty(0, dtype=int), np.empty(0), np.empty(0))
+
+    def add(
+        self, group_ids: np.ndarray, time_start: np.ndarray, time_end: np.ndarray
+    ) -> None:
+        if group_ids.size == 0:
+            return
+        group_ids = np.concatenate([self._active[0], group_ids])
+        time_start = np.concatenate([self._active[1], time_start])
+        time_end = np.concatenate([self._active[2], time_end])
+
+        for group_id, group_peak in _peak_occupancy(
+            group_ids, time_start, time_end, self.grid_origins, self.temporal_resolution
+        ).items():
+            self.peak[group_id] = max(self.peak[group_id], group_peak)
+
+        # All later events start at or after the last start of this chunk
+        active = time_end - self.temporal_resolution >= time_start.max()
+        self._active = (group_ids[active], time_start[active], time_end[active])
+
+
+def peak_charging_occupancy(
+    session,
+    scenario,
+    area_ids: List[int],
+    station_ids: List[int],
+    temporal_resolution: int = 60,
+    chunk_size: Optional[int] = None,
+) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    This method calculates the peak number of concurrently charging vehicles for each given area and station.
+
+    The result equals the maximum of ``occupancy_charging`` from :func:`eflips.eval.output.prepare.power_and_occupancy`
+    for each area and station, but all charging events of the scenario are fetched with one query and the occupancy is
+    computed with a vectorized sweep line.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param area_ids: The ids of the areas.
+    :param station_ids: The ids of the stations.
+    :param temporal_resolution: The temporal resolution of the occupancy time series in seconds.
+    :param chunk_size: Optional number of events to process at once. If given, the events are streamed in chunks of
+        this size with a server-side cursor, so that the memory use does not grow with the number of events.
+    :return: Two dictionaries from the area ids and the station ids to their peak charging occupancy. Areas and
+        stations without any events are not included.
+    """
+
+    # The time grid of each area and station starts at its first event of any type, with the seconds rounded down
+    def grid_origins(column, ids) -> Dict[int, float]:
+        if len(ids) == 0:
+            return {}
+        first_events = (
+            session.query(column, func.min(Event.time_start))
+            .filter(Event.scenario_id == scenario.id, column.in_(ids))
+            .group_by(column)
+            .all()
+        )
+        return {
+            group_id: time_start.timestamp() - time_start.second % temporal_resolution
+            for group_id, time_start in first_events
+        }
+
+    area_occupancy = _PeakOccupancyAccumulator(
+        grid_origins(Event.area_id, area_ids), temporal_resolution
+    )
+    station_occupancy = _PeakOccupancyAccumulator(
+        grid_origins(Event.station_id, station_ids), temporal_resolution
+    )
+
+    charging_events = select(
+        Event.area_id, Event.station_id, Event.time_start, Event.time_end
+    ).where(
+        Event.scenario_id == scenario.id,
+        or_(
+            Event.event_type == EventType.CHARGING_DEPOT,
+            Event.event_type == EventType.CHARGING_OPPORTUNITY,
+        ),
+        or_(Event.area_id.in_(area_ids), Event.station_id.in_(station_ids)),
+    )
+    if chunk_size is not None:
+        chunks = session.execute(
+            charging_events.order_by(Event.time_start).execution_options(
+                yield_per=chunk_size
+            )
+        ).partitions()
+    else:
+        chunks = [session.execute(charging_events).all()]
+
+    for chunk in chunks:
+        area_id = np.array(
+            [event[0] if event[0] is not None else -1 for event in chunk], dtype=int
+        )
+        station_id = np.array(
+            [event[1] if event[1] is not None else -1 for event in chunk], dtype=int
+        )
+        time_start = np.array([event[2].timestamp() for event in chunk], dtype=float)
+        time_end = np.array([event[3].timestamp() for event in chunk], dtype=float)
+
+        in_areas = np.isin(area_id, list(area_occupancy.grid_origins))
+        in_stations = np.isin(station_id, list(station_occupancy.grid_origins))
+
+        area_occupancy.add(area_id[in_areas], time_start[in_areas], time_end[in_areas])
+        station_occupancy.add(
+            station_id[in_stations], time_start[in_stations], time_end[in_stations]
+        )
+
+    return area_occupancy.peak, station_occupancy.peak
+
+
 # This function returns the number of the charging slots and stations including the tco parameters grouped by the
 # charging infrastructure type.
-def load_capex_items_infrastructure(session, scenario):
+def load_capex_items_infrastructure(
+    session,
+    scenario,
+    occupancy_method: str = "sweep_line",
+    chunk_size: Optional[int] = None,
+):
     """
     This method calculates the number of charging infrastructure required to operate the bus system in the given scenario.
 
     :param session: A Session object.
     :param scenario: A Scenario object.
+    :param occupancy_method: Either "sweep_line", to calculate the charging slots of all areas and stations at once
+        with :func:`peak_charging_occupancy`, or "power_and_occupancy", to use
+        :func:`eflips.eval.output.prepare.power_and_occupancy` for each area and station.
+    :param chunk_size: Optional number of events to process at once with the "sweep_line" method, see
+        :func:`peak_charging_occupancy`.
     :return: A dictionary including the number of the charging slots and stations including the tco parameters grouped by the charging infrastructure type.
     """
 
     charging_point_types = scenario.charging_point_types
     list_asset_charging_points = []
 
+    if occupancy_method == "sweep_line":
+        area_peak, station_peak = peak_charging_occupancy(
+            session,
+            scenario,
+            [
+                area.id
+                for cpt in charging_point_types
+                if cpt.areas is not None
+                for area in cpt.areas
+            ],
+            [
+                station.id
+                for cpt in charging_point_types
+                if cpt.stations is not None
+                for station in cpt.stations
+            ],
+            chunk_size=chunk_size,
+        )
+
+        def area_slots(area_id):
+            if area_id not in area_peak:
+                raise ValueError("No events found for the given area_id")
+            return area_peak[area_id]
+
+        def station_slots(station_id):
+            if station_id not in station_peak:
+                raise ValueError("No events found for the given station_id")
+            return station_peak[station_id]
+
+    elif occupancy_method == "power_and_occupancy":
+        # eflips-eval is slow to import, so it is only imported if needed
+        from eflips.eval.output.prepare import power_and_occupancy
+
+        def area_slots(area_id):
+            return power_and_occupancy(area_id=area_id, session=session)[
+                "occupancy_charging"
+            ].max()
+
+        def station_slots(station_id):
+            return power_and_occupancy(
+                area_id=None, session=session, station_id=station_id
+            )["occupancy_charging"].max()
+
+    else:
+        raise ValueError(f"Unknown occupancy method: {occupancy_method}")
+
     for charging_point_type in charging_point_types:
         total_count = 0
         if charging_point_type.areas is not None:
             for area in charging_point_type.areas:
                 try:
-                    num_dc_slots = power_and_occupancy(
-                        area_id=area.id, session=session
-                    )["occupancy_charging"].max()
+                    num_dc_slots = area_slots(area.id)
                     total_count += num_dc_slots
                 except ValueError:
                     w.warn(
@@ -123,9 +401,7 @@ def load_capex_items_infrastructure(session, scenario):
         if charging_point_type.stations is not None:
             for station in charging_point_type.stations:
                 try:
-                    num_oc_slots = power_and_occupancy(
-                        area_id=None, session=session, station_id=station.id
-                    )["occupancy_charging"].max()
+                    num_oc_slots = station_slots(station.id)
                     total_count += num_oc_slots
                 except ValueError:
                     w.warn(
@@ -180,11 +456,14 @@ def load_capex_items_infrastructure(session, scenario):
 
 
 # Get the total fuel / Energy consumption from the database.
-def calc_energy_consumption_simulated(session, scenario):
+def calc_energy_consumption_simulated(
+    session, scenario, context: Optional[QueryContext] = None
+):
     """
     This method gets the total energy consumption for the given scenario from the session provided.
     :param session: A session object.
     :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
     :return: The total energy consumption in kWh.
     """
 
@@ -213,26 +492,107 @@ def calc_energy_consumption_simulated(session, scenario):
 
     # Calculate the annual energy consumption
     energy_consumption = (
-            result[0] * get_simulation_period(session=session, scenario=scenario)[1]
+        result[0]
+        * get_simulation_period(session=session, scenario=scenario, context=context)[1]
     )
 
     return energy_consumption
 
 
+def get_charging_energy_profile(
+    session,
+    scenario,
+    context: Optional[QueryContext] = None,
+    resolution: int = 3600,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    This method gets the annual charging energy in each time bin of the simulation period, e.g. to apply a
+    time-of-use tariff (see :class:`eflips.tco.tariffs.TariffSchedule`).
+
+    The energy of each charging event is obtained as in :func:`calc_energy_consumption_simulated` and split between the
+    time bins it overlaps with :func:`eflips.tco.tariffs.bin_energy`. The start and end of the events are converted to
+    unix timestamps in the database.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :param resolution: The width of the time bins in seconds.
+    :param chunk_size: Optional number of events to process at once. If given, the events are streamed in chunks of
+        this size with a server-side cursor, so that the memory use does not grow with the number of events.
+    :return: A JSON-serializable dictionary with the "origin" of the first bin as a unix timestamp, rounded down to a
+        multiple of the resolution, the "resolution" in seconds and the annual "energy" in kWh of each bin as a list.
+    """
+    time_start = _epoch_seconds(session, Event.time_start)
+    time_end = _epoch_seconds(session, Event.time_end)
+    is_charging = or_(
+        Event.event_type == EventType.CHARGING_DEPOT,
+        Event.event_type == EventType.CHARGING_OPPORTUNITY,
+    )
+
+    first_start, last_end = session.execute(
+        select(func.min(time_start), func.max(time_end)).where(
+            Event.scenario_id == scenario.id, is_charging
+        )
+    ).one()
+    if first_start is None:
+        return {"origin": 0.0, "resolution": resolution, "energy": []}
+    origin = float(first_start) // resolution * resolution
+    number_of_bins = max(int(np.ceil((float(last_end) - origin) / resolution)), 1)
+
+    charging_events = (
+        select(
+            time_start,
+            time_end,
+            (Event.soc_end - Event.soc_start)
+            * VehicleType.battery_capacity
+            / VehicleType.charging_efficiency,
+        )
+        .join(VehicleType, Event.vehicle_type_id == VehicleType.id)
+        .where(Event.scenario_id == scenario.id, is_charging)
+    )
+    if chunk_size is not None:
+        chunks = session.execute(
+            charging_events.execution_options(yield_per=chunk_size)
+        ).partitions()
+    else:
+        chunks = [session.execute(charging_events).all()]
+
+    # The energy of the bins is additive, so the chunks can be processed independently
+    energy = np.zeros(number_of_bins)
+    for chunk in chunks:
+        events = np.array(chunk, dtype=float).reshape(len(chunk), 3)
+        energy += bin_energy(
+            events[:, 0], events[:, 1], events[:, 2], origin, resolution, number_of_bins
+        )
+
+    periods_per_year = get_simulation_period(
+        session=session, scenario=scenario, context=context
+    )[1]
+    return {
+        "origin": origin,
+        "resolution": resolution,
+        "energy": (energy * periods_per_year).tolist(),
+    }
+
+
 # Get the fleet mileage by vehicle type in km.
 
 
-def get_annual_fleet_mileage(session, scenario) -> float:
+def get_annual_fleet_mileage(
+    session, scenario, context: Optional[QueryContext] = None
+) -> float:
     """
     This method gets the annual fleet mileage from the session provided.
 
     :param session: A session object.
     :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
     :return: The total annual fleet mileage in km.
     """
 
     simulation_period, period_per_year = get_simulation_period(
-        session=session, scenario=scenario
+        session=session, scenario=scenario, context=context
     )
 
     total_simulated_mileage = (
@@ -247,63 +607,359 @@ def get_annual_fleet_mileage(session, scenario) -> float:
     return total_simulated_mileage * period_per_year / 1000  # Convert to km
 
 
-def get_mileage_per_vehicle_type(session, scenario) -> Dict[int, Tuple[float, float]]:
+def get_mileage_per_vehicle_type(
+    session, scenario, context: Optional[QueryContext] = None
+) -> Dict[str, float]:
     """
+    This method gets the annual mileage of each vehicle type.
 
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :return: A dictionary from the vehicle type id (as a string) to the annual mileage in km.
     """
 
     vt_mileage = (
-        session.query(Rotation.vehicle_type_id, func.sum(Route.distance)).join(Trip, Trip.route_id == Route.id).
-        join(Rotation, Trip.rotation_id == Rotation.id).
-        filter(Rotation.scenario_id == scenario.id).group_by(Rotation.vehicle_type_id).all())
+        session.query(Rotation.vehicle_type_id, func.sum(Route.distance))
+        .join(Trip, Trip.route_id == Route.id)
+        .join(Rotation, Trip.rotation_id == Rotation.id)
+        .filter(Rotation.scenario_id == scenario.id)
+        .group_by(Rotation.vehicle_type_id)
+        .all()
+    )
+
+    periods_per_year = get_simulation_period(
+        session=session, scenario=scenario, context=context
+    )[1]
 
     mileage_per_vt = {}
     for vt, mileage in vt_mileage:
-        mileage_per_vt[str(vt)] = mileage / 1000 * get_simulation_period(session=session, scenario=scenario)[1]
+        mileage_per_vt[str(vt)] = mileage / 1000 * periods_per_year
 
     return mileage_per_vt
 
 
+def _duration_seconds(session, time_start, time_end):
+    """
+    Build a SQL expression for the duration between two timestamp columns in seconds.
+
+    :param session: A session object, used to determine the database dialect.
+    :param time_start: The column of the start time.
+    :param time_end: The column of the end time.
+    :return: A SQL expression.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.extract("epoch", time_end - time_start)
+    elif dialect == "sqlite":
+        return (func.julianday(time_end) - func.julianday(time_start)) * 86400
+    else:
+        raise ValueError(f"Unsupported database dialect: {dialect}")
+
+
+def get_vehicle_type_statistics(
+    session, scenario, context: Optional[QueryContext] = None
+) -> Dict[str, Dict[str, float]]:
+    """
+    This method gets the annual mileage, driving hours and simulated energy consumption of each vehicle type in one
+    grouped query.
+
+    The driving hours are the duration of all driving and opportunity charging events, see
+    :func:`calculate_total_driver_hours`. The energy consumption is obtained from the charging events as in
+    :func:`calc_energy_consumption_simulated`.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :return: A dictionary from the vehicle type id (as a string) to a dictionary with the annual "mileage" in km, the
+        annual "driver_hours" and the annual "energy_consumption" in kWh.
+    """
+    mileage = (
+        select(
+            Rotation.vehicle_type_id.label("vehicle_type_id"),
+            func.sum(Route.distance).label("distance"),
+        )
+        .join(Trip, Trip.rotation_id == Rotation.id)
+        .join(Route, Trip.route_id == Route.id)
+        .where(Rotation.scenario_id == scenario.id)
+        .group_by(Rotation.vehicle_type_id)
+        .subquery()
+    )
+    events = (
+        select(
+            Event.vehicle_type_id.label("vehicle_type_id"),
+            func.sum(
+                case(
+                    (
+                        Event.event_type.in_(
+                            [EventType.DRIVING, EventType.CHARGING_OPPORTUNITY]
+                        ),
+                        _duration_seconds(session, Event.time_start, Event.time_end),
+                    ),
+                    else_=0.0,
+                )
+            ).label("driver_seconds"),
+            func.sum(
+                case(
+                    (
+                        Event.event_type.in_(
+                            [EventType.CHARGING_DEPOT, EventType.CHARGING_OPPORTUNITY]
+                        ),
+                        Event.soc_end - Event.soc_start,
+                    ),
+                    else_=0.0,
+                )
+            ).label("charged_soc"),
+        )
+        .where(Event.scenario_id == scenario.id)
+        .group_by(Event.vehicle_type_id)
+        .subquery()
+    )
+    rows = (
+        session.query(
+            VehicleType.id,
+            VehicleType.battery_capacity,
+            VehicleType.charging_efficiency,
+            mileage.c.distance,
+            events.c.driver_seconds,
+            events.c.charged_soc,
+        )
+        .outerjoin(mileage, mileage.c.vehicle_type_id == VehicleType.id)
+        .outerjoin(events, events.c.vehicle_type_id == VehicleType.id)
+        .filter(
+            VehicleType.scenario_id == scenario.id,
+            or_(mileage.c.distance.isnot(None), events.c.driver_seconds.isnot(None)),
+        )
+        .all()
+    )
+
+    periods_per_year = get_simulation_period(
+        session=session, scenario=scenario, context=context
+    )[1]
+
+    statistics = {}
+    for (
+        vehicle_type_id,
+        battery_capacity,
+        charging_efficiency,
+        distance,
+        driver_seconds,
+        charged_soc,
+    ) in rows:
+        statistics[str(vehicle_type_id)] = {
+            "mileage": float(distance or 0.0) / 1000 * periods_per_year,
+            "driver_hours": float(driver_seconds or 0.0) / 3600 * periods_per_year,
+            "energy_consumption": float(charged_soc or 0.0)
+            * battery_capacity
+            / charging_efficiency
+            * periods_per_year,
+        }
+    return statistics
+
+
+def get_rotation_statistics(
+    session, scenario, context: Optional[QueryContext] = None
+) -> Dict[str, np.ndarray]:
+    """
+    This method gets the annual mileage, driving hours and energy consumption of each rotation in one grouped query.
+
+    The driving hours are the duration of the driving events of the trips of a rotation. Charging events are not
+    assigned to a rotation, so the energy consumption is obtained from the state of charge consumed by the driving
+    events, multiplied by the battery capacity and divided by the charging efficiency.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :return: A dictionary of arrays with one entry per rotation, ordered by the rotation id: "rotation_id",
+        "vehicle_type_id", the annual "mileage" in km, the annual "driving_hours" and the annual "energy_consumption"
+        in kWh.
+    """
+    mileage = (
+        select(
+            Trip.rotation_id.label("rotation_id"),
+            func.sum(Route.distance).label("distance"),
+        )
+        .join(Route, Trip.route_id == Route.id)
+        .where(Trip.scenario_id == scenario.id)
+        .group_by(Trip.rotation_id)
+        .subquery()
+    )
+    events = (
+        select(
+            Trip.rotation_id.label("rotation_id"),
+            func.sum(
+                _duration_seconds(session, Event.time_start, Event.time_end)
+            ).label("driving_seconds"),
+            func.sum(
+                (Event.soc_start - Event.soc_end)
+                * VehicleType.battery_capacity
+                / VehicleType.charging_efficiency
+            ).label("energy"),
+        )
+        .select_from(Event)
+        .join(Trip, Event.trip_id == Trip.id)
+        .join(VehicleType, Event.vehicle_type_id == VehicleType.id)
+        .where(Event.scenario_id == scenario.id, Event.event_type == EventType.DRIVING)
+        .group_by(Trip.rotation_id)
+        .subquery()
+    )
+    rows = session.execute(
+        select(
+            Rotation.id,
+            Rotation.vehicle_type_id,
+            mileage.c.distance,
+            events.c.driving_seconds,
+            events.c.energy,
+        )
+        .outerjoin(mileage, mileage.c.rotation_id == Rotation.id)
+        .outerjoin(events, events.c.rotation_id == Rotation.id)
+        .where(Rotation.scenario_id == scenario.id)
+        .order_by(Rotation.id)
+    ).all()
+
+    periods_per_year = get_simulation_period(
+        session=session, scenario=scenario, context=context
+    )[1]
+
+    # Rotations without trips or events have NULL sums, which become NaN and then zero
+    values = np.nan_to_num(np.array(rows, dtype=float).reshape(len(rows), 5))
+    return {
+        "rotation_id": values[:, 0].astype(np.int64),
+        "vehicle_type_id": values[:, 1].astype(np.int64),
+        "mileage": values[:, 2] / 1000 * periods_per_year,
+        "driving_hours": values[:, 3] / 3600 * periods_per_year,
+        "energy_consumption": values[:, 4] * periods_per_year,
+    }
+
+
+def get_line_mileage_per_rotation(
+    session, scenario, context: Optional[QueryContext] = None
+) -> Dict[str, np.ndarray]:
+    """
+    This method gets the annual mileage of each rotation on each line in one grouped query.
+
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :return: A dictionary of arrays with one entry per pair of rotation and line: "rotation_id", "line_id" (-1 for
+        routes without a line) and the annual "mileage" in km.
+    """
+    rows = session.execute(
+        select(Trip.rotation_id, Route.line_id, func.sum(Route.distance))
+        .join(Route, Trip.route_id == Route.id)
+        .where(Trip.scenario_id == scenario.id)
+        .group_by(Trip.rotation_id, Route.line_id)
+        .order_by(Trip.rotation_id, Route.line_id)
+    ).all()
+
+    periods_per_year = get_simulation_period(
+        session=session, scenario=scenario, context=context
+    )[1]
+
+    values = np.array(rows, dtype=float).reshape(len(rows), 3)
+    return {
+        "rotation_id": values[:, 0].astype(np.int64),
+        "line_id": np.nan_to_num(values[:, 1], nan=-1).astype(np.int64),
+        "mileage": np.nan_to_num(values[:, 2]) / 1000 * periods_per_year,
+    }
+
+
+def paid_driver_hours(
+    annual_driver_hours: float, annual_hours_per_driver=1600, buffer=0.1
+) -> float:
+    """
+    This method calculates the annual paid driver hours from the annual driving hours, accounting for a buffer of
+    additional drivers and for the annual working hours of each driver.
+
+    :param annual_driver_hours: The annual driving hours.
+    :param annual_hours_per_driver: The annual working hours of one driver.
+    :param buffer: The share of additional drivers, e.g. to cover sick leave.
+    :return: The annual paid driver hours.
+    """
+    number_drivers = (annual_driver_hours * (1 + buffer)) // annual_hours_per_driver
+    return annual_hours_per_driver * (number_drivers + 1)
+
+
+def _epoch_seconds(session, column):
+    """
+    Build a SQL expression for a timestamp column as a unix timestamp in seconds.
+
+    :param session: A session object, used to determine the database dialect.
+    :param column: The timestamp column.
+    :return: A SQL expression.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.extract("epoch", column)
+    elif dialect == "sqlite":
+        # The timestamps are stored in UTC, and the julian day of the unix epoch is 2440587.5
+        return (func.julianday(column) - 2440587.5) * 86400
+    else:
+        raise ValueError(f"Unsupported database dialect: {dialect}")
+
+
 # Calculate the annual driver hours.
 def calculate_total_driver_hours(
-        session, scenario, annual_hours_per_driver=1600, buffer=0.1
+    session,
+    scenario,
+    annual_hours_per_driver=1600,
+    buffer=0.1,
+    context: Optional[QueryContext] = None,
 ):
-    # Get the driver hours over the simulation period as the sum of the duration of all driving events.
+    """
+    This method calculates the annual paid driver hours. The driver hours over the simulation period are the sum of the
+    duration of all driving and opportunity charging events, which is aggregated in the database.
 
-    driver_hours = datetime.timedelta(seconds=0)
-    driving_and_opcharge_events = session.query(Event).filter(
-        Event.scenario_id == scenario.id,
-        or_(
-            Event.event_type == "DRIVING",
-            Event.event_type == "CHARGING_OPPORTUNITY",
-        ),
-    ).all()
+    :param session: A session object.
+    :param scenario: A scenario object.
+    :param annual_hours_per_driver: The annual working hours of one driver.
+    :param buffer: The share of additional drivers, e.g. to cover sick leave.
+    :param context: Optional :class:`QueryContext` shared with the other queries of the scenario.
+    :return: The annual paid driver hours.
+    """
+    driver_seconds = (
+        session.query(
+            func.sum(_duration_seconds(session, Event.time_start, Event.time_end))
+        )
+        .filter(
+            Event.scenario_id == scenario.id,
+            or_(
+                Event.event_type == "DRIVING",
+                Event.event_type == "CHARGING_OPPORTUNITY",
+            ),
+        )
+        .scalar()
+    )
+    if driver_seconds is None:
+        driver_seconds = 0.0
 
-    for event in driving_and_opcharge_events:
-        driver_hours += event.time_end - event.time_start
     # Annual driver hours are calculated
     annual_driver_hours = (
-            get_simulation_period(session=session, scenario=scenario)[1]
-            * driver_hours.total_seconds()
-            / 3600
+        get_simulation_period(session=session, scenario=scenario, context=context)[1]
+        * float(driver_seconds)
+        / 3600
     )
 
-    number_drivers = (annual_driver_hours * (1 + buffer)) // annual_hours_per_driver
-    actual_driver_hours = annual_hours_per_driver * (number_drivers + 1)
-    return actual_driver_hours
+    return paid_driver_hours(annual_driver_hours, annual_hours_per_driver, buffer)
 
 
 # This method returns the simulation duration using the earliest and latest Event.
-def get_simulation_period(session, scenario):
+def get_simulation_period(session, scenario, context: Optional[QueryContext] = None):
     """
     This method returns the simulation duration using the time_start of the earliest and the time_end of the latest
         driving event. Besides that a factor is calculated which can be multiplied by all considered input parameters
         to obtain the annual quantity of the respective parameter.
     :param session: A session object.
     :param scenario: The considered scenario.
+    :param context: Optional :class:`QueryContext`. If given, the simulation period is only queried once per context.
     :return: A tuple of the simulation duration and the factor needed to obtain annual quantities.
     """
+    if context is not None:
+        return context.simulation_period
+    return _query_simulation_period(session, scenario)
+
 
+def _query_simulation_period(session, scenario):
     # TODO match the temperature with time and accordingly scale down the consumption
     result = (
         session.query(func.min(Event.time_start), func.max(Event.time_end))
@@ -316,13 +972,13 @@ def get_simulation_period(session, scenario):
 
 
 def init_tco_parameters(
-        scenario: Union[Scenario, int, Any],
-        database_url: Optional[str] = None,
-        scenario_tco_parameters: Optional[Dict[str, Any]] = None,
-        vehicle_types: Optional[List[Dict[str, Any]]] = None,
-        battery_types: Optional[List[Dict[str, Any]]] = None,
-        charging_point_types: Optional[List[Dict[str, Any]]] = None,
-        charging_infrastructure: Optional[List[Dict[str, Any]]] = None,
+    scenario: Union[Scenario, int, Any],
+    database_url: Optional[str] = None,
+    scenario_tco_parameters: Optional[Dict[str, Any]] = None,
+    vehicle_types: Optional[List[Dict[str, Any]]] = None,
+    battery_types: Optional[List[Dict[str, Any]]] = None,
+    charging_point_types: Optional[List[Dict[str, Any]]] = None,
+    charging_infrastructure: Optional[List[Dict[str, Any]]] = None,
 ):
     """
     Initialize the TCO parameters for the given scenario in the database.
@@ -341,170 +997,257 @@ def init_tco_parameters(
 
     """
 
+    with create_session(scenario, database_url) as (session, scenario):
+        _init_tco_parameters_in_session(
+            session,
+            scenario,
+            scenario_tco_parameters=scenario_tco_parameters,
+            vehicle_types=vehicle_types,
+            battery_types=battery_types,
+            charging_point_types=charging_point_types,
+            charging_infrastructure=charging_infrastructure,
+        )
+        session.commit()
+
+
+def init_tco_parameters_many(
+    scenario_parameters: Dict[int, Dict[str, Any]],
+    database_url: Optional[str] = None,
+):
+    """
+    Initialize the TCO parameters of many scenarios in one transaction. If the initialization of any scenario fails,
+    no scenario is changed.
+
+    :param scenario_parameters: A dictionary from the scenario ids to dictionaries with the keyword arguments of
+        :func:`init_tco_parameters`, i.e. ``scenario_tco_parameters``, ``vehicle_types``, ``battery_types``,
+        ``charging_point_types`` and ``charging_infrastructure``.
+    :param database_url: The database URL to connect to. Defaults to the environment variable ``DATABASE_URL``.
+    """
+    if database_url is None:
+        if "DATABASE_URL" in os.environ:
+            database_url = os.environ.get("DATABASE_URL")
+        else:
+            raise ValueError("No database URL specified.")
+
+    with Session(get_engine(database_url)) as session:
+        try:
+            scenarios = {
+                scenario.id: scenario
+                for scenario in session.query(Scenario).filter(
+                    Scenario.id.in_(list(scenario_parameters))
+                )
+            }
+            for scenario_id, parameters in scenario_parameters.items():
+                if scenario_id not in scenarios:
+                    raise ValueError(f"There is no scenario with id {scenario_id}.")
+                _init_tco_parameters_in_session(
+                    session, scenarios[scenario_id], **parameters
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+
+def _init_tco_parameters_in_session(
+    session,
+    scenario: Scenario,
+    scenario_tco_parameters: Optional[Dict[str, Any]] = None,
+    vehicle_types: Optional[List[Dict[str, Any]]] = None,
+    battery_types: Optional[List[Dict[str, Any]]] = None,
+    charging_point_types: Optional[List[Dict[str, Any]]] = None,
+    charging_infrastructure: Optional[List[Dict[str, Any]]] = None,
+):
+    # The rows are updated with set-based UPDATE statements, after the ids have been validated with one query per table.
     tco_keys = {"name", "procurement_cost", "useful_life", "cost_escalation"}
 
-    with create_session(scenario, database_url) as (session, scenario):
-        scenario.tco_parameters = scenario_tco_parameters
-        # Add tco parameters to vehicle types
-        if vehicle_types is not None:
-            for vt_info in vehicle_types:
-                vt = (
-                    session.query(VehicleType)
-                    .filter(VehicleType.id == vt_info.get("id"), VehicleType.scenario_id == scenario.id)
-                    .all()
+    def tco_parameters_of(info):
+        return {key: info.get(key) for key in tco_keys if key in info}
+
+    def assert_ids_in_scenario(table, ids) -> None:
+        found = Counter(
+            session.scalars(
+                select(table.id).where(
+                    table.id.in_(ids), table.scenario_id == scenario.id
+                )
+            )
+        )
+        for table_id in ids:
+            assert found[table_id] == 1, (
+                f"There should be only one {table.__name__} with id {table_id} found in scenario "
+                f"{scenario.id}. Now there are {found[table_id]}."
+            )
+
+    # The stations with opportunity charging events in this scenario
+    opportunity_charging_station_ids = (
+        select(distinct(Event.station_id))
+        .where(
+            Event.event_type == EventType.CHARGING_OPPORTUNITY,
+            Event.scenario_id == scenario.id,
+        )
+        .scalar_subquery()
+    )
+
+    scenario.tco_parameters = scenario_tco_parameters
+
+    # Add tco parameters to vehicle types
+    if vehicle_types is not None:
+        assert_ids_in_scenario(
+            VehicleType, [vt_info.get("id") for vt_info in vehicle_types]
+        )
+        if len(vehicle_types) > 0:
+            session.execute(
+                update(VehicleType),
+                [
+                    {
+                        "id": vt_info.get("id"),
+                        "tco_parameters": tco_parameters_of(vt_info),
+                    }
+                    for vt_info in vehicle_types
+                ],
+            )
+
+    # Add tco parameters to battery types
+    if battery_types is not None:
+        existing_battery_types = [
+            bt_info for bt_info in battery_types if "id" in bt_info
+        ]
+        new_battery_types = [
+            bt_info for bt_info in battery_types if "id" not in bt_info
+        ]
+
+        assert_ids_in_scenario(
+            BatteryType, [bt_info.get("id") for bt_info in existing_battery_types]
+        )
+        if len(existing_battery_types) > 0:
+            session.execute(
+                update(BatteryType),
+                [
+                    {
+                        "id": bt_info.get("id"),
+                        "tco_parameters": tco_parameters_of(bt_info),
+                    }
+                    for bt_info in existing_battery_types
+                ],
+            )
+
+        if len(new_battery_types) > 0:
+            vehicle_types_by_id = {
+                vehicle_type.id: vehicle_type
+                for vehicle_type in session.query(VehicleType).filter(
+                    VehicleType.id.in_(
+                        [
+                            bt_info.get("vehicle_type_id")
+                            for bt_info in new_battery_types
+                        ]
+                    )
                 )
+            }
+            for bt_info in new_battery_types:
+                new_battery_type = BatteryType(
+                    scenario_id=scenario.id,
+                    specific_mass=bt_info.get("specific_mass", 1.0),
+                    chemistry=bt_info.get("chemistry", "unknown"),
+                    tco_parameters=tco_parameters_of(bt_info),
+                )
+                session.add(new_battery_type)
 
-                assert len(vt) == 1, (
-                    f"There should be only one VehicleType with id {vt_info.get('id')} found in scenario "
-                    f"{scenario.id}. Now there are {len(vt)}.")
-
-                vt = vt[0]
-                vt_tco_parameters = {
-                    key: vt_info.get(key) for key in tco_keys if key in vt_info
-                }
-                vt.tco_parameters = vt_tco_parameters
-
-        # Add tco parameters to battery types
-        if battery_types is not None:
-            for bt_info in battery_types:
-                bt_tco_parameters = {
-                    key: bt_info.get(key) for key in tco_keys if key in bt_info
-                }
-
-                if "id" not in bt_info:
-                    new_battery_type = BatteryType(
-                        scenario_id=scenario.id,
-                        specific_mass=bt_info.get("specific_mass", 1.0),
-                        chemistry=bt_info.get("chemistry", "unknown"),
-                        tco_parameters=bt_tco_parameters,
+                vehicle_type_id = bt_info.get("vehicle_type_id")
+                if vehicle_type_id not in vehicle_types_by_id:
+                    raise ValueError(
+                        f"There is no VehicleType with id {vehicle_type_id}."
                     )
-                    session.add(new_battery_type)
-
-                    vehicle_type_id = bt_info.get("vehicle_type_id")
-                    vehicle_type = session.query(VehicleType).filter(
-                        VehicleType.id == vehicle_type_id
-                    ).one()
-                    assert vehicle_type.scenario_id == scenario.id, (
-                        f"VehicleType with id {vehicle_type_id} is not in scenario {scenario.id}. Please add this battery to the correct VehicleType."
+                vehicle_type = vehicle_types_by_id[vehicle_type_id]
+                assert (
+                    vehicle_type.scenario_id == scenario.id
+                ), f"VehicleType with id {vehicle_type_id} is not in scenario {scenario.id}. Please add this battery to the correct VehicleType."
+                vehicle_type.battery_type = new_battery_type
+
+    # Add tco parameters to charging point types
+    if charging_point_types is not None:
+        existing_cp_types = [
+            cp_info for cp_info in charging_point_types if "id" in cp_info
+        ]
+        new_cp_types = [
+            cp_info for cp_info in charging_point_types if "id" not in cp_info
+        ]
+
+        assert_ids_in_scenario(
+            ChargingPointType, [cp_info.get("id") for cp_info in existing_cp_types]
+        )
+        if len(existing_cp_types) > 0:
+            session.execute(
+                update(ChargingPointType),
+                [
+                    {
+                        "id": cp_info.get("id"),
+                        "tco_parameters": tco_parameters_of(cp_info),
+                    }
+                    for cp_info in existing_cp_types
+                ],
+            )
+
+        for cp_info in new_cp_types:
+            if cp_info.get("type") not in ("depot", "opportunity"):
+                raise ValueError(f"Unknown charging point type: {cp_info.get('type')}")
+
+            new_cp_type = ChargingPointType(
+                name=cp_info.get("name", "Unknown Charging Point"),
+                scenario_id=scenario.id,
+                tco_parameters=tco_parameters_of(cp_info),
+            )
+            session.add(new_cp_type)
+            session.flush()
+
+            match cp_info.get("type"):
+                case "depot":
+                    # Add to areas
+                    charging_area_ids = (
+                        select(Area.id)
+                        .where(
+                            Area.processes.any(Process.electric_power.isnot(None)),
+                            Area.scenario_id == scenario.id,
+                        )
+                        .scalar_subquery()
                     )
-                    vehicle_type.battery_type = new_battery_type
-
-                else:
-                    battery_type_id = bt_info.get("id")
-                    battery_type = (
-                        session.query(BatteryType)
-                        .filter(BatteryType.id == battery_type_id, BatteryType.scenario_id == scenario.id, )
-                        .all()
+                    session.execute(
+                        update(Area)
+                        .where(Area.id.in_(charging_area_ids))
+                        .values(charging_point_type_id=new_cp_type.id)
+                        .execution_options(synchronize_session="fetch")
                     )
-                    assert len(battery_type) == 1, (
-                        f"There should be only one BatteryType with id {battery_type_id} found in scenario "
-                        f"{scenario.id}. Now there are {len(battery_type)}.")
-
-                    battery_type = battery_type[0]
-                    battery_type.tco_parameters = bt_tco_parameters
-
-        # Add tco parameters to charging point types
-
-        if charging_point_types is not None:
-            for cp_info in charging_point_types:
-                cp_tco_parameters = {
-                    key: cp_info.get(key) for key in tco_keys if key in cp_info
-                }
-                if "id" not in cp_info:
-                    new_cp_type = ChargingPointType(
-                        name=cp_info.get("name", "Unknown Charging Point"),
-                        scenario_id=scenario.id,
-                        tco_parameters=cp_tco_parameters,
+                case "opportunity":
+                    # Add to stations
+                    session.execute(
+                        update(Station)
+                        .where(Station.id.in_(opportunity_charging_station_ids))
+                        .values(charging_point_type_id=new_cp_type.id)
+                        .execution_options(synchronize_session="fetch")
                     )
-                    session.add(new_cp_type)
-
-                    match cp_info.get("type"):
-                        case "depot":
-                            # Add to areas
-                            charging_areas = session.query(Area).filter(
-                                Area.processes.any(Process.electric_power.isnot(None)),
-                                Area.scenario_id == scenario.id,
-                            )
-                            for area in charging_areas:
-                                area.charging_point_type = new_cp_type
-                        case "opportunity":
-                            # Add to stations
-                            charging_station_ids = (
-                                session.query(distinct(Event.station_id))
-                                .filter(
-                                    Event.event_type == EventType.CHARGING_OPPORTUNITY,
-                                    Event.scenario_id == scenario.id,
-                                )
-                                .all()
-                            )
-                            if len(charging_station_ids) != 0:
-                                for station_id in charging_station_ids:
-                                    station = (
-                                        session.query(Station)
-                                        .filter(Station.id == station_id[0])
-                                        .one()
-                                    )
-                                    station.charging_point_type = new_cp_type
-                        case _:
-                            raise ValueError(
-                                f"Unknown charging point type: {cp_info.get('type')}"
-                            )
-                else:
-                    charging_point_type_id = cp_info.get("id")
-                    charging_point_type = (
-                        session.query(ChargingPointType)
-                        .filter(ChargingPointType.id == charging_point_type_id,
-                                ChargingPointType.scenario_id == scenario.id)
-                        .all()
+
+    # Add tco parameters to charging infrastructure
+    if charging_infrastructure is not None:
+        for infra_info in charging_infrastructure:
+
+            infra_tco_parameters = tco_parameters_of(infra_info)
+
+            match infra_info.get("type"):
+                case "station":
+                    station_ids = opportunity_charging_station_ids
+                case "depot":
+                    station_ids = (
+                        select(Depot.station_id)
+                        .where(Depot.scenario_id == scenario.id)
+                        .scalar_subquery()
+                    )
+                case _:
+                    raise ValueError(
+                        f"Unknown infrastructure type: {infra_info.get('type')}"
                     )
-                    assert len(charging_point_type) == 1, (
-                        f"There should be only one ChargingPointType with id {charging_point_type_id} found in scenario "
-                        f"{scenario.id}. Now there are {len(charging_point_type)}.")
-
-                    charging_point_type = charging_point_type[0]
-                    charging_point_type.tco_parameters = cp_tco_parameters
-
-        # Add tco parameters to charging infrastructure
-        if charging_infrastructure is not None:
-            for infra_info in charging_infrastructure:
-
-                infra_tco_parameters = {
-                    key: infra_info.get(key) for key in tco_keys if key in infra_info
-                }
-
-                match infra_info.get("type"):
-                    case "station":
-                        charging_station_ids = (
-                            session.query(distinct(Event.station_id))
-                            .filter(
-                                Event.event_type == EventType.CHARGING_OPPORTUNITY,
-                                Event.scenario_id == scenario.id,
-                            )
-                            .all()
-                        )
-                        for station_id in charging_station_ids:
-                            station = (
-                                session.query(Station)
-                                .filter(Station.id == station_id[0])
-                                .one()
-                            )
-                            station.tco_parameters = infra_tco_parameters
-                    case "depot":
-                        depot_stations = (
-                            session.query(Depot.station_id)
-                            .filter(Depot.scenario_id == scenario.id)
-                            .all()
-                        )
-                        for station_id in depot_stations:
-                            station = (
-                                session.query(Station)
-                                .filter(Station.id == station_id[0])
-                                .one()
-                            )
-                            station.tco_parameters = infra_tco_parameters
-                    case _:
-                        raise ValueError(
-                            f"Unknown infrastructure type: {infra_info.get('type')}"
-                        )
 
-        session.commit()
+            session.execute(
+                update(Station)
+                .where(Station.id.in_(station_ids))
+                .values(tco_parameters=infra_tco_parameters)
+                .execution_options(synchronize_session="fetch")
+            )
@@ -0,0 +1,160 @@
+# This file contains the timing and memory profiling of the phases of a TCO calculation.
+
+import functools
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class PhaseRecord:
+    """The wall time and memory of one phase of a TCO calculation."""
+
+    name: str
+    "The name of the phase, e.g. the name of the data query."
+
+    depth: int
+    "The nesting depth of the phase. Phases with depth 0 are top-level phases."
+
+    start: float
+    "The start of the phase in seconds since the profiler was created."
+
+    wall_time: float
+    "The wall time of the phase in seconds."
+
+    peak_memory: Optional[int] = None
+    """
+    The peak memory allocated by Python during the phase, above the allocated memory at its start, in bytes. Only
+    recorded if the profiler traces memory.
+    """
+
+
+class Profiler:
+    """
+    Record the wall time and peak memory of the phases of a TCO calculation.
+
+    Pass a profiler to :class:`eflips.tco.TCOCalculator` to record the extraction of each quantity from the database,
+    the creation of the OPEX items and the calculation::
+
+        profiler = Profiler(trace_memory=True)
+        tco_calculator = TCOCalculator(scenario, profiler=profiler)
+        tco_calculator.calculate()
+        print(profiler.report())
+
+    The records can be forwarded to other telemetry systems with the callback, which is called with each
+    :class:`PhaseRecord` when its phase ends.
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        callback: Optional[Callable[[PhaseRecord], Any]] = None,
+    ):
+        """
+        :param trace_memory: Whether to record the peak memory of each phase with :mod:`tracemalloc`. Tracing memory
+            slows down the calculation noticeably.
+        :param callback: Optional function called with each :class:`PhaseRecord` when its phase ends.
+        """
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records: List[PhaseRecord] = []
+        "The records of all completed phases, in the order they ended."
+
+        self._origin = time.perf_counter()
+        self._stack: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        A context manager recording a phase. Phases can be nested.
+
+        :param name: The name of the phase.
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the peak of the enclosing phase before resetting it for this phase
+            if len(self._stack) > 0:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+
+        entry = {"memory_at_start": current, "peak": current}
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start
+            self._stack.pop()
+
+            peak_memory = None
+            if self.trace_memory:
+                entry["peak"] = max(entry["peak"], tracemalloc.get_traced_memory()[1])
+                peak_memory = entry["peak"] - entry["memory_at_start"]
+                if len(self._stack) > 0:
+                    self._stack[-1]["peak"] = max(
+                        self._stack[-1]["peak"], entry["peak"]
+                    )
+                if started_tracing:
+                    tracemalloc.stop()
+
+            record = PhaseRecord(
+                name=name,
+                depth=len(self._stack),
+                start=start - self._origin,
+                wall_time=wall_time,
+                peak_memory=peak_memory,
+            )
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Get the records of all phases in the order they started, e.g. to create a :class:`pandas.DataFrame`.
+
+        :return: A list of dictionaries with the fields of :class:`PhaseRecord`.
+        """
+        return [
+            asdict(record)
+            for record in sorted(self.records, key=lambda record: record.start)
+        ]
+
+
+def profile_phase(profiler: Optional[Profiler], name: str):
+    """
+    Record a phase with the profiler, if there is one.
+
+    :param profiler: A :class:`Profiler` or None.
+    :param name: The name of the phase.
+    :return: A context manager.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name)
+
+
+def profiled_method(name: str):
+    """
+    Decorate a method to record each call as a phase with the ``profiler`` attribute of its object, if there is one.
+
+    :param name: The name of the phase.
+    :return: A decorator.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with profile_phase(getattr(self, "profiler", None), name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,246 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from eflips.model import Scenario
+
+from eflips.tco.cost_items import CapexItem
+from eflips.tco.data_queries import (
+    load_capex_items_vehicle,
+    load_capex_items_battery,
+    load_capex_items_infrastructure,
+    get_charging_energy_profile,
+    get_vehicle_type_statistics,
+    paid_driver_hours,
+    QueryContext,
+)
+from eflips.tco.profiling import Profiler, profile_phase
+from eflips.tco.util import create_session
+
+
+@dataclass
+class ScenarioFacts:
+    """
+    The quantities of a scenario the TCO calculation is based on, extracted from the database.
+
+    A ScenarioFacts object holds no database objects and can be serialized with :meth:`to_dict` or pickled, e.g. to
+    send it to worker processes. A :class:`eflips.tco.TCOCalculator` can be created from it without a database
+    connection.
+    """
+
+    scenario_id: int
+    "The id of the scenario the facts were extracted from."
+
+    tco_parameters: Dict[str, Any]
+    "The tco parameters of the scenario."
+
+    annual_fleet_mileage: float
+    "The annual mileage of the whole fleet in km."
+
+    mileage_per_vehicle_type: Dict[str, float]
+    "The annual mileage in km by vehicle type id (as a string)."
+
+    total_driver_hours: float
+    "The annual paid driver hours."
+
+    capex_items: List[CapexItem] = field(default_factory=list)
+    """
+    The vehicles, batteries, charging points and stations of the scenario with their quantities and tco parameters.
+    """
+
+    energy_consumption_simulated: Optional[float] = None
+    "The simulated annual energy consumption in kWh. Only extracted for the energy consumption mode 'simulated'."
+
+    vehicle_type_statistics: Optional[Dict[str, Dict[str, float]]] = None
+    """
+    The annual mileage, driving hours and simulated energy consumption by vehicle type id (as a string), see
+    :func:`eflips.tco.data_queries.get_vehicle_type_statistics`.
+    """
+
+    charging_energy_profile: Optional[Dict[str, Any]] = None
+    """
+    The annual charging energy by hour of the simulation period, see
+    :func:`eflips.tco.data_queries.get_charging_energy_profile`. Only extracted if the tco parameters contain an
+    ``electricity_tariff``, in both energy consumption modes.
+    """
+
+    @staticmethod
+    def from_vehicle_type_statistics(
+        scenario_id: int,
+        tco_parameters: Dict[str, Any],
+        capex_items: List[CapexItem],
+        vehicle_type_statistics: Dict[str, Dict[str, float]],
+        energy_consumption_mode: str = "simulated",
+        charging_energy_profile: Optional[Dict[str, Any]] = None,
+    ) -> "ScenarioFacts":
+        """
+        Create the facts of a scenario, deriving the fleet quantities from the quantities per vehicle type.
+
+        :param scenario_id: The id of the scenario.
+        :param tco_parameters: The tco parameters of the scenario.
+        :param capex_items: The CAPEX items of the scenario.
+        :param vehicle_type_statistics: The quantities per vehicle type, see
+            :func:`eflips.tco.data_queries.get_vehicle_type_statistics`.
+        :param energy_consumption_mode: Either "simulated" or "constant", see :meth:`from_session`.
+        :param charging_energy_profile: Optional charging energy profile, see
+            :func:`eflips.tco.data_queries.get_charging_energy_profile`.
+        :return: A :class:`ScenarioFacts` object.
+        """
+        return ScenarioFacts(
+            scenario_id=scenario_id,
+            tco_parameters=tco_parameters,
+            annual_fleet_mileage=sum(
+                statistics["mileage"] for statistics in vehicle_type_statistics.values()
+            ),
+            mileage_per_vehicle_type={
+                vehicle_type_id: statistics["mileage"]
+                for vehicle_type_id, statistics in vehicle_type_statistics.items()
+            },
+            total_driver_hours=paid_driver_hours(
+                sum(
+                    statistics["driver_hours"]
+                    for statistics in vehicle_type_statistics.values()
+                )
+            ),
+            capex_items=capex_items,
+            energy_consumption_simulated=(
+                sum(
+                    statistics["energy_consumption"]
+                    for statistics in vehicle_type_statistics.values()
+                )
+                if energy_consumption_mode == "simulated"
+                else None
+            ),
+            vehicle_type_statistics=vehicle_type_statistics,
+            charging_energy_profile=charging_energy_profile,
+        )
+
+    @staticmethod
+    def from_session(
+        session,
+        scenario: Scenario,
+        energy_consumption_mode: str = "simulated",
+        chunk_size: Optional[int] = None,
+        profiler: Optional[Profiler] = None,
+    ) -> "ScenarioFacts":
+        """
+        Extract the facts of a scenario using an open session.
+
+        :param session: A session object.
+        :param scenario: A scenario object.
+        :param energy_consumption_mode: Either "simulated", to extract the simulated energy consumption, or "constant",
+            to skip it. The charging energy profile is extracted in both modes if the scenario's tco parameters
+            contain an ``electricity_tariff``, as it is taken from the charging events.
+        :param chunk_size: Optional number of events to process at once when counting the charging slots and binning the
+            charging energy, to bound the memory use for scenarios with many events. The other quantities are aggregated
+            in the database.
+        :param profiler: Optional :class:`eflips.tco.profiling.Profiler` recording each query as a phase.
+        :return: A :class:`ScenarioFacts` object.
+        """
+        if energy_consumption_mode not in ("simulated", "constant"):
+            raise ValueError(
+                f"Unknown energy consumption mode: {energy_consumption_mode}"
+            )
+
+        # The simulation period is shared by most of the queries
+        context = QueryContext(session, scenario)
+        with profile_phase(profiler, "get_simulation_period"):
+            context.simulation_period
+
+        # Get the number of vehicles, the battery capacity and the number of charging infrastructure and slots. There
+        # are only depot or terminal stop (opportunity) charging stations.
+        with profile_phase(profiler, "load_capex_items_vehicle"):
+            capex_items = list(load_capex_items_vehicle(session, scenario))
+        with profile_phase(profiler, "load_capex_items_battery"):
+            capex_items += list(load_capex_items_battery(session, scenario))
+        with profile_phase(profiler, "load_capex_items_infrastructure"):
+            capex_items += list(
+                load_capex_items_infrastructure(
+                    session, scenario, chunk_size=chunk_size
+                )
+            )
+
+        # The mileage, driver hours and energy consumption of the fleet are the sums over the vehicle types
+        with profile_phase(profiler, "get_vehicle_type_statistics"):
+            vehicle_type_statistics = get_vehicle_type_statistics(
+                session, scenario, context=context
+            )
+
+        # The timing of the charging is only needed to apply a time-of-use tariff
+        tco_parameters = dict(scenario.tco_parameters)
+        charging_energy_profile = None
+        if "electricity_tariff" in tco_parameters:
+            with profile_phase(profiler, "get_charging_energy_profile"):
+                charging_energy_profile = get_charging_energy_profile(
+                    session, scenario, context=context, chunk_size=chunk_size
+                )
+
+        return ScenarioFacts.from_vehicle_type_statistics(
+            scenario_id=scenario.id,
+            tco_parameters=tco_parameters,
+            capex_items=capex_items,
+            vehicle_type_statistics=vehicle_type_statistics,
+            energy_consumption_mode=energy_consumption_mode,
+            charging_energy_profile=charging_energy_profile,
+        )
+
+    @staticmethod
+    def from_database(
+        scenario: Union[Scenario, int, Any],
+        database_url: Optional[str] = None,
+        energy_consumption_mode: str = "simulated",
+        chunk_size: Optional[int] = None,
+    ) -> "ScenarioFacts":
+        """
+        Extract the facts of a scenario from the database.
+
+        :param scenario: Either a :class:`eflips.model.Scenario` object or an integer specifying the ID of a scenario
+            in the database.
+        :param database_url: Optional database URL to connect to if the scenario is provided as an integer.
+        :param energy_consumption_mode: Either "simulated" or "constant", see :meth:`from_session`.
+        :param chunk_size: Optional number of events to process at once, see :meth:`from_session`.
+        :return: A :class:`ScenarioFacts` object.
+        """
+        with create_session(scenario, database_url) as (session, scenario):
+            return ScenarioFacts.from_session(
+                session, scenario, energy_consumption_mode, chunk_size
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the facts into a JSON-serializable dictionary, which can be read by :meth:`from_dict`.
+
+        :return: A dictionary.
+        """
+        return {
+            "scenario_id": self.scenario_id,
+            "tco_parameters": self.tco_parameters,
+            "annual_fleet_mileage": self.annual_fleet_mileage,
+            "mileage_per_vehicle_type": self.mileage_per_vehicle_type,
+            "total_driver_hours": self.total_driver_hours,
+            "capex_items": [item.to_dict() for item in self.capex_items],
+            "energy_consumption_simulated": self.energy_consumption_simulated,
+            "vehicle_type_statistics": self.vehicle_type_statistics,
+            "charging_energy_profile": self.charging_energy_profile,
+        }
+
+    @staticmethod
+    def from_dict(facts_dict: Dict[str, Any]) -> "ScenarioFacts":
+        """
+        Create a ScenarioFacts object from a dictionary created by :meth:`to_dict`.
+
+        :param facts_dict: The dictionary.
+        :return: A :class:`ScenarioFacts` object.
+        """
+        return ScenarioFacts(
+            scenario_id=facts_dict["scenario_id"],
+            tco_parameters=facts_dict["tco_parameters"],
+            annual_fleet_mileage=facts_dict["annual_fleet_mileage"],
+            mileage_per_vehicle_type=facts_dict["mileage_per_vehicle_type"],
+            total_driver_hours=facts_dict["total_driver_hours"],
+            capex_items=[
+                CapexItem.from_dict(item) for item in facts_dict["capex_items"]
+            ],
+            energy_consumption_simulated=facts_dict.get("energy_consumption_simulated"),
+            vehicle_type_statistics=facts_dict.get("vehicle_type_statistics"),
+            charging_energy_profile=facts_dict.get("charging_energy_profile"),
+        )
@@ -0,0 +1,228 @@
+# This file contains the time-of-use electricity tariffs and the binning of the charging energy into time bins.
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+@dataclass
+class TariffPeriod:
+    """
+    A period of a :class:`TariffSchedule` with its own electricity price, e.g. the peak hours on weekdays in winter.
+    """
+
+    price: float
+    "The electricity price in EUR/kWh."
+
+    start_hour: int = 0
+    "The first hour of the day of the period in local time."
+
+    end_hour: int = 24
+    """
+    The hour of the day the period ends in local time, exclusive. If it is before the start hour, the period spans
+    midnight.
+    """
+
+    weekdays: Sequence[int] = (0, 1, 2, 3, 4, 5, 6)
+    "The days of the week of the period, with Monday as 0 and Sunday as 6."
+
+    months: Sequence[int] = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12)
+    "The months of the period, with January as 1."
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert this period into a JSON-serializable dictionary.
+
+        :return: A dictionary.
+        """
+        return {
+            "price": self.price,
+            "start_hour": self.start_hour,
+            "end_hour": self.end_hour,
+            "weekdays": list(self.weekdays),
+            "months": list(self.months),
+        }
+
+
+@dataclass
+class TariffSchedule:
+    """
+    A time-of-use electricity tariff with prices depending on the hour of the day, the day of the week and the month.
+
+    The price of an hour is the price of the last period that contains it, or the base price if there is none. A
+    schedule can be stored in the scenario's tco parameters as ``electricity_tariff`` in the format of :meth:`to_dict`,
+    for example a night tariff from 22:00 to 6:00 and a winter peak on weekday evenings::
+
+        TariffSchedule(
+            base_price=0.25,
+            periods=[
+                TariffPeriod(price=0.15, start_hour=22, end_hour=6),
+                TariffPeriod(price=0.35, start_hour=17, end_hour=20, weekdays=range(5), months=[11, 12, 1, 2]),
+            ],
+            timezone="Europe/Berlin",
+        )
+    """
+
+    base_price: float
+    "The electricity price in EUR/kWh outside all periods."
+
+    periods: List[TariffPeriod] = field(default_factory=list)
+    "The periods with other prices. Later periods take precedence."
+
+    timezone: str = "UTC"
+    "The time zone of the hours of the periods, e.g. 'Europe/Berlin'."
+
+    def price_table(self) -> np.ndarray:
+        """
+        Get the price of every hour of the week in every month.
+
+        :return: An array of the shape (12, 7, 24), indexed by the month (January as 0), the day of the week (Monday as
+            0) and the hour of the day.
+        """
+        table = np.full((12, 7, 24), float(self.base_price))
+        hours = np.arange(24)
+        for period in self.periods:
+            if period.start_hour <= period.end_hour:
+                in_hours = (hours >= period.start_hour) & (hours < period.end_hour)
+            else:
+                in_hours = (hours >= period.start_hour) | (hours < period.end_hour)
+            months = np.asarray(period.months, dtype=int) - 1
+            weekdays = np.asarray(period.weekdays, dtype=int)
+            table[np.ix_(months, weekdays, np.flatnonzero(in_hours))] = period.price
+        return table
+
+    def prices(self, time: np.ndarray) -> np.ndarray:
+        """
+        Get the price at each point in time.
+
+        :param time: Unix timestamps in seconds.
+        :return: The prices in EUR/kWh.
+        """
+        # pandas converts the time zone of all timestamps at once
+        import pandas as pd
+
+        local_time = pd.DatetimeIndex(
+            pd.to_datetime(np.asarray(time, dtype=float), unit="s", utc=True)
+        ).tz_convert(self.timezone)
+        return self.price_table()[
+            np.asarray(local_time.month) - 1,
+            np.asarray(local_time.dayofweek),
+            np.asarray(local_time.hour),
+        ]
+
+    def energy_cost(self, energy_profile: Dict[str, Any]) -> float:
+        """
+        Calculate the cost of the energy of a charging energy profile, with the price at the start of each time bin.
+
+        :param energy_profile: A charging energy profile, see
+            :func:`eflips.tco.data_queries.get_charging_energy_profile`.
+        :return: The cost in EUR.
+        """
+        energy = np.asarray(energy_profile["energy"], dtype=float)
+        bin_starts = energy_profile["origin"] + energy_profile[
+            "resolution"
+        ] * np.arange(len(energy))
+        return float(np.dot(energy, self.prices(bin_starts)))
+
+    def average_price(self, energy_profile: Dict[str, Any]) -> float:
+        """
+        Calculate the average price of the energy of a charging energy profile.
+
+        :param energy_profile: A charging energy profile, see
+            :func:`eflips.tco.data_queries.get_charging_energy_profile`.
+        :return: The average price in EUR/kWh. The base price if the profile contains no energy.
+        """
+        total_energy = float(np.sum(energy_profile["energy"]))
+        if total_energy == 0:
+            return float(self.base_price)
+        return self.energy_cost(energy_profile) / total_energy
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert this schedule into a JSON-serializable dictionary, which can be read by :meth:`from_dict`.
+
+        :return: A dictionary.
+        """
+        return {
+            "base_price": self.base_price,
+            "periods": [period.to_dict() for period in self.periods],
+            "timezone": self.timezone,
+        }
+
+    @staticmethod
+    def from_dict(schedule_dict: Dict[str, Any]) -> "TariffSchedule":
+        """
+        Create a TariffSchedule from a dictionary created by :meth:`to_dict`.
+
+        :param schedule_dict: The dictionary.
+        :return: A :class:`TariffSchedule`.
+        """
+        return TariffSchedule(
+            base_price=schedule_dict["base_price"],
+            periods=[
+                TariffPeriod(**period) for period in schedule_dict.get("periods", [])
+            ],
+            timezone=schedule_dict.get("timezone", "UTC"),
+        )
+
+
+def bin_energy(
+    time_start: np.ndarray,
+    time_end: np.ndarray,
+    energy: np.ndarray,
+    origin: float,
+    resolution: float,
+    number_of_bins: int,
+) -> np.ndarray:
+    """
+    Split the energy of charging events into time bins, assuming a constant charging power during each event.
+
+    The first and the last bin of each event get the energy of the part of the event within them. The bins in between
+    are covered completely, so their charging power is summed up with a difference array and a cumulative sum, without
+    a loop over the events. Events within a single bin, including events without a duration, are assigned to it
+    completely.
+
+    :param time_start: The start of each event as a unix timestamp.
+    :param time_end: The end of each event as a unix timestamp.
+    :param energy: The energy of each event in kWh.
+    :param origin: The start of the first bin as a unix timestamp. All events must start at or after it.
+    :param resolution: The width of the bins in seconds.
+    :param number_of_bins: The number of bins. All events must end before the end of the last bin.
+    :return: The energy in each bin.
+    """
+    # Relative to the origin, to avoid the loss of precision with large timestamps
+    time_start = np.asarray(time_start, dtype=float) - origin
+    time_end = np.asarray(time_end, dtype=float) - origin
+    energy = np.asarray(energy, dtype=float)
+
+    start_bin = np.clip((time_start // resolution).astype(int), 0, number_of_bins - 1)
+    end_bin = np.clip((time_end // resolution).astype(int), 0, number_of_bins - 1)
+
+    single_bin = start_bin == end_bin
+    profile = np.bincount(
+        start_bin[single_bin], weights=energy[single_bin], minlength=number_of_bins
+    )
+
+    spanning = ~single_bin
+    start_bin, end_bin = start_bin[spanning], end_bin[spanning]
+    time_start, time_end = time_start[spanning], time_end[spanning]
+    power = energy[spanning] / (time_end - time_start)
+
+    profile += np.bincount(
+        start_bin,
+        weights=power * ((start_bin + 1) * resolution - time_start),
+        minlength=number_of_bins,
+    )
+    profile += np.bincount(
+        end_bin,
+        weights=power * (time_end - end_bin * resolution),
+        minlength=number_of_bins,
+    )
+
+    power_change = np.bincount(
+        start_bin + 1, weights=power, minlength=number_of_bins + 1
+    )
+    power_change -= np.bincount(end_bin, weights=power, minlength=number_of_bins + 1)
+    profile += np.cumsum(power_change[:number_of_bins]) * resolution
+    return profile
@@ -1,23 +1,285 @@
 from eflips.model import (
-    Scenario, Trip, Rotation,
+    Scenario,
 )
 
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, List, Tuple, Mapping, Sequence, Union, TYPE_CHECKING
 
-from eflips.tco.data_queries import (
-    load_capex_items_vehicle,
-    load_capex_items_battery,
-    load_capex_items_infrastructure,
-    get_annual_fleet_mileage,
-    calculate_total_driver_hours,
-    calc_energy_consumption_simulated,
-    get_mileage_per_vehicle_type,
-)
+from eflips.tco.scenario_facts import ScenarioFacts
 
-from eflips.tco.cost_items import CapexItem, OpexItem, CapexItemType, OpexItemType, net_present_value
+from eflips.tco.cost_items import (
+    CapexItem,
+    OpexItem,
+    CapexItemType,
+    OpexItemType,
+    capex_cash_flows,
+    capex_present_value,
+    discount_cash_flows,
+    opex_cash_flows,
+    opex_present_value,
+)
+from eflips.tco.profiling import Profiler, profile_phase, profiled_method
+from eflips.tco.tariffs import TariffSchedule
 from eflips.tco.util import create_session
 
-import pandas as pd
+if TYPE_CHECKING:
+    from eflips.tco.cache import FactsCache
+
+import numpy as np
+
+CAPEX_ITEM_PARAMETERS = ("procurement_cost", "useful_life", "cost_escalation")
+"The parameters of a CAPEX item that can be varied in :meth:`TCOCalculator.calculate_many`."
+
+SCENARIO_PARAMETERS = ("project_duration", "interest_rate", "inflation_rate")
+"The parameters of the scenario that affect all items."
+
+
+@dataclass
+class TCOBatchResult:
+    """
+    The results of :meth:`TCOCalculator.calculate_many`. Each array has one entry per row of the parameter table.
+    """
+
+    tco_over_project_duration: np.ndarray
+    "The present value of all costs over the project duration."
+
+    tco_unit_distance: np.ndarray
+    "The specific TCO per km."
+
+    tco_by_type: Dict[str, np.ndarray]
+    "The specific TCO per km by cost type."
+
+
+@dataclass
+class TCOResult:
+    """
+    The costs of all CAPEX and OPEX items computed by :meth:`TCOCalculator.calculate`. Each array has one entry per
+    item, CAPEX items first.
+    """
+
+    item_names: np.ndarray
+    "The names of the items."
+
+    type_codes: np.ndarray
+    "The index of the type of each item in :attr:`type_names`."
+
+    type_names: Tuple[str, ...]
+    "The names of the item types, in the order of their first occurrence."
+
+    cost: np.ndarray
+    "The present value of the costs of each item over the project duration."
+
+    specific_cost: np.ndarray
+    "The cost of each item per km."
+
+    def tco_by_type(self) -> Dict[str, float]:
+        """
+        Sum up the specific cost per item type.
+
+        :return: A dictionary from type names to the specific cost per km.
+        """
+        by_type = np.bincount(
+            self.type_codes, weights=self.specific_cost, minlength=len(self.type_names)
+        )
+        return {
+            type_name: float(value)
+            for type_name, value in zip(self.type_names, by_type)
+        }
+
+    def to_pandas(self):
+        """
+        Export the result as a :class:`pandas.DataFrame` with the columns "Item", "Cost", "Specific Cost" and "type"
+        and one row per item.
+
+        :return: A :class:`pandas.DataFrame`.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "Item": self.item_names,
+                "Cost": self.cost,
+                "Specific Cost": self.specific_cost,
+                "type": pd.Categorical.from_codes(
+                    self.type_codes, categories=list(self.type_names)
+                ),
+            }
+        )
+
+
+@dataclass
+class CashFlows:
+    """
+    The annual cash flows of all CAPEX and OPEX items computed by :meth:`TCOCalculator.cash_flows`. The cash flow
+    arrays have one row per item (CAPEX items first) and one column per year after the base year. If parameter variants
+    were given, they have an additional first axis with one entry per variant.
+    """
+
+    item_names: np.ndarray
+    "The names of the items."
+
+    type_codes: np.ndarray
+    "The index of the type of each item in :attr:`type_names`."
+
+    type_names: Tuple[str, ...]
+    "The names of the item types, in the order of their first occurrence."
+
+    nominal: np.ndarray
+    "The nominal cash flows in each year."
+
+    discounted: np.ndarray
+    "The cash flows discounted to the base year."
+
+    @property
+    def years(self) -> np.ndarray:
+        "The years after the base year, one per column of the cash flows."
+        return np.arange(self.nominal.shape[-1])
+
+    def annual(self, discounted: bool = False) -> np.ndarray:
+        """
+        Sum up the cash flows of all items per year.
+
+        :param discounted: Whether to use the discounted instead of the nominal cash flows.
+        :return: The annual totals, with the years as the last axis.
+        """
+        return (self.discounted if discounted else self.nominal).sum(axis=-2)
+
+    def cumulative(self, discounted: bool = False) -> np.ndarray:
+        """
+        Accumulate the annual totals over the years.
+
+        :param discounted: Whether to use the discounted instead of the nominal cash flows.
+        :return: The cumulative totals, with the years as the last axis.
+        """
+        return np.cumsum(self.annual(discounted), axis=-1)
+
+    def annual_by_type(self, discounted: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Sum up the cash flows per item type and year.
+
+        :param discounted: Whether to use the discounted instead of the nominal cash flows.
+        :return: A dictionary from type names to the annual totals of the items of that type.
+        """
+        cash_flows = self.discounted if discounted else self.nominal
+        return {
+            type_name: cash_flows[..., self.type_codes == code, :].sum(axis=-2)
+            for code, type_name in enumerate(self.type_names)
+        }
+
+    def to_pandas(self, discounted: bool = False):
+        """
+        Export the cash flows as a :class:`pandas.DataFrame` with one row per item and one column per year. Only
+        available without parameter variants.
+
+        :param discounted: Whether to use the discounted instead of the nominal cash flows.
+        :return: A :class:`pandas.DataFrame` indexed by the item names.
+        """
+        import pandas as pd
+
+        if self.nominal.ndim != 2:
+            raise ValueError(
+                "Only the cash flows without parameter variants can be exported to a DataFrame."
+            )
+        return pd.DataFrame(
+            self.discounted if discounted else self.nominal,
+            index=pd.Index(self.item_names, name="Item"),
+            columns=pd.Index(self.years, name="Year"),
+        )
+
+
+@dataclass
+class VehicleTypeTCO:
+    """
+    The TCO of each vehicle type computed by :meth:`TCOCalculator.tco_by_vehicle_type`. Each array has one entry per
+    vehicle type.
+    """
+
+    vehicle_type_ids: List[str]
+    "The ids of the vehicle types (as strings)."
+
+    annual_mileage: np.ndarray
+    "The annual mileage of each vehicle type in km."
+
+    cost: np.ndarray
+    "The present value of the costs allocated to each vehicle type over the project duration."
+
+    tco_unit_distance: np.ndarray
+    "The specific TCO per km of each vehicle type."
+
+    tco_by_type: Dict[str, np.ndarray]
+    "The specific TCO per km of each vehicle type by cost type."
+
+    def to_pandas(self):
+        """
+        Export the result as a :class:`pandas.DataFrame` with one row per vehicle type.
+
+        :return: A :class:`pandas.DataFrame` indexed by the vehicle type ids.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "Annual Mileage": self.annual_mileage,
+                "Cost": self.cost,
+                "Specific Cost": self.tco_unit_distance,
+                **self.tco_by_type,
+            },
+            index=pd.Index(self.vehicle_type_ids, name="Vehicle Type"),
+        )
+
+
+def _item_type_codes(
+    items: Sequence[Union[CapexItem, OpexItem]],
+) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Encode the types of the items as integer codes.
+
+    :param items: A sequence of CAPEX and OPEX items.
+    :return: The code of each item and the type names, in the order of their first occurrence.
+    """
+    codes: Dict[str, int] = {}
+    type_codes = np.array(
+        [codes.setdefault(item.type.name, len(codes)) for item in items], dtype=np.intp
+    )
+    return type_codes, tuple(codes)
+
+
+def _parameter_columns(
+    parameter_table: Union[
+        Mapping[str, Sequence[float]], Sequence[Mapping[str, float]]
+    ],
+) -> Dict[str, np.ndarray]:
+    """
+    Convert a parameter table into a dictionary of one-dimensional float arrays of equal length.
+
+    :param parameter_table: Either a mapping from parameter names to columns (or scalars, which are repeated), or a
+        sequence of mappings, one per row. Missing entries of a row are NaN.
+    :return: A dictionary from parameter names to arrays.
+    """
+    if hasattr(parameter_table, "items"):
+        columns = {
+            key: np.atleast_1d(np.asarray(values, dtype=float))
+            for key, values in parameter_table.items()
+        }
+    else:
+        keys = {key for row in parameter_table for key in row}
+        columns = {
+            key: np.array(
+                [row.get(key, np.nan) for row in parameter_table], dtype=float
+            )
+            for key in keys
+        }
+    if len(columns) == 0:
+        raise ValueError("The parameter table must contain at least one parameter.")
+
+    number_of_rows = max(len(values) for values in columns.values())
+    for key, values in columns.items():
+        if values.ndim != 1 or len(values) not in (1, number_of_rows):
+            raise ValueError(
+                f"The values of parameter {key} must be a scalar or have {number_of_rows} entries."
+            )
+        columns[key] = np.broadcast_to(values, (number_of_rows,))
+    return columns
 
 
 class TCOCalculator:
@@ -26,145 +288,682 @@ class TCOCalculator:
     It contains methods to calculate the CAPEX and OPEX sections of the TCO.
     """
 
-    def __init__(self, scenario, database_url: Optional[str] = None, energy_consumption_mode="simulated", capex_items=None, opex_items=None):
+    def __init__(
+        self,
+        scenario,
+        database_url: Optional[str] = None,
+        energy_consumption_mode="simulated",
+        capex_items=None,
+        opex_items=None,
+        cache: Optional["FactsCache"] = None,
+        profiler: Optional[Profiler] = None,
+    ):
         """
 
-        :param scenario:
-        :param database_url:
+        :param scenario: Either a :class:`eflips.model.Scenario` object, an integer specifying the ID of a scenario in
+            the database, or a :class:`ScenarioFacts` object. In the last case, no database connection is needed.
+        :param database_url: Optional database URL to connect to if the scenario is provided as an integer.
+        :param energy_consumption_mode: Either "simulated", to use the simulated energy consumption, or "constant", to
+            use the constant consumption per km and vehicle type given in the scenario's tco parameters.
+        :param cache: Optional :class:`eflips.tco.cache.FactsCache`. If given, the scenario facts are taken from the cache
+            if the simulation data has not changed since they were stored.
+        :param profiler: Optional :class:`eflips.tco.profiling.Profiler` recording the wall time and memory of each
+            phase of the construction and of :meth:`calculate`.
         """
-        # create session
-        with create_session(scenario, database_url) as (session, scenario):
-            self.scenario = (
-                session.query(Scenario).filter(Scenario.id == scenario.id).one()
+        if capex_items is not None:
+            raise NotImplementedError(
+                "Using your own list of dictonary then setting up list of capex items is not implemented yet. Please use the database to load the capex items."
+            )
+        if opex_items is not None:
+            raise NotImplementedError(
+                "Using your own list of dictonary then setting up list of opex items is not implemented yet. Please use the database to load the opex items."
             )
 
-            annual_fleet_mileage = get_annual_fleet_mileage(session, self.scenario)
-            self.annual_fleet_mileage = annual_fleet_mileage
-            self.energy_consumption_mode = energy_consumption_mode
-            if self.energy_consumption_mode == "constant":
-                assert "const_energy_consumption" in self.scenario.tco_parameters, (
-                    "const_energy_consumption must be provided in the scenario tco_parameters when energy_consumption_mode is 'constant'"
+        self.profiler = profiler
+
+        if isinstance(scenario, ScenarioFacts):
+            self.scenario = None
+            facts = scenario
+        else:
+            # create session
+            with create_session(scenario, database_url) as (session, scenario):
+                self.scenario = (
+                    session.query(Scenario).filter(Scenario.id == scenario.id).one()
                 )
+                if cache is not None:
+                    with profile_phase(profiler, "load_facts_from_cache"):
+                        facts = cache.get(
+                            session, self.scenario, energy_consumption_mode
+                        )
+                else:
+                    with profile_phase(profiler, "extract_facts"):
+                        facts = ScenarioFacts.from_session(
+                            session,
+                            self.scenario,
+                            energy_consumption_mode,
+                            profiler=profiler,
+                        )
 
-                const_energy_consumption = self.scenario.tco_parameters["const_energy_consumption"]
-                self.const_energy_consumption = const_energy_consumption
+        self.facts = facts
+        self.annual_fleet_mileage = facts.annual_fleet_mileage
+        self.energy_consumption_mode = energy_consumption_mode
+        if self.energy_consumption_mode == "constant":
+            assert (
+                "const_energy_consumption" in facts.tco_parameters
+            ), "const_energy_consumption must be provided in the scenario tco_parameters when energy_consumption_mode is 'constant'"
 
-            if capex_items is None:
-                self._load_capex_items_from_db(session)
+            const_energy_consumption = facts.tco_parameters["const_energy_consumption"]
+            self.const_energy_consumption = const_energy_consumption
 
+        # Copy the items, so that changes to them do not alter the facts
+        self.capex_items = [replace(item) for item in facts.capex_items]
+        with profile_phase(profiler, "create_opex_items"):
+            self._create_opex_items()
+
+        # initialize scenario related data
+        self.project_duration = facts.tco_parameters["project_duration"]
+        self.interest_rate = facts.tco_parameters["interest_rate"]
+        self.inflation_rate = facts.tco_parameters["inflation_rate"]
+
+        # Initialize the output values
+        self.total_capex = 0
+        self.total_opex = 0
+        self.tco_over_project_duration = 0
+        self.tco_unit_distance = 0
+        self.result: Optional[TCOResult] = None
+        self._tco_by_item = None
+        self._capex_costs: Optional[np.ndarray] = None
+        self._opex_costs: Optional[np.ndarray] = None
+        self._targets: Optional[Dict[str, List[Tuple[str, str, int]]]] = None
+
+    @classmethod
+    def from_facts(
+        cls, facts: ScenarioFacts, energy_consumption_mode="simulated"
+    ) -> "TCOCalculator":
+        """
+        Create a TCOCalculator from previously extracted scenario facts, without a database connection.
+
+        :param facts: A :class:`ScenarioFacts` object.
+        :param energy_consumption_mode: Either "simulated" or "constant". The facts must contain the simulated energy
+            consumption for "simulated".
+        :return: A :class:`TCOCalculator`.
+        """
+        return cls(facts, energy_consumption_mode=energy_consumption_mode)
+
+    def with_parameters(self, **overrides) -> "TCOCalculator":
+        """
+        Create a new calculator for a variant of this scenario with some parameters changed in memory only.
+
+        The new calculator shares the scenario facts (mileage, driver hours, energy consumption and the quantities of
+        the CAPEX items), so no database queries are run and nothing is written to the database. The overrides are
+        either keys of the scenario's tco_parameters (e.g. ``fuel_cost=0.3``) or CAPEX item parameters as in
+        :meth:`calculate_many`, which have to be passed with ``**``, e.g.
+        ``**{"Depot Charging Point.useful_life": 15}``. Changes made with :meth:`update_parameters` are not carried over.
+        As in :meth:`calculate_many`, ``fuel_cost`` replaces the average price of an ``electricity_tariff``.
+
+        :param overrides: The parameters to change.
+        :return: A new :class:`TCOCalculator`. Call :meth:`calculate` on it to get the results.
+        """
+        capex_targets: Dict[str, List[int]] = {}
+        for index, item in enumerate(self.facts.capex_items):
+            for attribute in CAPEX_ITEM_PARAMETERS:
+                capex_targets.setdefault(f"{item.name}.{attribute}", []).append(index)
+
+        tco_parameters = dict(self.facts.tco_parameters)
+        capex_overrides = {}
+        for key, value in overrides.items():
+            if key in capex_targets:
+                capex_overrides[key] = value
+            elif key in tco_parameters:
+                tco_parameters[key] = value
             else:
-                raise NotImplementedError(
-                    "Using your own list of dictonary then setting up list of capex items is not implemented yet. Please use the database to load the capex items."
-                )
-            if opex_items is None:
-                self._load_opex_items_from_db(session)
-            else:
-                raise NotImplementedError(
-                    "Using your own list of dictonary then setting up list of opex items is not implemented yet. Please use the database to load the opex items."
+                raise ValueError(
+                    f"Unknown parameter {key}. It is neither a scenario parameter nor an item parameter."
                 )
 
-            # initialize scenario related data
-            self.project_duration = self.scenario.tco_parameters["project_duration"]
-            self.interest_rate = self.scenario.tco_parameters["interest_rate"]
-            self.inflation_rate = self.scenario.tco_parameters["inflation_rate"]
+        tco_calculator = TCOCalculator(
+            replace(self.facts, tco_parameters=tco_parameters),
+            energy_consumption_mode=self.energy_consumption_mode,
+            profiler=self.profiler,
+        )
+        for key, value in capex_overrides.items():
+            attribute = key.rsplit(".", 1)[1]
+            for index in capex_targets[key]:
+                setattr(tco_calculator.capex_items[index], attribute, value)
+        # The energy is priced by the tariff instead of the fuel cost, unless the fuel cost is overridden
+        if "fuel_cost" in overrides and "electricity_tariff" in tco_parameters:
+            for item in tco_calculator.opex_items:
+                if item.unit_cost_parameter == "fuel_cost":
+                    item.unit_cost = overrides["fuel_cost"]
+        return tco_calculator
 
-            # Initialize the output values
-            self.total_capex = 0
-            self.total_opex = 0
-            self.tco_over_project_duration = 0
-            self.tco_unit_distance = 0
-            self.tco_by_item = pd.DataFrame(columns=["Item", "Specific Cost", "Type"])
+    @classmethod
+    async def from_database_async(
+        cls, scenario_id: int, engine=None, energy_consumption_mode="simulated"
+    ) -> "TCOCalculator":
+        """
+        Create a TCOCalculator with the asyncio extension of SQLAlchemy, see
+        :func:`eflips.tco.async_api.load_scenario_facts_async`.
 
+        :param scenario_id: The id of the scenario.
+        :param engine: An :class:`sqlalchemy.ext.asyncio.AsyncEngine` or a database URL. Defaults to the environment
+            variable ``DATABASE_URL``.
+        :param energy_consumption_mode: Either "simulated" or "constant".
+        :return: A :class:`TCOCalculator`.
+        """
+        from eflips.tco.async_api import load_scenario_facts_async
+
+        facts = await load_scenario_facts_async(
+            scenario_id, engine, energy_consumption_mode
+        )
+        return cls.from_facts(facts, energy_consumption_mode=energy_consumption_mode)
 
+    @profiled_method("calculate")
     def calculate(self):
         """
         Calculate the total cost of ownership based on the input data provided in the dictionaries.
         :return: A dictionary containing the TCO results.
         """
 
-        list_of_items = []
-        list_of_costs = []
-        # ----------Total CAPEX----------#
+        # Calculate the total cost for each asset and each OPEX category over the project duration.
+        capex_costs, opex_costs = self._item_costs({})
+        self._targets = None
+        self._set_results(capex_costs, opex_costs)
+
+    def _set_results(self, capex_costs: np.ndarray, opex_costs: np.ndarray) -> None:
+        """
+        Set the TCO results from the present values of the CAPEX and OPEX items.
+
+        :param capex_costs: The present value of each CAPEX item.
+        :param opex_costs: The present value of each OPEX item.
+        :return: Nothing.
+        """
+        self._capex_costs = capex_costs
+        self._opex_costs = opex_costs
+        self.total_capex = float(capex_costs.sum())
+        self.total_opex = float(opex_costs.sum())
+
+        costs = np.concatenate([capex_costs, opex_costs])
+
+        # ----------Calculation of three kinds of TCO----------#
 
-        # Calculate the total cost for each asset over the project duration.
-        for capex_item in self.capex_items:
-            # Calculate the procurement cost for the respective asset including replacement.
-            procurement_this_type = (
-                capex_item.calculate_total_procurement_cost(
+        # TCO over project duration
+        self.tco_over_project_duration = self.total_opex + self.total_capex
+
+        # Annual TCO: see cash_flows()
+
+        # Specific TCO over project duration
+        total_distance = self.annual_fleet_mileage * self.project_duration
+        self.tco_unit_distance = self.tco_over_project_duration / total_distance
+
+        if self.result is not None and len(self.result.cost) == len(costs):
+            # The items are the same as in the previous calculation, only their costs changed
+            self.result = replace(
+                self.result, cost=costs, specific_cost=costs / total_distance
+            )
+        else:
+            items = list(self.capex_items) + list(self.opex_items)
+            type_codes, type_names = _item_type_codes(items)
+            self.result = TCOResult(
+                item_names=np.array([item.name for item in items], dtype=object),
+                type_codes=type_codes,
+                type_names=type_names,
+                cost=costs,
+                specific_cost=costs / total_distance,
+            )
+        # The DataFrame of tco_by_item is only created when it is accessed
+        self._tco_by_item = None
+
+        tco_by_type = self.result.tco_by_type()
+        self.tco_by_type = tco_by_type
+
+        tco_by_type_without_staff = tco_by_type.copy()
+        tco_by_type_without_staff.pop("STAFF", None)
+        self.tco_by_type_without_staff = tco_by_type_without_staff
+
+    def tco_by_vehicle_type(self) -> VehicleTypeTCO:
+        """
+        Allocate the costs of all items to the vehicle types, e.g. to compare 12 m and 18 m buses within one fleet.
+
+        Vehicles and batteries are assigned to their vehicle type. The other costs are split in proportion to the
+        quantities of the vehicle types they depend on:
+
+        - staff cost by the driving hours,
+        - energy cost, charging points, stations and their maintenance by the energy consumption,
+        - vehicle maintenance by the mileage,
+        - insurance and taxes by the number of vehicles.
+
+        The costs of all vehicle types add up to :attr:`tco_over_project_duration`. :meth:`calculate` is called first
+        if it has not been called yet.
+
+        :return: A :class:`VehicleTypeTCO` object.
+        """
+        statistics = self.facts.vehicle_type_statistics
+        if statistics is None:
+            raise ValueError(
+                "The scenario facts do not contain the quantities per vehicle type. Please extract them again."
+            )
+        if self.result is None:
+            self.calculate()
+
+        vehicle_type_ids = list(statistics)
+        columns = {
+            vehicle_type_id: i for i, vehicle_type_id in enumerate(vehicle_type_ids)
+        }
+        mileage = np.array(
+            [statistics[i]["mileage"] for i in vehicle_type_ids], dtype=float
+        )
+        driver_hours = np.array(
+            [statistics[i]["driver_hours"] for i in vehicle_type_ids], dtype=float
+        )
+        if self.energy_consumption_mode == "constant":
+            energy_consumption = mileage * np.array(
+                [self.const_energy_consumption.get(i, 0.0) for i in vehicle_type_ids],
+                dtype=float,
+            )
+        else:
+            energy_consumption = np.array(
+                [statistics[i]["energy_consumption"] for i in vehicle_type_ids],
+                dtype=float,
+            )
+        number_of_vehicles = np.zeros(len(vehicle_type_ids))
+        for item in self.capex_items:
+            if (
+                item.type == CapexItemType.VEHICLE
+                and str(item.vehicle_type_id) in columns
+            ):
+                number_of_vehicles[columns[str(item.vehicle_type_id)]] += item.quantity
+
+        def shares(weights: np.ndarray) -> np.ndarray:
+            # Fall back to the mileage if a quantity is not available, e.g. without any charging events
+            if weights.sum() > 0:
+                return weights / weights.sum()
+            return mileage / mileage.sum()
+
+        mileage_shares = shares(mileage)
+        energy_shares = shares(energy_consumption)
+        shares_by_parameter = {
+            "staff_cost": shares(driver_hours),
+            "fuel_cost": energy_shares,
+            "maint_cost": mileage_shares,
+            "insurance": shares(number_of_vehicles),
+            "taxes": shares(number_of_vehicles),
+            "maint_infr_cost": energy_shares,
+        }
+
+        # The share of each item's cost allocated to each vehicle type
+        allocation = np.zeros(
+            (len(self.capex_items) + len(self.opex_items), len(vehicle_type_ids))
+        )
+        for index, item in enumerate(self.capex_items):
+            if str(item.vehicle_type_id) in columns:
+                allocation[index, columns[str(item.vehicle_type_id)]] = 1.0
+            else:
+                allocation[index] = energy_shares
+        for index, item in enumerate(self.opex_items):
+            allocation[len(self.capex_items) + index] = shares_by_parameter.get(
+                item.unit_cost_parameter, mileage_shares
+            )
+
+        allocated_costs = allocation * self.result.cost[:, np.newaxis]
+        cost_by_type = np.zeros((len(self.result.type_names), len(vehicle_type_ids)))
+        np.add.at(cost_by_type, self.result.type_codes, allocated_costs)
+
+        total_distance = mileage * self.project_duration
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return VehicleTypeTCO(
+                vehicle_type_ids=vehicle_type_ids,
+                annual_mileage=mileage,
+                cost=allocated_costs.sum(axis=0),
+                tco_unit_distance=allocated_costs.sum(axis=0) / total_distance,
+                tco_by_type={
+                    type_name: cost_by_type[code] / total_distance
+                    for code, type_name in enumerate(self.result.type_names)
+                },
+            )
+
+    def update_parameters(self, parameters: Mapping[str, float]) -> None:
+        """
+        Change some parameters and update the results of :meth:`calculate`, recomputing only the items that depend on
+        the changed parameters.
+
+        The parameter names are the ones of :meth:`calculate_many`. Changing ``project_duration``, ``interest_rate``
+        or ``inflation_rate`` affects all items and runs a full :meth:`calculate`. The present values of all other
+        items are kept from the previous calculation.
+
+        :param parameters: A mapping from parameter names to their new values.
+        :return: Nothing.
+        """
+        # The dependencies of the items on the parameters only change if the items are changed, followed by calculate()
+        if self._targets is None:
+            self._targets = self._parameter_targets()
+        targets = self._targets
+        for key in parameters:
+            if key not in SCENARIO_PARAMETERS and key not in targets:
+                raise ValueError(
+                    f"Unknown parameter {key}. It is neither a scenario parameter nor an item parameter."
+                )
+
+        items = {"capex": self.capex_items, "opex": self.opex_items}
+        changed = {"capex": set(), "opex": set()}
+        for key, value in parameters.items():
+            if key in SCENARIO_PARAMETERS:
+                setattr(self, key, value)
+                continue
+            for kind, attribute, index in targets[key]:
+                setattr(items[kind][index], attribute, value)
+                changed[kind].add(index)
+
+        if self.result is None or any(key in SCENARIO_PARAMETERS for key in parameters):
+            self.calculate()
+            return
+
+        capex_costs = self._capex_costs.copy()
+        for index in changed["capex"]:
+            item = self.capex_items[index]
+            capex_costs[index] = (
+                capex_present_value(
+                    procurement_cost=item.procurement_cost,
+                    useful_life=item.useful_life,
+                    cost_escalation=item.cost_escalation,
                     project_duration=self.project_duration,
                     interest_rate=self.interest_rate,
                     net_discount_rate=self.inflation_rate,
                 )
-                * capex_item.quantity
+                * item.quantity
+            )
+        opex_costs = self._opex_costs.copy()
+        for index in changed["opex"]:
+            item = self.opex_items[index]
+            opex_costs[index] = opex_present_value(
+                unit_cost=item.unit_cost,
+                usage_amount=item.usage_amount,
+                cost_escalation=item.cost_escalation,
+                project_duration=self.project_duration,
+                net_discount_rate=self.inflation_rate,
             )
-            # Add the cost of this asset to the CAPEX section of the TCO.
+        self._set_results(capex_costs, opex_costs)
 
-            # self.tco_by_item[capex_item] = procurement_this_type
-            list_of_items.append(capex_item)
-            list_of_costs.append(procurement_this_type)
-            self.total_capex += procurement_this_type
+    @property
+    def tco_by_item(self):
+        """
+        A :class:`pandas.DataFrame` with the columns "Item", "Cost", "Specific Cost" and "type" with one row per CAPEX
+        and OPEX item, created on first access after :meth:`calculate`. The "Item" column holds the item objects, use
+        :meth:`TCOResult.to_pandas` of :attr:`result` for a table with the item names only.
+        """
+        import pandas as pd
 
-        # ----------Total OPEX----------#
+        if self._tco_by_item is None:
+            if self.result is None:
+                self._tco_by_item = pd.DataFrame(
+                    columns=["Item", "Specific Cost", "Type"]
+                )
+            else:
+                tco_by_item = self.result.to_pandas()
+                tco_by_item["Item"] = list(self.capex_items) + list(self.opex_items)
+                self._tco_by_item = tco_by_item
+        return self._tco_by_item
 
-        # Calculate the OPEX for each category over the whole project duration.
-        for opex_item in self.opex_items:
+    @tco_by_item.setter
+    def tco_by_item(self, tco_by_item):
+        self._tco_by_item = tco_by_item
 
-            total_opex_of_type = 0
+    @profiled_method("calculate_many")
+    def calculate_many(self, parameter_table) -> "TCOBatchResult":
+        """
+        Calculate the TCO for many parameter variants of the loaded scenario in one vectorized pass.
 
-            # Calculate the OPEX for each year.
-            for year in range(self.project_duration):
-                opex_cost_in_respective_year = opex_item.future_cost(year)
-                total_opex_of_type += net_present_value(
-                    opex_cost_in_respective_year, year, self.inflation_rate
-                )
+        The scenario data (mileage, driver hours, energy consumption and item quantities) is taken from this calculator,
+        so no database queries are run. Each row of the parameter table overrides some of the parameters:
 
-            # self.tco_by_item[opex_item] = total_opex_of_type
-            list_of_items.append(opex_item)
-            list_of_costs.append(total_opex_of_type)
-            self.total_opex += total_opex_of_type
+        - keys of the scenario's tco_parameters: ``project_duration``, ``interest_rate``, ``inflation_rate`` and the
+          parameters the OPEX items are based on (e.g. ``fuel_cost``, ``staff_cost``, ``pef_fuel``, ``pef_general``),
+        - parameters of the CAPEX items, as ``"<item name>.<parameter>"`` with the parameter being one of
+          ``procurement_cost``, ``useful_life`` and ``cost_escalation``, e.g. ``"Depot Charging Point.useful_life"``.
+          For batteries, the procurement cost is the cost per kWh.
 
-        # ----------Calculation of three kinds of TCO----------#
+        Parameters that are not given or NaN keep the value of this calculator. With an ``electricity_tariff`` in the
+        tco parameters, ``fuel_cost`` replaces the average price of the charged energy under the tariff.
 
-        # TCO over project duration
-        self.tco_over_project_duration = self.total_opex + self.total_capex
+        :param parameter_table: Either a mapping (e.g. a dict or a :class:`pandas.DataFrame`) from parameter names to
+            columns of values, or a sequence of mappings, one per row.
+        :return: A :class:`TCOBatchResult` with one entry per row of the parameter table.
+        """
+        parameters = _parameter_columns(parameter_table)
 
-        # Annual TCO
-        # TODO do we need this? maybe later
+        capex_costs, opex_costs = self._item_costs(parameters)
+        project_duration = parameters.get("project_duration", self.project_duration)
+        project_duration = np.where(
+            np.isnan(project_duration), self.project_duration, project_duration
+        )
 
-        # Specific TCO over project duration
-        self.tco_unit_distance = self.tco_over_project_duration / (
-            self.annual_fleet_mileage * self.project_duration
+        number_of_rows = max(len(values) for values in parameters.values())
+        costs = np.concatenate(
+            [
+                np.broadcast_to(capex_costs, (number_of_rows, len(self.capex_items))),
+                np.broadcast_to(opex_costs, (number_of_rows, len(self.opex_items))),
+            ],
+            axis=1,
+        )
+        total_distance = self.annual_fleet_mileage * np.broadcast_to(
+            project_duration, (number_of_rows,)
         )
 
-        # Create a DataFrame from the list of items and costs
-        self.tco_by_item = pd.DataFrame({"Item": list_of_items, "Cost": list_of_costs})
+        # Sum up the cost per type with a single matrix product
+        type_codes, type_names = _item_type_codes(
+            list(self.capex_items) + list(self.opex_items)
+        )
+        type_matrix = np.zeros((len(type_codes), len(type_names)))
+        type_matrix[np.arange(len(type_codes)), type_codes] = 1.0
+        cost_by_type = costs @ type_matrix
 
-        self.tco_by_item["Specific Cost"] = self.tco_by_item["Cost"] / (
-            self.annual_fleet_mileage * self.project_duration
+        tco_over_project_duration = costs.sum(axis=1)
+        return TCOBatchResult(
+            tco_over_project_duration=tco_over_project_duration,
+            tco_unit_distance=tco_over_project_duration / total_distance,
+            tco_by_type={
+                type_name: cost_by_type[:, i] / total_distance
+                for i, type_name in enumerate(type_names)
+            },
         )
-        self.tco_by_item["type"] = self.tco_by_item["Item"].apply(lambda x: x.type.name)
 
-        tco_by_type = {}
+    def cash_flows(self, parameter_table=None) -> "CashFlows":
+        """
+        Calculate the nominal and discounted cash flows of every CAPEX and OPEX item in every year.
 
-        types = set(self.tco_by_item["type"].values)
-        for t in types:
-            tco_by_type[t] = float(self.tco_by_item[self.tco_by_item["type"] == t][
-                "Specific Cost"
-            ].sum())
+        CAPEX items are paid as annuities over the useful life of each procurement, OPEX items are escalated year by
+        year, see :func:`eflips.tco.cost_items.capex_cash_flows` and :func:`eflips.tco.cost_items.opex_cash_flows`. The
+        discounted cash flows sum up to :attr:`tco_over_project_duration`.
 
-        self.tco_by_type = tco_by_type
+        :param parameter_table: Optional parameter variants, as in :meth:`calculate_many`. If given, the cash flows get
+            an additional first axis with one entry per variant.
+        :return: A :class:`CashFlows` object.
+        """
+        parameters = (
+            _parameter_columns(parameter_table) if parameter_table is not None else {}
+        )
+        fields, scenario_parameters = self._item_fields(parameters)
+        capex, opex = fields["capex"], fields["opex"]
+        project_duration = scenario_parameters["project_duration"]
 
-        tco_by_type_without_staff = tco_by_type.copy()
-        tco_by_type_without_staff.pop("STAFF", None)
-        self.tco_by_type_without_staff = tco_by_type_without_staff
+        # The annuities of the last procurement of an item may extend beyond the project duration
+        years_capex = (
+            np.ceil(np.asarray(project_duration) / capex["useful_life"])
+            * capex["useful_life"]
+        )
+        number_of_years = int(
+            max(np.max(project_duration), np.max(years_capex, initial=0))
+        )
+
+        capex_nominal = (
+            capex_cash_flows(
+                procurement_cost=capex["procurement_cost"],
+                useful_life=capex["useful_life"],
+                cost_escalation=capex["cost_escalation"],
+                project_duration=project_duration,
+                interest_rate=scenario_parameters["interest_rate"],
+                number_of_years=number_of_years,
+            )
+            * capex["quantity"][..., np.newaxis]
+        )
+        opex_nominal = opex_cash_flows(
+            unit_cost=opex["unit_cost"],
+            usage_amount=opex["usage_amount"],
+            cost_escalation=opex["cost_escalation"],
+            project_duration=project_duration,
+            number_of_years=number_of_years,
+        )
+        if len(parameters) > 0:
+            number_of_rows = max(len(values) for values in parameters.values())
+            capex_nominal = np.broadcast_to(
+                capex_nominal, (number_of_rows,) + capex_nominal.shape[-2:]
+            )
+            opex_nominal = np.broadcast_to(
+                opex_nominal, (number_of_rows,) + opex_nominal.shape[-2:]
+            )
+        nominal = np.concatenate([capex_nominal, opex_nominal], axis=-2)
+
+        items = list(self.capex_items) + list(self.opex_items)
+        type_codes, type_names = _item_type_codes(items)
+        return CashFlows(
+            item_names=np.array([item.name for item in items], dtype=object),
+            type_codes=type_codes,
+            type_names=type_names,
+            nominal=nominal,
+            discounted=discount_cash_flows(
+                nominal, scenario_parameters["inflation_rate"]
+            ),
+        )
+
+    def parameter_values(self) -> Dict[str, float]:
+        """
+        Get the current values of all parameters that can be varied in :meth:`calculate_many`.
+
+        :return: A dictionary from parameter names to their values in this calculator.
+        """
+        values = {
+            "project_duration": float(self.project_duration),
+            "interest_rate": float(self.interest_rate),
+            "inflation_rate": float(self.inflation_rate),
+        }
+        items = {"capex": self.capex_items, "opex": self.opex_items}
+        for key, targets in self._parameter_targets().items():
+            kind, attribute, index = targets[0]
+            values[key] = float(getattr(items[kind][index], attribute))
+        return values
+
+    def _parameter_targets(self) -> Dict[str, List[Tuple[str, str, int]]]:
+        """
+        Map every parameter name accepted by :meth:`calculate_many` (except the scenario-wide ``project_duration``,
+        ``interest_rate`` and ``inflation_rate``) to the item attributes that depend on it.
+
+        :return: A dictionary from parameter names to lists of ("capex" or "opex", attribute, item index).
+        """
+        targets: Dict[str, List[Tuple[str, str, int]]] = {}
+        for index, item in enumerate(self.capex_items):
+            for attribute in CAPEX_ITEM_PARAMETERS:
+                targets.setdefault(f"{item.name}.{attribute}", []).append(
+                    ("capex", attribute, index)
+                )
+        for index, item in enumerate(self.opex_items):
+            if item.unit_cost_parameter is not None:
+                targets.setdefault(item.unit_cost_parameter, []).append(
+                    ("opex", "unit_cost", index)
+                )
+            if item.cost_escalation_parameter is not None:
+                targets.setdefault(item.cost_escalation_parameter, []).append(
+                    ("opex", "cost_escalation", index)
+                )
+        return targets
+
+    def _item_fields(
+        self, parameters: Dict[str, np.ndarray]
+    ) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, Union[float, np.ndarray]]]:
+        """
+        Collect the parameters of all CAPEX and OPEX items and of the scenario, optionally for many parameter variants.
+
+        :param parameters: A dictionary from parameter names (see :meth:`calculate_many`) to one-dimensional arrays of
+            equal length. NaN entries keep the value of this calculator. May be empty.
+        :return: The item parameters by "capex" or "opex" and attribute, with one entry per item (and one row per
+            parameter variant, if overridden), and the scenario parameters (scalars or columns of one row per variant).
+        """
+        fields = {
+            "capex": {
+                attribute: np.array(
+                    [getattr(item, attribute) for item in self.capex_items], dtype=float
+                )
+                for attribute in CAPEX_ITEM_PARAMETERS + ("quantity",)
+            },
+            "opex": {
+                attribute: np.array(
+                    [getattr(item, attribute) for item in self.opex_items], dtype=float
+                )
+                for attribute in ("unit_cost", "usage_amount", "cost_escalation")
+            },
+        }
+        scenario_parameters = {
+            "project_duration": self.project_duration,
+            "interest_rate": self.interest_rate,
+            "inflation_rate": self.inflation_rate,
+        }
 
+        targets = self._parameter_targets() if parameters else {}
+        for key, values in parameters.items():
+            if key in scenario_parameters:
+                base = scenario_parameters[key]
+                scenario_parameters[key] = np.where(np.isnan(values), base, values)[
+                    :, np.newaxis
+                ]
+                continue
+            if key not in targets:
+                raise ValueError(
+                    f"Unknown parameter {key}. It is neither a scenario parameter nor an item parameter."
+                )
+            for kind, attribute, index in targets[key]:
+                column = fields[kind][attribute]
+                if column.ndim == 1:
+                    column = np.repeat(column[np.newaxis, :], len(values), axis=0)
+                    fields[kind][attribute] = column
+                column[:, index] = np.where(np.isnan(values), column[:, index], values)
+        return fields, scenario_parameters
+
+    def _item_costs(
+        self, parameters: Dict[str, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the present value of all CAPEX and OPEX items, optionally for many parameter variants at once.
+
+        :param parameters: A dictionary from parameter names (see :meth:`calculate_many`) to one-dimensional arrays of
+            equal length. NaN entries keep the value of this calculator. May be empty.
+        :return: The costs of the CAPEX items and of the OPEX items. The arrays have one row per parameter variant, or
+            are one-dimensional if no parameters are given.
+        """
+        fields, scenario_parameters = self._item_fields(parameters)
+        capex_costs = (
+            capex_present_value(
+                procurement_cost=fields["capex"]["procurement_cost"],
+                useful_life=fields["capex"]["useful_life"],
+                cost_escalation=fields["capex"]["cost_escalation"],
+                project_duration=scenario_parameters["project_duration"],
+                interest_rate=scenario_parameters["interest_rate"],
+                net_discount_rate=scenario_parameters["inflation_rate"],
+            )
+            * fields["capex"]["quantity"]
+        )
+        opex_costs = opex_present_value(
+            unit_cost=fields["opex"]["unit_cost"],
+            usage_amount=fields["opex"]["usage_amount"],
+            cost_escalation=fields["opex"]["cost_escalation"],
+            project_duration=scenario_parameters["project_duration"],
+            net_discount_rate=scenario_parameters["inflation_rate"],
+        )
+        return capex_costs, opex_costs
 
     def visualize(self):
         """
         Visualize the TCO results.
         """
 
-
         import matplotlib.pyplot as plt
 
         fig, ax = plt.subplots(figsize=(6, 8))
@@ -181,51 +980,42 @@ class TCOCalculator:
             ax.bar_label(current_bar, label_type="center", padding=3, fmt="%.2f")
 
         total = self.tco_unit_distance
-        ax.text(0, total + 0.05, str(round(total, 2)), ha="center", va="bottom", fontweight="bold")
+        ax.text(
+            0,
+            total + 0.05,
+            str(round(total, 2)),
+            ha="center",
+            va="bottom",
+            fontweight="bold",
+        )
         ax.set_ylabel("Specific Cost (EUR/km)")
         ax.set_xlim(left=-0.5, right=0.5)
         ax.set_title("Total Cost of Ownership by Type")
         ax.legend()
         plt.savefig("tco_by_type.png")
 
-
-    def _load_capex_items_from_db(self, session):
-        # Get the number of vehicles used in the simulation by vehicle type including the tco parameters.
-        assets_vehicle = load_capex_items_vehicle(session, self.scenario)
-
-        # Get the battery size by bus type including the tco parameters
-        assets_battery = load_capex_items_battery(session, self.scenario)
-
-        # Get the number of charging infrastructure and slots by type. There are only depot or
-        # terminal stop (opportunity) charging stations.
-        assets_infrastructure = load_capex_items_infrastructure(session, self.scenario)
-
-        capex_items = (
-            list(assets_vehicle) + list(assets_battery) + list(assets_infrastructure)
-        )
-        self.capex_items = capex_items
-
-    def _load_opex_items_from_db(self, session):
+    def _create_opex_items(self):
         """
-        This method returns the opex input dictionary, which is used to calculate the TCO.
-        :return: A dictionary including the opex input data.
+        This method creates the opex items from the scenario facts, which are used to calculate the TCO.
         """
 
         list_opex_items = []
 
-        scenario_tco_parameters = self.scenario.tco_parameters
+        scenario_tco_parameters = self.facts.tco_parameters
 
         # Get the annual driver hours
 
         # TODO should we avoid using OpexItem here?
 
-        total_driver_hours = calculate_total_driver_hours(session, self.scenario)
+        total_driver_hours = self.facts.total_driver_hours
         staff_cost = OpexItem(
             name="Staff Cost",
             type=OpexItemType.STAFF,
             unit_cost=scenario_tco_parameters["staff_cost"],
             usage_amount=total_driver_hours,
             cost_escalation=scenario_tco_parameters["pef_wages"],
+            unit_cost_parameter="staff_cost",
+            cost_escalation_parameter="pef_wages",
         )
         list_opex_items.append(staff_cost)
 
@@ -233,25 +1023,46 @@ class TCOCalculator:
         match self.energy_consumption_mode:
             case "constant":
                 total_energy_consumption = 0.0
-                mileage_per_vt = get_mileage_per_vehicle_type(session, self.scenario)
+                mileage_per_vt = self.facts.mileage_per_vehicle_type
                 for vid, consumption in self.const_energy_consumption.items():
                     if vid in mileage_per_vt:
                         total_energy_consumption += consumption * mileage_per_vt[vid]
 
-
             case "simulated":
-                total_energy_consumption = calc_energy_consumption_simulated(session, self.scenario)
+                if self.facts.energy_consumption_simulated is None:
+                    raise ValueError(
+                        "The scenario facts do not contain the simulated energy consumption. Please extract them with "
+                        "energy_consumption_mode 'simulated'."
+                    )
+                total_energy_consumption = self.facts.energy_consumption_simulated
             case _:
-                raise ValueError(f"Unknown energy consumption mode: {self.energy_consumption_mode}")
-        # total_energy_consumption = calc_energy_consumption_simulated(session, self.scenario)
+                raise ValueError(
+                    f"Unknown energy consumption mode: {self.energy_consumption_mode}"
+                )
+
+        # With a time-of-use tariff, the energy is priced at the average price of the hours the vehicles charge in
+        if "electricity_tariff" in scenario_tco_parameters:
+            if self.facts.charging_energy_profile is None:
+                raise ValueError(
+                    "The scenario facts do not contain the charging energy profile the electricity tariff is applied "
+                    "to. Please extract them again with the electricity tariff in the tco parameters."
+                )
+            tariff = TariffSchedule.from_dict(
+                scenario_tco_parameters["electricity_tariff"]
+            )
+            energy_price = tariff.average_price(self.facts.charging_energy_profile)
+        else:
+            energy_price = scenario_tco_parameters["fuel_cost"]
 
         # TODO maybe change it to energy_cost
         fuel_cost = OpexItem(
             name="Fuel Cost",
             type=OpexItemType.ENERGY,
-            unit_cost=scenario_tco_parameters["fuel_cost"],
+            unit_cost=energy_price,
             usage_amount=total_energy_consumption,
             cost_escalation=scenario_tco_parameters["pef_fuel"],
+            unit_cost_parameter="fuel_cost",
+            cost_escalation_parameter="pef_fuel",
         )
         list_opex_items.append(fuel_cost)
 
@@ -263,6 +1074,8 @@ class TCOCalculator:
             unit_cost=scenario_tco_parameters["maint_cost"],
             usage_amount=self.annual_fleet_mileage,
             cost_escalation=scenario_tco_parameters["pef_general"],
+            unit_cost_parameter="maint_cost",
+            cost_escalation_parameter="pef_general",
         )
         list_opex_items.append(maint_cost_vehicles)
 
@@ -277,6 +1090,8 @@ class TCOCalculator:
             unit_cost=scenario_tco_parameters["insurance"],
             usage_amount=total_number_vehicles,
             cost_escalation=scenario_tco_parameters["pef_insurance"],
+            unit_cost_parameter="insurance",
+            cost_escalation_parameter="pef_insurance",
         )
         list_opex_items.append(insurance)
 
@@ -286,6 +1101,8 @@ class TCOCalculator:
             unit_cost=scenario_tco_parameters["taxes"],
             usage_amount=total_number_vehicles,
             cost_escalation=scenario_tco_parameters["pef_general"],
+            unit_cost_parameter="taxes",
+            cost_escalation_parameter="pef_general",
         )
         list_opex_items.append(taxes)
 
@@ -300,7 +1117,8 @@ class TCOCalculator:
             unit_cost=scenario_tco_parameters["maint_infr_cost"],
             usage_amount=total_number_charging_points,
             cost_escalation=scenario_tco_parameters["pef_general"],
+            unit_cost_parameter="maint_infr_cost",
+            cost_escalation_parameter="pef_general",
         )
         list_opex_items.append(maint_cost_infra)
         self.opex_items = list_opex_items
-
@@ -1,12 +1,99 @@
+import atexit
 import logging
 import os
+import threading
 from contextlib import contextmanager
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session
 from eflips.model import Scenario
-import matplotlib.pyplot as plt
 import numpy as np
+
+_engines: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Engine] = {}
+"The engines created by :func:`get_engine`, by database URL and options."
+
+_engines_lock = threading.Lock()
+
+
+def engine_options(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_pre_ping: bool = True,
+    pool_recycle: int = 3600,
+) -> Dict[str, Any]:
+    """
+    Collect the options of an engine created by :func:`get_engine`. The pool size options are ignored for SQLite
+    databases.
+
+    :param database_url: The database URL.
+    :param pool_size: The number of connections kept open in the pool.
+    :param max_overflow: The number of connections opened in addition to the pool size under load.
+    :param pool_pre_ping: Whether to test connections for liveness when they are taken from the pool.
+    :param pool_recycle: The number of seconds after which a connection is replaced.
+    :return: A dictionary of keyword arguments for :func:`sqlalchemy.create_engine`.
+    """
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": pool_pre_ping,
+        "pool_recycle": pool_recycle,
+    }
+    if make_url(database_url).get_backend_name() == "sqlite":
+        options.pop("pool_size")
+        options.pop("max_overflow")
+    return options
+
+
+def get_engine(database_url: str, **options) -> Engine:
+    """
+    Get the engine of a database URL.
+
+    The engines are kept in a process-wide registry, so that all sessions on the same database share one connection
+    pool. Calls with different options get different engines. The engines are disposed when the interpreter exits, and
+    their pools are reset in child processes after a fork, so that no connection is shared between processes.
+
+    :param database_url: The database URL.
+    :param options: The pool options ``pool_size``, ``max_overflow``, ``pool_pre_ping`` and ``pool_recycle``, see
+        :func:`engine_options`.
+    :return: A :class:`sqlalchemy.engine.Engine`.
+    """
+    options = engine_options(database_url, **options)
+    key = (database_url, tuple(sorted(options.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(database_url, **options)
+            _engines[key] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    """
+    Dispose all engines created by :func:`get_engine` and remove them from the registry.
+
+    :return: Nothing.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _reset_engines_after_fork() -> None:
+    # The connections of the parent process must not be used or closed by the child, so the pools are replaced without
+    # closing their connections. The lock may have been held by another thread of the parent while forking.
+    global _engines_lock
+    _engines_lock = threading.Lock()
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+
+atexit.register(dispose_engines)
+os.register_at_fork(after_in_child=_reset_engines_after_fork)
+
+
 @contextmanager
 def create_session(
     scenario: Union[Scenario, int, Any], database_url: Optional[str] = None
@@ -18,7 +105,8 @@ def create_session(
     the ID of a scenario in the database, or any other object that has an attribute `id` that is an integer. It then
     creates a SQLAlchemy session and returns it. If the scenario is a :class:`eflips.model.Scenario` object, the
     session is created and returned. If the scenario is an integer or an object with an `id` attribute, the session
-    is created, returned and closed after the context manager is exited.
+    is created, returned and closed after the context manager is exited. The engine is taken from the registry of
+    :func:`get_engine` and stays open for later sessions.
 
     :param scenario: Either a :class:`eflips.model.Scenario` object, an integer specifying the ID of a scenario in the
         database, or any other object that has an attribute `id` that is an integer.
@@ -27,7 +115,6 @@ def create_session(
     logger = logging.getLogger(__name__)
 
     managed_session = False
-    engine = None
     session = None
     try:
         if isinstance(scenario, Scenario):
@@ -49,8 +136,7 @@ def create_session(
                     raise ValueError("No database URL specified.")
 
             managed_session = True
-            engine = create_engine(database_url)
-            session = Session(engine)
+            session = Session(get_engine(database_url))
             scenario = session.query(Scenario).filter(Scenario.id == scenario_id).one()
         else:
             raise ValueError(
@@ -62,11 +148,13 @@ def create_session(
             if session is not None:
                 session.commit()
                 session.close()
-            if engine is not None:
-                engine.dispose()
 
 
-def plot_tco_comparison(all_tco: list[dict], all_names: list[str], colors) -> plt.Figure:
+def plot_tco_comparison(
+    all_tco: list[dict], all_names: list[str], colors
+) -> "matplotlib.figure.Figure":
+    import matplotlib.pyplot as plt
+
     # Collect all possible keys
     all_keys = sorted({k for d in all_tco for k in d.keys()})
 
@@ -80,16 +168,25 @@ def plot_tco_comparison(all_tco: list[dict], all_names: list[str], colors) -> pl
     bottom = np.zeros(len(all_tco))
 
     for i, key in enumerate(all_keys):
-        current_bar = ax.bar(x, values[:, i], bottom=bottom, label=key, color=colors[key])
+        current_bar = ax.bar(
+            x, values[:, i], bottom=bottom, label=key, color=colors[key]
+        )
         bottom += values[:, i]
         ax.bar_label(current_bar, label_type="center", padding=3, fmt="%.2f")
 
     totals = values.sum(axis=1)
     for xi, total in zip(x, totals):
-        ax.text(round(xi, 2), total + 0.3, str(round(total, 2)), ha="center", va="bottom", fontweight="bold")
+        ax.text(
+            round(xi, 2),
+            total + 0.3,
+            str(round(total, 2)),
+            ha="center",
+            va="bottom",
+            fontweight="bold",
+        )
 
     ax.set_xticks(x)
     ax.set_xticklabels([all_names[i] for i in range(len(all_tco))])
     ax.set_ylabel("Value")
     ax.legend(title="Keys", loc="upper left", bbox_to_anchor=(1.05, 1))
-    return fig
\ No newline at end of file
+    return fig
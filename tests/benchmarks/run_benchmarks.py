@@ -0,0 +1,286 @@
+"""
+Benchmarks of the TCO calculation on synthetic scenarios of increasing size.
+
+For each size, a synthetic scenario is generated in a local SQLite database (see :mod:`synthetic_scenario`) and the
+following operations are timed:
+
+- ``construction``: creating a :class:`eflips.tco.TCOCalculator` from the database,
+- ``calculate``: :meth:`eflips.tco.TCOCalculator.calculate`,
+- ``calculate_tco``: :func:`eflips.tco.calculate_tco`,
+- ``init_tco_parameters``: :func:`eflips.tco.init_tco_parameters` for all vehicle types, battery types, charging point
+  types and stations.
+
+Each result is appended as one JSON line to the output file, together with the current git commit, so that the
+runtimes of different commits can be compared::
+
+    python tests/benchmarks/run_benchmarks.py --events 10000 100000 1000000
+    python tests/benchmarks/run_benchmarks.py --compare <old commit> <new commit>
+
+The generated databases are kept in the database directory and reused by later runs with the same size and seed.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_scenario import (
+    SyntheticScenarioSize,
+    create_sqlite_engine,
+    create_synthetic_scenario,
+)  # noqa: E402
+
+from eflips.model import (
+    BatteryType,
+    ChargeType,
+    ChargingPointType,
+    Scenario,
+    Station,
+    VehicleType,
+)  # noqa: E402
+
+from eflips.tco import TCOCalculator, calculate_tco, init_tco_parameters  # noqa: E402
+
+DEFAULT_EVENT_COUNTS = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def git_commit() -> str:
+    """
+    Get the current git commit of the repository, with a ``+dirty`` suffix if there are uncommitted changes.
+
+    :return: The commit hash, or "unknown" outside a git repository.
+    """
+    try:
+        repository = Path(__file__).resolve().parent
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=repository, text=True
+        ).strip()
+        dirty = subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repository,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("+dirty" if dirty else "")
+
+
+def get_database(database_dir: Path, size: SyntheticScenarioSize, seed: int) -> str:
+    """
+    Get the URL of a database with a synthetic scenario of the given size, generating it if it does not exist yet.
+
+    :param database_dir: The directory of the databases.
+    :param size: The size of the scenario.
+    :param seed: The seed of the scenario.
+    :return: The database URL. The scenario has the id 1.
+    """
+    path = database_dir / (
+        f"synthetic_{size.vehicle_types}_{size.vehicles}_{size.rotations_per_vehicle}_{size.trips_per_rotation}_"
+        f"{size.stations}_{size.depot_areas}_{seed}.db"
+    )
+    database_url = f"sqlite:///{path}"
+    if not path.exists():
+        database_dir.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.unlink(missing_ok=True)
+        engine = create_sqlite_engine(f"sqlite:///{temporary_path}")
+        start = time.perf_counter()
+        with Session(engine) as session:
+            create_synthetic_scenario(session, size, seed=seed)
+            session.commit()
+        engine.dispose()
+        os.replace(temporary_path, path)
+        print(
+            f"Generated {size.events} events in {time.perf_counter() - start:.1f} s: {path}",
+            file=sys.stderr,
+        )
+    return database_url
+
+
+def tco_parameters(database_url: str) -> Dict[str, Any]:
+    """
+    Get the keyword arguments of :func:`eflips.tco.init_tco_parameters` for all items of the synthetic scenario. The
+    parameters are the ones already stored, so that initializing them does not change the results of later runs.
+
+    :param database_url: The database URL.
+    :return: A dictionary of keyword arguments.
+    """
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session:
+        stations = {
+            station.charge_type: station.tco_parameters
+            for station in session.query(Station).filter(Station.scenario_id == 1)
+        }
+        result = {
+            "scenario_tco_parameters": dict(session.get(Scenario, 1).tco_parameters),
+            "vehicle_types": [
+                {"id": vehicle_type.id, **vehicle_type.tco_parameters}
+                for vehicle_type in session.query(VehicleType).filter(
+                    VehicleType.scenario_id == 1
+                )
+            ],
+            "battery_types": [
+                {"id": battery_type.id, **battery_type.tco_parameters}
+                for battery_type in session.query(BatteryType).filter(
+                    BatteryType.scenario_id == 1
+                )
+            ],
+            "charging_point_types": [
+                {"id": charging_point_type.id, **charging_point_type.tco_parameters}
+                for charging_point_type in session.query(ChargingPointType).filter(
+                    ChargingPointType.scenario_id == 1
+                )
+            ],
+            "charging_infrastructure": [
+                {"type": "station", **stations[ChargeType.oppb]},
+                {"type": "depot", **stations[ChargeType.depb]},
+            ],
+        }
+    engine.dispose()
+    return result
+
+
+def time_call(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Time a function.
+
+    :param function: The function, called without arguments.
+    :param repeat: The number of calls.
+    :return: A dictionary with the minimum and median wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def run_benchmarks(
+    event_counts: List[int], database_dir: Path, repeat: int = 3, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Run the benchmarks for each size.
+
+    :param event_counts: The approximate number of events of each scenario.
+    :param database_dir: The directory of the generated databases.
+    :param repeat: The number of repetitions of each operation.
+    :param seed: The seed of the synthetic scenarios.
+    :return: A list with one result dictionary per size.
+    """
+    commit = git_commit()
+    results = []
+    for event_count in event_counts:
+        size = SyntheticScenarioSize.for_event_count(event_count)
+        database_url = get_database(database_dir, size, seed)
+        parameters = tco_parameters(database_url)
+
+        tco_calculator = TCOCalculator(1, database_url)
+        timings = {
+            "construction": time_call(lambda: TCOCalculator(1, database_url), repeat),
+            "calculate": time_call(tco_calculator.calculate, repeat),
+            "calculate_tco": time_call(lambda: calculate_tco(1, database_url), repeat),
+            "init_tco_parameters": time_call(
+                lambda: init_tco_parameters(1, database_url, **parameters), repeat
+            ),
+        }
+
+        result = {
+            "commit": commit,
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "events": size.events,
+            "size": vars(size),
+            "seed": seed,
+            "tco_unit_distance": tco_calculator.tco_unit_distance,
+            "timings": timings,
+        }
+        print(
+            f"{size.events:>10} events: "
+            + ", ".join(
+                f"{name} {timing['min']:.3f} s" for name, timing in timings.items()
+            ),
+            file=sys.stderr,
+        )
+        results.append(result)
+    return results
+
+
+def compare(results: List[Dict[str, Any]], old_commit: str, new_commit: str) -> None:
+    """
+    Print the ratio of the minimum wall times of two commits for each size and operation.
+
+    :param results: The stored results.
+    :param old_commit: The (prefix of the) old commit.
+    :param new_commit: The (prefix of the) new commit.
+    """
+
+    def latest_by_events(commit: str) -> Dict[int, Dict[str, Any]]:
+        return {
+            result["events"]: result
+            for result in results
+            if result["commit"].startswith(commit)
+        }
+
+    old, new = latest_by_events(old_commit), latest_by_events(new_commit)
+    print(
+        f"{'events':>10} {'operation':<20} {'old [s]':>10} {'new [s]':>10} {'new/old':>8}"
+    )
+    for events in sorted(set(old) & set(new)):
+        for operation, old_timing in old[events]["timings"].items():
+            if operation not in new[events]["timings"]:
+                continue
+            old_time = old_timing["min"]
+            new_time = new[events]["timings"][operation]["min"]
+            print(
+                f"{events:>10} {operation:<20} {old_time:>10.3f} {new_time:>10.3f} {new_time / old_time:>8.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--events", type=int, nargs="+", default=DEFAULT_EVENT_COUNTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--database-dir", type=Path, default=Path(".benchmarks") / "databases"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=Path(".benchmarks") / "results.jsonl"
+    )
+    parser.add_argument("--compare", nargs=2, metavar=("OLD_COMMIT", "NEW_COMMIT"))
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        with open(args.output) as f:
+            results = [json.loads(line) for line in f if line.strip()]
+        compare(results, *args.compare)
+        return
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("eflips.tco").setLevel(logging.ERROR)
+    results = run_benchmarks(args.events, args.database_dir, args.repeat, args.seed)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "a") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
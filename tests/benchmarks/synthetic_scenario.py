@@ -0,0 +1,488 @@
+"""
+Generator for synthetic eflips-model scenarios stored in a local SQLite database.
+
+The scenarios are not meant to be realistic. They contain every table the TCO calculation touches (vehicle types,
+batteries, vehicles, rotations, trips, stations, depot areas, charging point types and events) in configurable
+amounts, so that the runtime of the TCO calculation can be measured on databases of a known size.
+
+SQLite has no PostGIS. The geometry columns of eflips-model stay empty and the spatial helper functions that
+GeoAlchemy and the check constraints refer to are registered as no-op functions on every connection.
+"""
+
+import datetime
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, event, insert, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from eflips.model import (
+    Area,
+    AreaType,
+    AssocAreaProcess,
+    Base,
+    BatteryType,
+    ChargeType,
+    ChargingPointType,
+    Depot,
+    Event,
+    EventType,
+    Line,
+    Plan,
+    Process,
+    Rotation,
+    Route,
+    Scenario,
+    Station,
+    Trip,
+    TripType,
+    Vehicle,
+    VehicleType,
+    VoltageLevel,
+)
+
+_SPATIAL_FUNCTIONS = (
+    "RecoverGeometryColumn",
+    "CreateSpatialIndex",
+    "DiscardGeometryColumn",
+    "CheckSpatialIndex",
+    "GeomFromEWKT",
+    "AsEWKB",
+    "AsBinary",
+    "ST_Area",
+    "ST_ExteriorRing",
+    "ST_IsValid",
+    "ST_Length",
+    "ST_NPoints",
+)
+
+SCENARIO_TCO_PARAMETERS: Dict[str, Any] = {
+    "project_duration": 20,
+    "interest_rate": 0.04,
+    "inflation_rate": 0.02,
+    "staff_cost": 25.0,
+    "fuel_cost": 0.1794,
+    "maint_cost": 0.35,
+    "maint_infr_cost": 1000,
+    "taxes": 278,
+    "insurance": 9693,
+    "pef_general": 0.02,
+    "pef_wages": 0.025,
+    "pef_fuel": 0.038,
+    "pef_insurance": 0.02,
+}
+
+
+@dataclass
+class SyntheticScenarioSize:
+    """
+    The number of objects of each kind in a synthetic scenario. The number of events follows from the other numbers:
+    every trip creates a driving event, every trip ending at an electrified terminal an opportunity charging event and
+    every rotation a depot charging event.
+    """
+
+    vehicle_types: int = 2
+    vehicles: int = 10
+    rotations_per_vehicle: int = 2
+    trips_per_rotation: int = 10
+    stations: int = 4
+    depot_areas: int = 2
+
+    @property
+    def rotations(self) -> int:
+        return self.vehicles * self.rotations_per_vehicle
+
+    @property
+    def trips(self) -> int:
+        return self.rotations * self.trips_per_rotation
+
+    @property
+    def events(self) -> int:
+        # Driving events plus one opportunity charging event after every second trip plus one depot charging event
+        return (
+            self.trips
+            + self.rotations * (self.trips_per_rotation // 2)
+            + self.rotations
+        )
+
+    @classmethod
+    def for_event_count(cls, events: int, **kwargs: int) -> "SyntheticScenarioSize":
+        """
+        Create a size whose event count is close to the given number by scaling the number of vehicles.
+
+        :param events: The approximate number of events.
+        :param kwargs: Other fields of :class:`SyntheticScenarioSize` that should be fixed.
+        :return: A :class:`SyntheticScenarioSize`.
+        """
+        size = cls(**kwargs)
+        events_per_vehicle = size.events / size.vehicles
+        size.vehicles = max(1, int(round(events / events_per_vehicle)))
+        return size
+
+
+@event.listens_for(Engine, "connect")
+def _register_spatial_functions(dbapi_connection, _) -> None:
+    """
+    Register the spatial functions as no-op functions on every new SQLite connection, including those of engines
+    created by the code under test from a database URL.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        for name in _SPATIAL_FUNCTIONS:
+            dbapi_connection.create_function(name, -1, lambda *args: None)
+    elif type(dbapi_connection).__name__.startswith("AsyncAdapt_aiosqlite"):
+        # The connection of the aiosqlite driver used by the asyncio API
+        for name in _SPATIAL_FUNCTIONS:
+            dbapi_connection.run_async(
+                lambda connection, name=name: connection.create_function(
+                    name, -1, lambda *args: None
+                )
+            )
+
+
+def create_sqlite_engine(database_url: str = "sqlite://") -> Engine:
+    """
+    Create an engine to a SQLite database and create the eflips-model schema in it.
+
+    :param database_url: The SQLite database URL. Defaults to an in-memory database.
+    :return: An :class:`sqlalchemy.engine.Engine`.
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _next_id(session: Session, table) -> int:
+    return (session.query(func.max(table.id)).scalar() or 0) + 1
+
+
+def create_synthetic_scenario(
+    session: Session,
+    size: Optional[SyntheticScenarioSize] = None,
+    seed: int = 0,
+    start: datetime.datetime = datetime.datetime(
+        2024, 1, 1, tzinfo=datetime.timezone.utc
+    ),
+) -> Scenario:
+    """
+    Create a synthetic scenario including TCO parameters for all items and add it to the session.
+
+    Each vehicle serves one rotation per day. A rotation is a sequence of trips alternating between the depot station
+    and the terminal stations, followed by a charging event in one of the depot areas. Every second trip is followed by
+    an opportunity charging event at its (electrified) arrival station.
+
+    :param session: An open session to a database with the eflips-model schema.
+    :param size: The size of the scenario. Defaults to :class:`SyntheticScenarioSize`'s defaults.
+    :param seed: The seed of the random number generator used for distances and durations.
+    :param start: The start of the first day of the simulation.
+    :return: The created :class:`eflips.model.Scenario`. The session is flushed, not committed.
+    """
+    size = size if size is not None else SyntheticScenarioSize()
+    rng = np.random.default_rng(seed)
+
+    scenario = Scenario(
+        name="Synthetic scenario", tco_parameters=dict(SCENARIO_TCO_PARAMETERS)
+    )
+    session.add(scenario)
+
+    # Vehicle types, one battery type each
+    vehicle_types = []
+    for i in range(size.vehicle_types):
+        battery_type = BatteryType(
+            scenario=scenario,
+            specific_mass=1.0,
+            chemistry={},
+            tco_parameters={
+                "procurement_cost": 190.0,
+                "useful_life": 7,
+                "cost_escalation": -0.03,
+            },
+        )
+        vehicle_type = VehicleType(
+            scenario=scenario,
+            name=f"Vehicle type {i}",
+            battery_capacity=300.0 + 100.0 * i,
+            charging_curve=[[0, 150], [1, 150]],
+            opportunity_charging_capable=True,
+            charging_efficiency=0.95,
+            battery_type=battery_type,
+            tco_parameters={
+                "name": f"Vehicle type {i}",
+                "procurement_cost": 340000.0 + 100000.0 * i,
+                "useful_life": 14,
+                "cost_escalation": 0.02,
+            },
+        )
+        vehicle_types.append(vehicle_type)
+    session.add_all(vehicle_types)
+
+    depot_cp_type = ChargingPointType(
+        scenario=scenario,
+        name="Depot Charging Point",
+        tco_parameters={
+            "name": "Depot Charging Point",
+            "procurement_cost": 100000.0,
+            "useful_life": 20,
+            "cost_escalation": 0.02,
+        },
+    )
+    opportunity_cp_type = ChargingPointType(
+        scenario=scenario,
+        name="Opportunity Charging Point",
+        tco_parameters={
+            "name": "Opportunity Charging Point",
+            "procurement_cost": 250000.0,
+            "useful_life": 20,
+            "cost_escalation": 0.02,
+        },
+    )
+    session.add_all([depot_cp_type, opportunity_cp_type])
+
+    def electrified_station(
+        name: str, charge_type: ChargeType, procurement_cost: float
+    ) -> Station:
+        return Station(
+            scenario=scenario,
+            name=name,
+            is_electrified=True,
+            is_electrifiable=True,
+            amount_charging_places=10,
+            power_per_charger=300.0,
+            power_total=3000.0,
+            charge_type=charge_type,
+            voltage_level=VoltageLevel.MV,
+            tco_parameters={
+                "procurement_cost": procurement_cost,
+                "useful_life": 20,
+                "cost_escalation": 0.02,
+            },
+        )
+
+    depot_station = electrified_station("Depot", ChargeType.depb, 3400000.0)
+    terminals = [
+        electrified_station(f"Terminal {i}", ChargeType.oppb, 500000.0)
+        for i in range(size.stations)
+    ]
+    for terminal in terminals:
+        terminal.charging_point_type = opportunity_cp_type
+    session.add(depot_station)
+    session.add_all(terminals)
+
+    plan = Plan(scenario=scenario, name="Default plan")
+    depot = Depot(
+        scenario=scenario, name="Depot", station=depot_station, default_plan=plan
+    )
+    charging_process = Process(
+        scenario=scenario, name="Charging", dispatchable=False, electric_power=150.0
+    )
+    areas = [
+        Area(
+            scenario=scenario,
+            depot=depot,
+            name=f"Area {i}",
+            area_type=AreaType.DIRECT_ONESIDE,
+            capacity=max(1, size.vehicles),
+            vehicle_type=vehicle_types[i % len(vehicle_types)],
+            charging_point_type=depot_cp_type,
+        )
+        for i in range(size.depot_areas)
+    ]
+    session.add_all([plan, depot, charging_process] + areas)
+
+    # Routes from and to the depot station for every terminal
+    line = Line(scenario=scenario, name="Line 1")
+    routes_out, routes_in = [], []
+    for terminal in terminals:
+        distance = float(rng.uniform(5000.0, 20000.0))
+        routes_out.append(
+            Route(
+                scenario=scenario,
+                line=line,
+                name=f"Depot - {terminal.name}",
+                departure_station=depot_station,
+                arrival_station=terminal,
+                distance=distance,
+            )
+        )
+        routes_in.append(
+            Route(
+                scenario=scenario,
+                line=line,
+                name=f"{terminal.name} - Depot",
+                departure_station=terminal,
+                arrival_station=depot_station,
+                distance=distance,
+            )
+        )
+    session.add(line)
+    session.add_all(routes_out + routes_in)
+    session.flush()
+
+    # The constant energy consumption in kWh/km per vehicle type, used by calculate_tco
+    scenario.tco_parameters = dict(
+        scenario.tco_parameters,
+        const_energy_consumption={
+            str(vehicle_type.id): 1.2 + 0.2 * i
+            for i, vehicle_type in enumerate(vehicle_types)
+        },
+    )
+
+    for area in areas:
+        session.add(AssocAreaProcess(area_id=area.id, process_id=charging_process.id))
+
+    # Vehicles, rotations, trips and events are inserted in bulk
+    vehicle_rows = []
+    vehicle_id = _next_id(session, Vehicle)
+    for i in range(size.vehicles):
+        vehicle_rows.append(
+            {
+                "id": vehicle_id + i,
+                "scenario_id": scenario.id,
+                "vehicle_type_id": vehicle_types[i % len(vehicle_types)].id,
+                "name": f"Vehicle {i}",
+            }
+        )
+    session.execute(insert(Vehicle), vehicle_rows)
+
+    rotation_id = _next_id(session, Rotation)
+    trip_id = _next_id(session, Trip)
+    event_id = _next_id(session, Event)
+    rotation_rows, trip_rows, event_rows = [], [], []
+
+    def flush_rows() -> None:
+        if rotation_rows:
+            session.execute(insert(Rotation), rotation_rows)
+        if trip_rows:
+            session.execute(insert(Trip), trip_rows)
+        if event_rows:
+            session.execute(insert(Event), event_rows)
+        rotation_rows.clear()
+        trip_rows.clear()
+        event_rows.clear()
+
+    areas_by_vehicle_type = {
+        vt.id: [a for a in areas if a.vehicle_type_id == vt.id] or areas
+        for vt in vehicle_types
+    }
+    trip_minutes = rng.integers(20, 60, size=(size.rotations, size.trips_per_rotation))
+    vehicle_type_capacity = {vt.id: vt.battery_capacity for vt in vehicle_types}
+
+    rotation_index = 0
+    for day in range(size.rotations_per_vehicle):
+        for vehicle in vehicle_rows:
+            vehicle_type_id = vehicle["vehicle_type_id"]
+            rotation_rows.append(
+                {
+                    "id": rotation_id,
+                    "scenario_id": scenario.id,
+                    "vehicle_type_id": vehicle_type_id,
+                    "vehicle_id": vehicle["id"],
+                    "allow_opportunity_charging": True,
+                    "name": f"Rotation {rotation_id}",
+                }
+            )
+
+            time = start + datetime.timedelta(
+                days=day, hours=5, minutes=int(vehicle["id"] % 60)
+            )
+            soc = 1.0
+            for trip_number in range(size.trips_per_rotation):
+                terminal_index = (vehicle["id"] + trip_number // 2) % len(terminals)
+                route = (
+                    routes_out[terminal_index]
+                    if trip_number % 2 == 0
+                    else routes_in[terminal_index]
+                )
+                duration = datetime.timedelta(
+                    minutes=int(trip_minutes[rotation_index, trip_number])
+                )
+                soc_end = (
+                    soc
+                    - route.distance
+                    / 1000
+                    * 1.2
+                    / vehicle_type_capacity[vehicle_type_id]
+                )
+                trip_rows.append(
+                    {
+                        "id": trip_id,
+                        "scenario_id": scenario.id,
+                        "route_id": route.id,
+                        "rotation_id": rotation_id,
+                        "departure_time": time,
+                        "arrival_time": time + duration,
+                        "trip_type": TripType.PASSENGER,
+                    }
+                )
+                event_rows.append(
+                    {
+                        "id": event_id,
+                        "scenario_id": scenario.id,
+                        "vehicle_type_id": vehicle_type_id,
+                        "vehicle_id": vehicle["id"],
+                        "trip_id": trip_id,
+                        "time_start": time,
+                        "time_end": time + duration,
+                        "soc_start": soc,
+                        "soc_end": soc_end,
+                        "event_type": EventType.DRIVING,
+                    }
+                )
+                event_id += 1
+                trip_id += 1
+                time += duration
+                soc = soc_end
+
+                if trip_number % 2 == 0:
+                    charging_duration = datetime.timedelta(minutes=8)
+                    soc_end = min(1.0, soc + 0.02)
+                    event_rows.append(
+                        {
+                            "id": event_id,
+                            "scenario_id": scenario.id,
+                            "vehicle_type_id": vehicle_type_id,
+                            "vehicle_id": vehicle["id"],
+                            "station_id": terminals[terminal_index].id,
+                            "subloc_no": 0,
+                            "time_start": time,
+                            "time_end": time + charging_duration,
+                            "soc_start": soc,
+                            "soc_end": soc_end,
+                            "event_type": EventType.CHARGING_OPPORTUNITY,
+                        }
+                    )
+                    event_id += 1
+                    time += charging_duration
+                    soc = soc_end
+                else:
+                    time += datetime.timedelta(minutes=2)
+
+            area_candidates = areas_by_vehicle_type[vehicle_type_id]
+            area = area_candidates[vehicle["id"] % len(area_candidates)]
+            event_rows.append(
+                {
+                    "id": event_id,
+                    "scenario_id": scenario.id,
+                    "vehicle_type_id": vehicle_type_id,
+                    "vehicle_id": vehicle["id"],
+                    "station_id": depot_station.id,
+                    "area_id": area.id,
+                    "subloc_no": 0,
+                    "time_start": time,
+                    "time_end": time + datetime.timedelta(hours=3),
+                    "soc_start": soc,
+                    "soc_end": 1.0,
+                    "event_type": EventType.CHARGING_DEPOT,
+                }
+            )
+            event_id += 1
+            rotation_id += 1
+            rotation_index += 1
+
+            if len(event_rows) >= 50_000:
+                flush_rows()
+    flush_rows()
+    session.flush()
+    return scenario
@@ -0,0 +1,61 @@
+import asyncio
+import warnings
+
+import pytest
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic_scenario import (
+    SyntheticScenarioSize,
+    create_sqlite_engine,
+    create_synthetic_scenario,
+)
+from eflips.model import Scenario
+
+from eflips.tco import ScenarioFacts, calculate_tco
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    database_url = f"sqlite:///{tmp_path_factory.mktemp('database') / 'async.db'}"
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        create_synthetic_scenario(session, SyntheticScenarioSize(vehicles=6), seed=1)
+        session.commit()
+    engine.dispose()
+    return database_url
+
+
+class TestAsyncAPI:
+    @pytest.mark.parametrize("energy_consumption_mode", ["simulated", "constant"])
+    def test_load_scenario_facts_async(self, database_url, energy_consumption_mode):
+        from eflips.tco import load_scenario_facts_async
+
+        facts = asyncio.run(
+            load_scenario_facts_async(
+                1, database_url, energy_consumption_mode=energy_consumption_mode
+            )
+        )
+
+        engine = create_sqlite_engine(database_url)
+        with Session(engine) as session:
+            expected = ScenarioFacts.from_session(
+                session, session.get(Scenario, 1), energy_consumption_mode
+            )
+        engine.dispose()
+        assert facts == expected
+
+    def test_calculate_tco_async(self, database_url):
+        from eflips.tco import calculate_tco_async
+
+        result = asyncio.run(calculate_tco_async(1, database_url))
+        assert result == calculate_tco(1, database_url)
+        assert result["VEHICLE"] != 1.0
+
+        # A missing scenario is an error, not dummy data
+        with pytest.raises(NoResultFound):
+            asyncio.run(calculate_tco_async(2, database_url))
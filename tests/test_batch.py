@@ -0,0 +1,78 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic_scenario import (
+    SCENARIO_TCO_PARAMETERS,
+    SyntheticScenarioSize,
+    create_sqlite_engine,
+    create_synthetic_scenario,
+)
+from eflips.model import Scenario
+
+from eflips.tco import TCOError, batch, calculate_tco, calculate_tco_many
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    database_url = f"sqlite:///{tmp_path_factory.mktemp('database') / 'batch.db'}"
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        create_synthetic_scenario(session, SyntheticScenarioSize(vehicles=4), seed=1)
+
+        # A scenario without any simulation results, whose facts cannot be extracted
+        session.add(
+            Scenario(name="Not simulated", tco_parameters=dict(SCENARIO_TCO_PARAMETERS))
+        )
+        session.commit()
+    engine.dispose()
+    return database_url
+
+
+class RecordingExecutor(ProcessPoolExecutor):
+    futures = []
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.futures.append(future)
+        return future
+
+
+class TestCalculateTCOMany:
+    def test_failing_scenario(self, database_url):
+        results = dict(calculate_tco_many([1, 2, 3], database_url, max_workers=2))
+
+        assert results[1] == calculate_tco(1, database_url)
+        assert results[1]["VEHICLE"] != 1.0
+
+        # The scenario without simulation results and the missing scenario fail instead of returning dummy data
+        for scenario_id in (2, 3):
+            assert isinstance(results[scenario_id], TCOError)
+            assert results[scenario_id].scenario_id == scenario_id
+            assert results[scenario_id].traceback
+        assert results[3].error_type == "NoResultFound"
+
+    def test_stop_early(self, database_url, monkeypatch):
+        monkeypatch.setattr(batch, "ProcessPoolExecutor", RecordingExecutor)
+        RecordingExecutor.futures = []
+
+        results = calculate_tco_many([1] * 20, database_url, max_workers=1)
+        scenario_id, result = next(results)
+        results.close()
+
+        assert scenario_id == 1
+        assert result["VEHICLE"] != 1.0
+        futures = RecordingExecutor.futures
+        assert len(futures) == 20
+        # Only the scenarios already handed to the worker process are run
+        assert all(future.done() for future in futures)
+        assert sum(future.cancelled() for future in futures) >= 15
+
+    def test_no_database_url(self, monkeypatch):
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        with pytest.raises(ValueError):
+            list(calculate_tco_many([1]))
+        assert list(calculate_tco_many([], "sqlite://")) == []
@@ -0,0 +1,150 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from eflips.tco.cost_items import (
+    CapexItem,
+    CapexItemType,
+    OpexItem,
+    OpexItemType,
+    capex_cash_flows,
+    capex_present_value,
+    discount_cash_flows,
+    net_present_value,
+    opex_cash_flows,
+    opex_present_value,
+)
+
+
+class TestCapexPresentValue:
+    @pytest.mark.parametrize(
+        "useful_life, project_duration, cost_escalation, interest_rate, discount_rate",
+        itertools.product(
+            [1, 7, 14, 20, 25],
+            [1, 12, 20],
+            [-0.03, 0.0, 0.02],
+            [0.04, 0.025],
+            [0.02, 0.0],
+        ),
+    )
+    def test_matches_year_by_year_calculation(
+        self,
+        useful_life,
+        project_duration,
+        cost_escalation,
+        interest_rate,
+        discount_rate,
+    ):
+        item = CapexItem(
+            name="Asset",
+            type=CapexItemType.VEHICLE,
+            useful_life=useful_life,
+            procurement_cost=340000.0,
+            cost_escalation=cost_escalation,
+            quantity=1,
+        )
+        expected = item.calculate_total_procurement_cost(
+            project_duration, interest_rate, discount_rate
+        )
+        actual = capex_present_value(
+            340000.0,
+            useful_life,
+            cost_escalation,
+            project_duration,
+            interest_rate,
+            discount_rate,
+        )
+        assert actual == pytest.approx(expected, rel=1e-12)
+
+    def test_zero_interest_rate(self):
+        # Without interest, the annuities are the procurement cost split evenly over the useful life
+        actual = capex_present_value(1000.0, 10, 0.0, 20, 0.0, 0.0)
+        assert actual == pytest.approx(2000.0)
+
+    def test_broadcasting(self):
+        procurement_cost = np.array([340000.0, 57000.0, 100000.0])
+        useful_life = np.array([14, 7, 20])
+        cost_escalation = np.array([0.02, -0.03, 0.02])
+        interest_rate = np.array([[0.03], [0.04]])
+
+        actual = capex_present_value(
+            procurement_cost, useful_life, cost_escalation, 20, interest_rate, 0.02
+        )
+
+        assert actual.shape == (2, 3)
+        for i, j in itertools.product(range(2), range(3)):
+            item = CapexItem(
+                "Asset",
+                CapexItemType.VEHICLE,
+                useful_life[j],
+                procurement_cost[j],
+                cost_escalation[j],
+                1,
+            )
+            expected = item.calculate_total_procurement_cost(
+                20, interest_rate[i, 0], 0.02
+            )
+            assert actual[i, j] == pytest.approx(expected, rel=1e-12)
+
+
+class TestOpexPresentValue:
+    @pytest.mark.parametrize(
+        "cost_escalation, discount_rate, project_duration",
+        itertools.product([0.0, 0.02, 0.038], [0.0, 0.02], [1, 20]),
+    )
+    def test_matches_year_by_year_calculation(
+        self, cost_escalation, discount_rate, project_duration
+    ):
+        item = OpexItem(
+            name="Fuel Cost",
+            type=OpexItemType.ENERGY,
+            unit_cost=0.1794,
+            usage_amount=1.5e6,
+            cost_escalation=cost_escalation,
+        )
+        expected = sum(
+            net_present_value(item.future_cost(year), year, discount_rate)
+            for year in range(project_duration)
+        )
+        actual = opex_present_value(
+            0.1794, 1.5e6, cost_escalation, project_duration, discount_rate
+        )
+        assert actual == pytest.approx(expected, rel=1e-12)
+
+
+class TestCashFlows:
+    @pytest.mark.parametrize(
+        "useful_life, project_duration, cost_escalation",
+        itertools.product([1, 7, 14, 20, 25], [1, 12, 20], [-0.03, 0.02]),
+    )
+    def test_capex_cash_flows_match_present_value(
+        self, useful_life, project_duration, cost_escalation
+    ):
+        cash_flows = capex_cash_flows(
+            340000.0, useful_life, cost_escalation, project_duration, 0.04, 30
+        )
+        actual = discount_cash_flows(cash_flows, 0.02).sum()
+        expected = capex_present_value(
+            340000.0, useful_life, cost_escalation, project_duration, 0.04, 0.02
+        )
+        assert actual == pytest.approx(expected, rel=1e-12)
+
+    def test_capex_cash_flows_annuities(self):
+        # Two full procurements of 10 years and half of a third one
+        cash_flows = capex_cash_flows(1000.0, 10, 0.0, 25, 0.0, 30)
+        assert cash_flows.tolist() == [100.0] * 20 + [50.0] * 10
+
+    def test_opex_cash_flows(self):
+        cash_flows = opex_cash_flows(
+            np.array([0.2, 50.0]), np.array([1e6, 10.0]), 0.02, 20, 25
+        )
+        assert cash_flows.shape == (2, 25)
+        assert cash_flows[0, 3] == pytest.approx(0.2 * 1e6 * 1.02**3)
+        assert np.all(cash_flows[:, 20:] == 0.0)
+        assert discount_cash_flows(cash_flows, 0.02).sum(axis=-1) == pytest.approx(
+            opex_present_value(
+                np.array([0.2, 50.0]), np.array([1e6, 10.0]), 0.02, 20, 0.02
+            ),
+            rel=1e-12,
+        )
@@ -0,0 +1,338 @@
+import warnings
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic_scenario import (
+    SyntheticScenarioSize,
+    create_sqlite_engine,
+    create_synthetic_scenario,
+)
+from eflips.model import (
+    Area,
+    BatteryType,
+    ChargingPointType,
+    Depot,
+    Event,
+    EventType,
+    Process,
+    Scenario,
+    Station,
+    VehicleType,
+)
+
+from eflips.tco import init_tco_parameters, init_tco_parameters_many
+from eflips.tco.data_queries import _PeakOccupancyAccumulator, _peak_occupancy
+
+VEHICLE_PARAMETERS = {
+    "name": "Bus",
+    "useful_life": 12,
+    "procurement_cost": 400000.0,
+    "cost_escalation": 0.025,
+}
+BATTERY_PARAMETERS = {
+    "name": "Battery",
+    "useful_life": 6,
+    "procurement_cost": 180.0,
+    "cost_escalation": -0.02,
+}
+CHARGING_POINT_PARAMETERS = {
+    "name": "Charging Point",
+    "useful_life": 15,
+    "procurement_cost": 90000.0,
+    "cost_escalation": 0.02,
+}
+STATION_PARAMETERS = {
+    "name": "Station",
+    "useful_life": 25,
+    "procurement_cost": 500000.0,
+    "cost_escalation": 0.02,
+}
+DEPOT_PARAMETERS = {
+    "name": "Depot",
+    "useful_life": 30,
+    "procurement_cost": 3000000.0,
+    "cost_escalation": 0.02,
+}
+
+
+class TestPeakOccupancy:
+    def test_matches_sampled_occupancy(self):
+        rng = np.random.default_rng(0)
+        group_ids = rng.integers(0, 3, 200)
+        time_start = rng.uniform(0, 86400, 200)
+        time_end = time_start + rng.uniform(0, 7200, 200)
+        grid_origins = {0: -12.0, 1: 0.0, 2: 30.5, 3: 0.0}
+
+        peak = _peak_occupancy(group_ids, time_start, time_end, grid_origins, 60)
+
+        for group_id, origin in grid_origins.items():
+            grid = np.arange(origin, 86400 + 7200, 60)
+            in_group = group_ids == group_id
+            occupancy = (
+                (time_start[in_group, None] <= grid)
+                & (grid <= time_end[in_group, None] - 60)
+            ).sum(axis=0)
+            assert peak[group_id] == occupancy.max()
+
+    def test_short_events(self):
+        # Events shorter than the temporal resolution are only counted if they cover a grid point
+        peak = _peak_occupancy(
+            np.array([1, 1, 2]),
+            np.array([60.0, 70.0, 0.0]),
+            np.array([120.0, 120.0, 30.0]),
+            {1: 0.0, 2: 0.0},
+            60,
+        )
+        assert peak == {1: 1, 2: 0}
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 50, 1000])
+    def test_chunked_accumulation(self, chunk_size):
+        rng = np.random.default_rng(1)
+        group_ids = rng.integers(0, 3, 300)
+        time_start = np.sort(rng.uniform(0, 86400, 300))
+        time_end = time_start + rng.uniform(0, 14400, 300)
+        grid_origins = {0: 0.0, 1: 7.0, 2: 59.0}
+
+        accumulator = _PeakOccupancyAccumulator(grid_origins, 60)
+        for start in range(0, 300, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            accumulator.add(group_ids[chunk], time_start[chunk], time_end[chunk])
+
+        assert accumulator.peak == _peak_occupancy(
+            group_ids, time_start, time_end, grid_origins, 60
+        )
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'parameters.db'}"
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        create_synthetic_scenario(session, SyntheticScenarioSize(vehicles=4), seed=1)
+        create_synthetic_scenario(
+            session, SyntheticScenarioSize(vehicle_types=3, vehicles=5), seed=2
+        )
+        session.commit()
+    engine.dispose()
+    return database_url
+
+
+@pytest.fixture
+def session(database_url):
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def ids(session, table, scenario_id):
+    return [
+        row_id
+        for (row_id,) in session.query(table.id)
+        .filter(table.scenario_id == scenario_id)
+        .order_by(table.id)
+    ]
+
+
+def parameters_of(session, scenario_id):
+    """All parameters of a scenario, as given to init_tco_parameters."""
+    vehicle_type_ids = ids(session, VehicleType, scenario_id)
+    battery_type_ids = ids(session, BatteryType, scenario_id)
+    charging_point_type_ids = ids(session, ChargingPointType, scenario_id)
+    return {
+        "scenario_tco_parameters": {"project_duration": 12 + scenario_id},
+        "vehicle_types": [
+            {"id": vehicle_type_id, "unknown": 1.0, **VEHICLE_PARAMETERS}
+            for vehicle_type_id in vehicle_type_ids
+        ],
+        "battery_types": [
+            {"id": battery_type_ids[0], **BATTERY_PARAMETERS},
+            {"vehicle_type_id": vehicle_type_ids[-1], **BATTERY_PARAMETERS},
+        ],
+        "charging_point_types": [
+            {"id": charging_point_type_ids[0], **CHARGING_POINT_PARAMETERS},
+            {"type": "depot", **CHARGING_POINT_PARAMETERS},
+            {"type": "opportunity", **CHARGING_POINT_PARAMETERS},
+        ],
+        "charging_infrastructure": [
+            {"type": "station", **STATION_PARAMETERS},
+            {"type": "depot", **DEPOT_PARAMETERS},
+        ],
+    }
+
+
+def snapshot(session, scenario_id):
+    """The tco parameters and assignments of all rows of a scenario."""
+    session.expire_all()
+    return {
+        "scenario": session.get(Scenario, scenario_id).tco_parameters,
+        "vehicle_types": [
+            (vehicle_type.id, vehicle_type.tco_parameters, vehicle_type.battery_type_id)
+            for vehicle_type in session.query(VehicleType).filter(
+                VehicleType.scenario_id == scenario_id
+            )
+        ],
+        "battery_types": [
+            (battery_type.id, battery_type.tco_parameters)
+            for battery_type in session.query(BatteryType).filter(
+                BatteryType.scenario_id == scenario_id
+            )
+        ],
+        "stations": [
+            (station.id, station.tco_parameters, station.charging_point_type_id)
+            for station in session.query(Station).filter(
+                Station.scenario_id == scenario_id
+            )
+        ],
+        "areas": [
+            (area.id, area.charging_point_type_id)
+            for area in session.query(Area).filter(Area.scenario_id == scenario_id)
+        ],
+    }
+
+
+def assert_initialized(session, scenario_id, parameters):
+    session.expire_all()
+    assert (
+        session.get(Scenario, scenario_id).tco_parameters
+        == parameters["scenario_tco_parameters"]
+    )
+
+    # Only the tco keys are stored
+    for vehicle_type in session.query(VehicleType).filter(
+        VehicleType.scenario_id == scenario_id
+    ):
+        assert vehicle_type.tco_parameters == VEHICLE_PARAMETERS
+
+    # An existing battery type is updated and a new one is assigned to the vehicle type
+    battery_types = parameters["battery_types"]
+    assert session.get(BatteryType, battery_types[0]["id"]).tco_parameters == (
+        BATTERY_PARAMETERS
+    )
+    new_battery_type = session.get(
+        VehicleType, battery_types[1]["vehicle_type_id"]
+    ).battery_type
+    assert new_battery_type.id != battery_types[0]["id"]
+    assert new_battery_type.scenario_id == scenario_id
+    assert new_battery_type.tco_parameters == BATTERY_PARAMETERS
+    assert (new_battery_type.specific_mass, new_battery_type.chemistry) == (
+        1.0,
+        "unknown",
+    )
+
+    charging_point_types = (
+        session.query(ChargingPointType)
+        .filter(ChargingPointType.scenario_id == scenario_id)
+        .order_by(ChargingPointType.id)
+        .all()
+    )
+    assert charging_point_types[0].id == parameters["charging_point_types"][0]["id"]
+    depot_cp_type, opportunity_cp_type = charging_point_types[-2:]
+    for charging_point_type in (
+        charging_point_types[0],
+        depot_cp_type,
+        opportunity_cp_type,
+    ):
+        assert charging_point_type.tco_parameters == CHARGING_POINT_PARAMETERS
+
+    # The new depot charging point type is assigned to all areas with a charging process
+    charging_area_ids = {
+        area_id
+        for (area_id,) in session.query(Area.id).filter(
+            Area.scenario_id == scenario_id,
+            Area.processes.any(Process.electric_power.isnot(None)),
+        )
+    }
+    assert len(charging_area_ids) > 0
+    for area in session.query(Area).filter(Area.scenario_id == scenario_id):
+        if area.id in charging_area_ids:
+            assert area.charging_point_type_id == depot_cp_type.id
+        else:
+            assert area.charging_point_type_id != depot_cp_type.id
+
+    # The new opportunity charging point type and the station parameters are assigned to the stations with
+    # opportunity charging events, the depot parameters to the depot stations
+    opportunity_station_ids = {
+        station_id
+        for (station_id,) in session.query(Event.station_id).filter(
+            Event.scenario_id == scenario_id,
+            Event.event_type == EventType.CHARGING_OPPORTUNITY,
+        )
+    }
+    depot_station_ids = {
+        station_id
+        for (station_id,) in session.query(Depot.station_id).filter(
+            Depot.scenario_id == scenario_id
+        )
+    }
+    assert len(opportunity_station_ids) > 0 and len(depot_station_ids) > 0
+    for station in session.query(Station).filter(Station.scenario_id == scenario_id):
+        if station.id in opportunity_station_ids:
+            assert station.charging_point_type_id == opportunity_cp_type.id
+        else:
+            assert station.charging_point_type_id != opportunity_cp_type.id
+        if station.id in depot_station_ids:
+            assert station.tco_parameters == DEPOT_PARAMETERS
+        elif station.id in opportunity_station_ids:
+            assert station.tco_parameters == STATION_PARAMETERS
+        else:
+            assert station.tco_parameters not in (STATION_PARAMETERS, DEPOT_PARAMETERS)
+
+
+class TestInitTCOParameters:
+    def test_init_tco_parameters(self, database_url, session):
+        parameters = parameters_of(session, 1)
+        other_scenario = snapshot(session, 2)
+
+        init_tco_parameters(1, database_url, **parameters)
+
+        assert_initialized(session, 1, parameters)
+        assert snapshot(session, 2) == other_scenario
+
+    def test_unknown_ids(self, database_url, session):
+        other_vehicle_type_id = ids(session, VehicleType, 2)[0]
+
+        with pytest.raises(
+            AssertionError,
+            match=f"VehicleType with id {other_vehicle_type_id} found in scenario 1. Now there are 0.",
+        ):
+            init_tco_parameters(
+                1,
+                database_url,
+                vehicle_types=[{"id": other_vehicle_type_id, **VEHICLE_PARAMETERS}],
+            )
+        with pytest.raises(ValueError):
+            init_tco_parameters(
+                1,
+                database_url,
+                charging_infrastructure=[{"type": "terminal", **STATION_PARAMETERS}],
+            )
+
+    def test_init_tco_parameters_many(self, database_url, session):
+        parameters = {
+            scenario_id: parameters_of(session, scenario_id) for scenario_id in (1, 2)
+        }
+
+        init_tco_parameters_many(parameters, database_url)
+
+        for scenario_id, scenario_parameters in parameters.items():
+            assert_initialized(session, scenario_id, scenario_parameters)
+
+    def test_init_tco_parameters_many_rollback(self, database_url, session):
+        before = {scenario_id: snapshot(session, scenario_id) for scenario_id in (1, 2)}
+        parameters = {
+            1: parameters_of(session, 1),
+            2: {"vehicle_types": [{"id": ids(session, VehicleType, 1)[0]}]},
+        }
+
+        # The second scenario fails, so neither scenario is changed
+        with pytest.raises(AssertionError, match="Now there are 0."):
+            init_tco_parameters_many(parameters, database_url)
+        with pytest.raises(ValueError):
+            init_tco_parameters_many({3: parameters_of(session, 1)}, database_url)
+
+        for scenario_id in (1, 2):
+            assert snapshot(session, scenario_id) == before[scenario_id]
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from eflips.tco import util
+from eflips.tco.util import dispose_engines, engine_options, get_engine
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    yield f"sqlite:///{tmp_path / 'engines.db'}"
+    dispose_engines()
+
+
+class TestEngineRegistry:
+    def test_reuse(self, database_url, tmp_path):
+        engine = get_engine(database_url)
+        assert get_engine(database_url) is engine
+        assert get_engine(f"sqlite:///{tmp_path / 'other.db'}") is not engine
+
+        # Other pool options get their own engine
+        recycled = get_engine(database_url, pool_recycle=60)
+        assert recycled is not engine
+        assert get_engine(database_url, pool_recycle=60) is recycled
+        assert recycled.pool._recycle == 60
+        assert engine.pool._recycle == 3600
+
+    def test_options(self):
+        assert engine_options("postgresql://localhost/eflips", pool_size=2) == {
+            "pool_size": 2,
+            "max_overflow": 10,
+            "pool_pre_ping": True,
+            "pool_recycle": 3600,
+        }
+        assert "pool_size" not in engine_options("sqlite://", pool_size=2)
+        with pytest.raises(TypeError):
+            get_engine("sqlite://", pool_timeout=10)
+
+    def test_dispose_engines(self, database_url):
+        engine = get_engine(database_url)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert engine.pool.checkedin() == 1
+
+        dispose_engines()
+        assert engine.pool.checkedin() == 0
+        assert util._engines == {}
+        assert get_engine(database_url) is not engine
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_reset_after_fork(self, database_url):
+        engine = get_engine(database_url)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        pool = engine.pool
+        assert pool.checkedin() == 1
+
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # The child gets a new, empty pool of the same engine and can open its own connections
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                ok = engine.pool is not pool and get_engine(database_url) is engine
+                os.write(write, b"1" if ok else b"0")
+            finally:
+                os._exit(0)
+        os.close(write)
+        os.waitpid(pid, 0)
+        assert os.read(read, 1) == b"1"
+        os.close(read)
+
+        # The parent's connection was neither closed nor replaced by the child
+        assert engine.pool is pool
+        assert pool.checkedin() == 1
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
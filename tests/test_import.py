@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 0.25
+"The maximum time in seconds importing eflips.tco may take on top of importing eflips.model."
+
+
+def import_times(module: str) -> dict:
+    """Import a module in a fresh interpreter and return the cumulative import time of each module in seconds."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+class TestImport:
+    def test_heavy_dependencies_are_not_imported(self):
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, eflips.tco; print(' '.join(m for m in ('matplotlib', 'eflips.eval', 'sqlalchemy.ext.asyncio')"
+                " if m in sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert process.stdout.strip() == ""
+
+    def test_import_time_budget(self):
+        # The fastest of a few runs, to reduce the influence of other processes
+        own_import_time = min(
+            times["eflips.tco"] - times["eflips.model"]
+            for times in (import_times("eflips.tco") for _ in range(3))
+        )
+        assert own_import_time < IMPORT_TIME_BUDGET
@@ -0,0 +1,333 @@
+import datetime
+import warnings
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic_scenario import (
+    SyntheticScenarioSize,
+    create_sqlite_engine,
+    create_synthetic_scenario,
+)
+from eflips.eval.output.prepare import power_and_occupancy
+from eflips.model import Area, Event, Scenario, Station
+
+from eflips.tco import (
+    FactsCache,
+    ScenarioFacts,
+    TCOCalculator,
+    calculate_tco,
+    data_queries,
+)
+from eflips.tco.data_queries import (
+    QueryContext,
+    calc_energy_consumption_simulated,
+    calculate_total_driver_hours,
+    get_annual_fleet_mileage,
+    get_charging_energy_profile,
+    get_mileage_per_vehicle_type,
+    get_simulation_period,
+    load_capex_items_infrastructure,
+    paid_driver_hours,
+    peak_charging_occupancy,
+)
+
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    database_url = f"sqlite:///{tmp_path_factory.mktemp('database') / 'synthetic.db'}"
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        create_synthetic_scenario(session, SyntheticScenarioSize(vehicles=12), seed=1)
+        create_synthetic_scenario(
+            session,
+            SyntheticScenarioSize(vehicle_types=3, vehicles=7, stations=2),
+            seed=2,
+        )
+        session.commit()
+    engine.dispose()
+    return database_url
+
+
+@pytest.fixture
+def session(database_url):
+    engine = create_sqlite_engine(database_url)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+class TestIntegration:
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_facts_and_calculate_many(self, session, scenario_id):
+        scenario = session.get(Scenario, scenario_id)
+        tco_calculator = TCOCalculator(scenario)
+        tco_calculator.calculate()
+
+        from_facts = TCOCalculator.from_facts(
+            ScenarioFacts.from_dict(tco_calculator.facts.to_dict())
+        )
+        from_facts.calculate()
+        assert from_facts.tco_by_type == tco_calculator.tco_by_type
+
+        result = tco_calculator.calculate_many({"fuel_cost": [np.nan]})
+        assert result.tco_unit_distance[0] == pytest.approx(
+            tco_calculator.tco_unit_distance, rel=1e-12
+        )
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_vehicle_type_statistics(self, session, scenario_id):
+        scenario = session.get(Scenario, scenario_id)
+        facts = ScenarioFacts.from_session(session, scenario)
+
+        assert facts.annual_fleet_mileage == pytest.approx(
+            get_annual_fleet_mileage(session, scenario), rel=1e-12
+        )
+        assert facts.mileage_per_vehicle_type == pytest.approx(
+            get_mileage_per_vehicle_type(session, scenario)
+        )
+        assert facts.total_driver_hours == calculate_total_driver_hours(
+            session, scenario
+        )
+        assert facts.energy_consumption_simulated == pytest.approx(
+            calc_energy_consumption_simulated(session, scenario), rel=1e-12
+        )
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+        by_vehicle_type = tco_calculator.tco_by_vehicle_type()
+        assert by_vehicle_type.cost.sum() == pytest.approx(
+            tco_calculator.tco_over_project_duration, rel=1e-12
+        )
+        for item_type, value in tco_calculator.tco_by_type.items():
+            assert np.sum(
+                by_vehicle_type.tco_by_type[item_type] * by_vehicle_type.annual_mileage
+            ) == pytest.approx(value * tco_calculator.annual_fleet_mileage, rel=1e-12)
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_total_driver_hours(self, session, scenario_id):
+        scenario = session.get(Scenario, scenario_id)
+
+        # The sum of the event durations in the database equals the sum over the loaded events
+        driver_hours = datetime.timedelta(seconds=0)
+        for event in session.query(Event).filter(
+            Event.scenario_id == scenario_id,
+            Event.event_type.in_(["DRIVING", "CHARGING_OPPORTUNITY"]),
+        ):
+            driver_hours += event.time_end - event.time_start
+        annual_driver_hours = (
+            get_simulation_period(session, scenario)[1]
+            * driver_hours.total_seconds()
+            / 3600
+        )
+
+        assert driver_hours > datetime.timedelta(seconds=0)
+        assert calculate_total_driver_hours(session, scenario) == paid_driver_hours(
+            annual_driver_hours
+        )
+        assert calculate_total_driver_hours(
+            session, scenario, annual_hours_per_driver=1000, buffer=0.0
+        ) == (paid_driver_hours(annual_driver_hours, 1000, 0.0))
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_query_context(self, session, scenario_id, monkeypatch):
+        scenario = session.get(Scenario, scenario_id)
+        expected = {
+            "period": get_simulation_period(session, scenario),
+            "mileage": get_annual_fleet_mileage(session, scenario),
+            "driver_hours": calculate_total_driver_hours(session, scenario),
+            "energy": calc_energy_consumption_simulated(session, scenario),
+        }
+
+        calls = []
+        query_simulation_period = data_queries._query_simulation_period
+
+        def counting_query(*args, **kwargs):
+            calls.append(args)
+            return query_simulation_period(*args, **kwargs)
+
+        monkeypatch.setattr(data_queries, "_query_simulation_period", counting_query)
+
+        # All queries sharing a context give the same results as without it, querying the period only once
+        context = QueryContext(session, scenario)
+        assert (
+            get_simulation_period(session, scenario, context=context)
+            == expected["period"]
+        )
+        assert (
+            get_annual_fleet_mileage(session, scenario, context=context)
+            == expected["mileage"]
+        )
+        assert (
+            calculate_total_driver_hours(session, scenario, context=context)
+            == expected["driver_hours"]
+        )
+        assert (
+            calc_energy_consumption_simulated(session, scenario, context=context)
+            == expected["energy"]
+        )
+        get_mileage_per_vehicle_type(session, scenario, context=context)
+        assert len(calls) == 1
+
+        # A known period is not queried at all
+        context = QueryContext(session, scenario, simulation_period=expected["period"])
+        assert (
+            get_annual_fleet_mileage(session, scenario, context=context)
+            == expected["mileage"]
+        )
+        assert len(calls) == 1
+
+        ScenarioFacts.from_session(session, scenario)
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_electricity_tariff(self, session, scenario_id):
+        scenario = session.get(Scenario, scenario_id)
+        reference = TCOCalculator(scenario)
+        reference.calculate()
+        reference_by_type = calculate_tco(scenario)
+
+        profile = get_charging_energy_profile(session, scenario)
+        assert sum(profile["energy"]) == pytest.approx(
+            reference.facts.energy_consumption_simulated, rel=1e-12
+        )
+        assert get_charging_energy_profile(session, scenario, chunk_size=5)[
+            "energy"
+        ] == pytest.approx(profile["energy"], rel=1e-9, abs=1e-6)
+
+        # A tariff with a single price gives the same TCO as the fuel cost. The change is not committed.
+        fuel_cost = scenario.tco_parameters["fuel_cost"]
+        scenario.tco_parameters = {
+            **scenario.tco_parameters,
+            "electricity_tariff": {"base_price": fuel_cost},
+        }
+        tco_calculator = TCOCalculator.from_facts(
+            ScenarioFacts.from_session(session, scenario)
+        )
+        tco_calculator.calculate()
+        assert tco_calculator.facts.charging_energy_profile == profile
+        assert tco_calculator.tco_unit_distance == pytest.approx(
+            reference.tco_unit_distance, rel=1e-12
+        )
+
+        # A cheaper night tariff lowers the energy cost
+        cheaper = tco_calculator.with_parameters(
+            electricity_tariff={
+                "base_price": fuel_cost,
+                "periods": [{"price": fuel_cost / 2, "start_hour": 22, "end_hour": 6}],
+            }
+        )
+        cheaper.calculate()
+        assert cheaper.tco_by_type["ENERGY"] < reference.tco_by_type["ENERGY"]
+
+        # The profile is taken from the charging events, so the tariff also applies with a constant consumption
+        constant_facts = ScenarioFacts.from_session(
+            session, scenario, energy_consumption_mode="constant"
+        )
+        assert constant_facts.charging_energy_profile == profile
+        result = calculate_tco(scenario)
+        assert result == pytest.approx(reference_by_type, rel=1e-12)
+        assert result["VEHICLE"] != 1.0
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_allocation(self, session, scenario_id):
+        from eflips.tco.analysis.allocation import (
+            allocate_to_lines,
+            allocate_to_rotations,
+        )
+
+        tco_calculator = TCOCalculator(session.get(Scenario, scenario_id))
+        tco_calculator.calculate()
+
+        rotations = allocate_to_rotations(
+            tco_calculator, session, keys={"Depot": "rotations"}
+        )
+        assert rotations.cost.sum() == pytest.approx(
+            tco_calculator.tco_over_project_duration, rel=1e-12
+        )
+        assert rotations.annual_mileage.sum() == pytest.approx(
+            tco_calculator.annual_fleet_mileage, rel=1e-12
+        )
+        assert np.all(np.diff(rotations.ids) > 0)
+
+        lines = allocate_to_lines(tco_calculator, session)
+        assert lines.cost.sum() == pytest.approx(
+            tco_calculator.tco_over_project_duration, rel=1e-12
+        )
+
+        with pytest.raises(ValueError):
+            allocate_to_rotations(tco_calculator, session, keys={"STAFF": "unknown"})
+
+    @pytest.mark.parametrize("scenario_id", [1, 2])
+    def test_charging_slots_match_power_and_occupancy(self, session, scenario_id):
+        scenario = session.get(Scenario, scenario_id)
+        area_ids = [
+            area.id
+            for area in session.query(Area).filter(Area.scenario_id == scenario_id)
+        ]
+        station_ids = [
+            station.id
+            for station in session.query(Station).filter(
+                Station.scenario_id == scenario_id
+            )
+        ]
+
+        area_peak, station_peak = peak_charging_occupancy(
+            session, scenario, area_ids, station_ids
+        )
+        for area_id in area_ids:
+            assert (
+                area_peak[area_id]
+                == power_and_occupancy(area_id, session)["occupancy_charging"].max()
+            )
+        for station_id in station_ids:
+            expected = power_and_occupancy(None, session, station_id=station_id)[
+                "occupancy_charging"
+            ].max()
+            assert station_peak[station_id] == expected
+
+        assert peak_charging_occupancy(
+            session, scenario, area_ids, station_ids, chunk_size=5
+        ) == (
+            area_peak,
+            station_peak,
+        )
+        assert load_capex_items_infrastructure(
+            session, scenario
+        ) == load_capex_items_infrastructure(
+            session, scenario, occupancy_method="power_and_occupancy"
+        )
+
+    def test_calculate_tco(self, database_url, tmp_path):
+        result = calculate_tco(2, database_url)
+        assert set(result) == {
+            "VEHICLE",
+            "BATTERY",
+            "INFRASTRUCTURE",
+            "STAFF",
+            "ENERGY",
+            "MAINTENANCE",
+            "OTHER",
+        }
+        assert all(value > 0 for value in result.values())
+        assert result["VEHICLE"] != 1.0
+
+        cache = FactsCache(tmp_path)
+        assert calculate_tco(2, database_url, cache=cache) == result
+        assert len(list(tmp_path.iterdir())) == 1
+        assert calculate_tco(2, database_url, cache=cache) == result
+
+    def test_sensitivity_analysis(self, session):
+        from eflips.tco.analysis.analysis import sensitivity_analysis
+
+        tco_calculator = TCOCalculator(session.get(Scenario, 1))
+        tco_calculator.calculate()
+        result = sensitivity_analysis(
+            tco_calculator, ["fuel_cost"], variation=np.array([-10.0, 0.0, 10.0])
+        )
+        assert result["tco_unit_distance"][1] == pytest.approx(
+            tco_calculator.tco_unit_distance
+        )
+        assert result["tco_change"][0] < 0 < result["tco_change"][2]
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from eflips.tco.tariffs import TariffPeriod, TariffSchedule, bin_energy
+
+
+class TestBinEnergy:
+    def test_matches_overlap_calculation(self):
+        rng = np.random.default_rng(1)
+        time_start = rng.uniform(0, 20 * 3600, 200)
+        time_end = time_start + rng.uniform(0, 5 * 3600, 200)
+        time_end[:10] = time_start[:10]
+        energy = rng.uniform(0, 300, 200)
+
+        origin = 1704067200.0
+        profile = bin_energy(
+            time_start + origin, time_end + origin, energy, origin, 3600, 25
+        )
+
+        edges = 3600 * np.arange(26)
+        expected = np.zeros(25)
+        for start, end, event_energy in zip(time_start, time_end, energy):
+            if end == start:
+                expected[int(start // 3600)] += event_energy
+                continue
+            overlap = np.clip(
+                np.minimum(edges[1:], end) - np.maximum(edges[:-1], start), 0, None
+            )
+            expected += event_energy * overlap / (end - start)
+
+        assert profile == pytest.approx(expected, rel=1e-9)
+        assert profile.sum() == pytest.approx(energy.sum(), rel=1e-12)
+
+    def test_no_events(self):
+        assert np.all(
+            bin_energy(np.array([]), np.array([]), np.array([]), 0.0, 3600, 3) == 0.0
+        )
+
+
+class TestTariffSchedule:
+    def test_price_table(self):
+        schedule = TariffSchedule(
+            base_price=0.25,
+            periods=[
+                TariffPeriod(price=0.15, start_hour=22, end_hour=6),
+                TariffPeriod(
+                    price=0.35, start_hour=5, end_hour=8, weekdays=range(5), months=[1]
+                ),
+            ],
+        )
+        table = schedule.price_table()
+
+        assert table.shape == (12, 7, 24)
+        assert list(table[6, 6]) == [0.15] * 6 + [0.25] * 16 + [0.15] * 2
+        # The later period takes precedence
+        assert list(table[0, 0, 4:9]) == [0.15, 0.35, 0.35, 0.35, 0.25]
+        assert list(table[0, 5, 4:9]) == [0.15, 0.15, 0.25, 0.25, 0.25]
+
+    def test_prices_in_local_time(self):
+        schedule = TariffSchedule(
+            base_price=0.25,
+            periods=[TariffPeriod(price=0.15, start_hour=22, end_hour=6)],
+            timezone="Europe/Berlin",
+        )
+        # 2024-01-01 21:30 and 22:30 UTC are 22:30 and 23:30 in Berlin, 2024-07-01 20:30 UTC is 22:30 in Berlin
+        assert list(
+            schedule.prices(np.array([1704144600, 1704148200, 1719865800]))
+        ) == [0.15, 0.15, 0.15]
+        assert list(schedule.prices(np.array([1704141000, 1719862200]))) == [0.25, 0.25]
+
+    def test_average_price(self):
+        schedule = TariffSchedule(
+            base_price=0.3, periods=[TariffPeriod(price=0.1, start_hour=0, end_hour=6)]
+        )
+        # 2024-01-01 00:00 UTC, one bin at night and one during the day
+        profile = {
+            "origin": 1704067200.0,
+            "resolution": 3600,
+            "energy": [100.0] + [0.0] * 9 + [300.0],
+        }
+        assert schedule.energy_cost(profile) == pytest.approx(100.0)
+        assert schedule.average_price(profile) == pytest.approx(0.25)
+        assert schedule.average_price({**profile, "energy": [0.0] * 11}) == 0.3
+
+    def test_round_trip(self):
+        schedule = TariffSchedule(
+            base_price=0.25,
+            periods=[
+                TariffPeriod(
+                    price=0.35,
+                    start_hour=17,
+                    end_hour=20,
+                    weekdays=range(5),
+                    months=[11, 12],
+                )
+            ],
+            timezone="Europe/Berlin",
+        )
+        assert (
+            TariffSchedule.from_dict(schedule.to_dict()).to_dict() == schedule.to_dict()
+        )
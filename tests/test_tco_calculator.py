@@ -0,0 +1,627 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from eflips.tco.cost_items import CapexItem, CapexItemType
+from eflips.tco.profiling import Profiler
+from eflips.tco.scenario_facts import ScenarioFacts
+from eflips.tco.tco_calculator import TCOCalculator
+
+
+@pytest.fixture
+def facts() -> ScenarioFacts:
+    return ScenarioFacts(
+        scenario_id=1,
+        tco_parameters={
+            "project_duration": 20,
+            "interest_rate": 0.04,
+            "inflation_rate": 0.02,
+            "staff_cost": 25.0,
+            "fuel_cost": 0.1794,
+            "maint_cost": 0.35,
+            "maint_infr_cost": 1000,
+            "taxes": 278,
+            "insurance": 9693,
+            "pef_general": 0.02,
+            "pef_wages": 0.025,
+            "pef_fuel": 0.038,
+            "pef_insurance": 0.02,
+            "const_energy_consumption": {"1": 1.48, "2": 2.16},
+        },
+        annual_fleet_mileage=1.2e6,
+        mileage_per_vehicle_type={"1": 0.8e6, "2": 0.4e6},
+        total_driver_hours=160000.0,
+        capex_items=[
+            CapexItem(
+                "Ebusco 3.0 12",
+                CapexItemType.VEHICLE,
+                14,
+                340000.0,
+                0.02,
+                12,
+                vehicle_type_id=1,
+            ),
+            CapexItem(
+                "Solaris Urbino 18",
+                CapexItemType.VEHICLE,
+                14,
+                580000.0,
+                0.02,
+                6,
+                vehicle_type_id=2,
+            ),
+            CapexItem(
+                "Battery type 1",
+                CapexItemType.BATTERY,
+                7,
+                190.0,
+                -0.03,
+                12 * 500.0,
+                vehicle_type_id=1,
+            ),
+            CapexItem(
+                "Battery type 2",
+                CapexItemType.BATTERY,
+                7,
+                190.0,
+                -0.03,
+                6 * 640.0,
+                vehicle_type_id=2,
+            ),
+            CapexItem(
+                "Depot Charging Point",
+                CapexItemType.CHARGING_POINT,
+                20,
+                100000.0,
+                0.02,
+                15,
+            ),
+            CapexItem("Depot", CapexItemType.INFRASTRUCTURE, 20, 3400000.0, 0.02, 1),
+        ],
+        energy_consumption_simulated=1.9e6,
+        vehicle_type_statistics={
+            "1": {
+                "mileage": 0.8e6,
+                "driver_hours": 90000.0,
+                "energy_consumption": 1.1e6,
+            },
+            "2": {
+                "mileage": 0.4e6,
+                "driver_hours": 50000.0,
+                "energy_consumption": 0.8e6,
+            },
+        },
+    )
+
+
+class TestTCOCalculator:
+    def test_facts_round_trip(self, facts):
+        facts_dict = json.loads(json.dumps(facts.to_dict()))
+        assert ScenarioFacts.from_dict(facts_dict) == facts
+
+    def test_calculate_from_facts(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+
+        assert tco_calculator.tco_unit_distance == pytest.approx(
+            sum(tco_calculator.tco_by_type.values())
+        )
+        assert tco_calculator.tco_by_type["VEHICLE"] == pytest.approx(
+            sum(
+                item.calculate_total_procurement_cost(20, 0.04, 0.02) * item.quantity
+                for item in facts.capex_items
+                if item.type == CapexItemType.VEHICLE
+            )
+            / (1.2e6 * 20)
+        )
+
+    def test_result(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+        result = tco_calculator.result
+
+        assert len(result.item_names) == len(tco_calculator.capex_items) + len(
+            tco_calculator.opex_items
+        )
+        assert result.cost.sum() == pytest.approx(
+            tco_calculator.tco_over_project_duration
+        )
+        assert result.tco_by_type() == tco_calculator.tco_by_type
+
+        table = result.to_pandas()
+        assert list(table.columns) == ["Item", "Cost", "Specific Cost", "type"]
+        assert table.groupby("type", observed=True)[
+            "Specific Cost"
+        ].sum().to_dict() == pytest.approx(tco_calculator.tco_by_type)
+        assert (
+            list(tco_calculator.tco_by_item["Item"])
+            == tco_calculator.capex_items + tco_calculator.opex_items
+        )
+
+    def test_cash_flows(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+        cash_flows = tco_calculator.cash_flows()
+
+        assert cash_flows.nominal.shape == (
+            len(cash_flows.item_names),
+            len(cash_flows.years),
+        )
+        assert cash_flows.discounted.sum(axis=-1) == pytest.approx(
+            tco_calculator.result.cost, rel=1e-12
+        )
+        assert cash_flows.cumulative(discounted=True)[-1] == pytest.approx(
+            tco_calculator.tco_over_project_duration
+        )
+
+        parameter_table = {
+            "interest_rate": [0.03, np.nan],
+            "project_duration": [25, np.nan],
+        }
+        cash_flows = tco_calculator.cash_flows(parameter_table)
+        result = tco_calculator.calculate_many(parameter_table)
+        assert cash_flows.annual(discounted=True).sum(axis=-1) == pytest.approx(
+            result.tco_over_project_duration, rel=1e-12
+        )
+
+    def test_update_parameters(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+        tco_calculator.update_parameters(
+            {"fuel_cost": 0.3, "Battery type 1.procurement_cost": 150.0}
+        )
+
+        expected = TCOCalculator.from_facts(facts)
+        expected.calculate()
+        result = expected.calculate_many(
+            {"fuel_cost": [0.3], "Battery type 1.procurement_cost": [150.0]}
+        )
+        assert tco_calculator.tco_unit_distance == pytest.approx(
+            result.tco_unit_distance[0], rel=1e-12
+        )
+        for item_type, value in result.tco_by_type.items():
+            assert tco_calculator.tco_by_type[item_type] == pytest.approx(
+                value[0], rel=1e-12
+            )
+
+        # A scenario parameter affects all items
+        tco_calculator.update_parameters({"interest_rate": 0.05})
+        result = expected.calculate_many(
+            {
+                "fuel_cost": [0.3],
+                "Battery type 1.procurement_cost": [150.0],
+                "interest_rate": [0.05],
+            }
+        )
+        assert tco_calculator.tco_unit_distance == pytest.approx(
+            result.tco_unit_distance[0], rel=1e-12
+        )
+
+        with pytest.raises(ValueError):
+            tco_calculator.update_parameters({"unknown": 1.0})
+
+    def test_with_parameters(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+
+        variant = tco_calculator.with_parameters(
+            fuel_cost=0.3, **{"Depot Charging Point.useful_life": 15}
+        )
+        variant.calculate()
+        result = tco_calculator.calculate_many(
+            {"fuel_cost": [0.3], "Depot Charging Point.useful_life": [15]}
+        )
+        assert variant.tco_unit_distance == pytest.approx(
+            result.tco_unit_distance[0], rel=1e-12
+        )
+        assert variant.facts.tco_parameters["fuel_cost"] == 0.3
+
+        # The original calculator and its facts are unchanged
+        assert facts.tco_parameters["fuel_cost"] != 0.3
+        assert tco_calculator.capex_items == facts.capex_items
+
+        with pytest.raises(ValueError):
+            tco_calculator.with_parameters(unknown=1.0)
+
+    def test_with_parameters_electricity_tariff(self, facts):
+        tariff_facts = copy.deepcopy(facts)
+        tariff_facts.tco_parameters["electricity_tariff"] = {"base_price": 0.2}
+        tariff_facts.charging_energy_profile = {
+            "origin": 1704067200.0,
+            "resolution": 3600,
+            "energy": [1.0e6, 0.9e6],
+        }
+        tco_calculator = TCOCalculator.from_facts(tariff_facts)
+        tco_calculator.calculate()
+
+        # The fuel cost replaces the price of the tariff in all three APIs
+        variant = tco_calculator.with_parameters(fuel_cost=0.5)
+        variant.calculate()
+        result = tco_calculator.calculate_many({"fuel_cost": [0.5]})
+        assert variant.tco_unit_distance == pytest.approx(
+            result.tco_unit_distance[0], rel=1e-12
+        )
+        assert variant.tco_unit_distance > tco_calculator.tco_unit_distance
+
+        tco_calculator.update_parameters({"fuel_cost": 0.5})
+        assert tco_calculator.tco_unit_distance == pytest.approx(
+            variant.tco_unit_distance, rel=1e-12
+        )
+
+        # Other overrides keep the price of the tariff
+        variant = TCOCalculator.from_facts(tariff_facts).with_parameters(
+            staff_cost=25.0
+        )
+        variant.calculate()
+        fuel_cost = next(
+            item for item in variant.opex_items if item.name == "Fuel Cost"
+        )
+        assert fuel_cost.unit_cost == pytest.approx(0.2)
+
+    def test_tco_by_vehicle_type(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        by_vehicle_type = tco_calculator.tco_by_vehicle_type()
+
+        assert by_vehicle_type.vehicle_type_ids == ["1", "2"]
+        assert by_vehicle_type.cost.sum() == pytest.approx(
+            tco_calculator.tco_over_project_duration
+        )
+        assert by_vehicle_type.tco_unit_distance == pytest.approx(
+            by_vehicle_type.cost / (by_vehicle_type.annual_mileage * 20)
+        )
+        # The vehicles are assigned to their vehicle type and the staff cost is split by the driving hours
+        vehicle_cost = tco_calculator.result.cost[:2]
+        assert by_vehicle_type.tco_by_type["VEHICLE"] == pytest.approx(
+            vehicle_cost / (np.array([0.8e6, 0.4e6]) * 20)
+        )
+        staff_cost = tco_calculator.result.cost[len(tco_calculator.capex_items)]
+        assert by_vehicle_type.tco_by_type["STAFF"][1] * 0.4e6 * 20 == pytest.approx(
+            staff_cost * 5 / 14
+        )
+
+    def test_constant_energy_consumption(self, facts):
+        tco_calculator = TCOCalculator.from_facts(
+            facts, energy_consumption_mode="constant"
+        )
+        fuel_cost = next(
+            item for item in tco_calculator.opex_items if item.name == "Fuel Cost"
+        )
+        assert fuel_cost.usage_amount == pytest.approx(1.48 * 0.8e6 + 2.16 * 0.4e6)
+
+    def test_calculate_many_matches_calculate(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        parameter_table = [
+            {},
+            {"fuel_cost": 0.25, "pef_general": 0.03},
+            {"interest_rate": 0.05, "Battery type 1.procurement_cost": 120.0},
+            {"project_duration": 12, "Depot Charging Point.useful_life": 10},
+        ]
+        result = tco_calculator.calculate_many(parameter_table)
+
+        for row, overrides in enumerate(parameter_table):
+            expected_facts = copy.deepcopy(facts)
+            for key, value in overrides.items():
+                if "." in key:
+                    name, attribute = key.rsplit(".", 1)
+                    for item in expected_facts.capex_items:
+                        if item.name == name:
+                            setattr(item, attribute, value)
+                else:
+                    expected_facts.tco_parameters[key] = value
+            expected = TCOCalculator.from_facts(expected_facts)
+            expected.calculate()
+
+            assert result.tco_unit_distance[row] == pytest.approx(
+                expected.tco_unit_distance, rel=1e-12
+            )
+            for item_type, value in expected.tco_by_type.items():
+                assert result.tco_by_type[item_type][row] == pytest.approx(
+                    value, rel=1e-12
+                )
+
+    def test_calculate_many_unknown_parameter(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        with pytest.raises(ValueError):
+            tco_calculator.calculate_many({"fuel_price": [0.2]})
+
+    def test_calculate_many_columns(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        result = tco_calculator.calculate_many(
+            {"fuel_cost": np.linspace(0.1, 0.3, 5), "interest_rate": 0.04}
+        )
+        assert result.tco_unit_distance.shape == (5,)
+        assert np.all(np.diff(result.tco_unit_distance) > 0)
+
+    def test_calculate_many_missing_values(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+
+        # NaN entries and parameters missing from a row keep the value of the calculator
+        from_columns = tco_calculator.calculate_many(
+            {"fuel_cost": [np.nan, 0.25], "Depot.procurement_cost": [np.nan, np.nan]}
+        )
+        from_rows = tco_calculator.calculate_many(
+            [{"pef_fuel": np.nan}, {"fuel_cost": 0.25}]
+        )
+        assert from_columns.tco_unit_distance[0] == pytest.approx(
+            tco_calculator.tco_unit_distance, rel=1e-12
+        )
+        assert from_rows.tco_unit_distance == pytest.approx(
+            from_columns.tco_unit_distance, rel=1e-12
+        )
+
+        with pytest.raises(ValueError):
+            tco_calculator.calculate_many(
+                {"fuel_cost": [0.1, 0.2], "staff_cost": [20.0, 30.0, 40.0]}
+            )
+        with pytest.raises(ValueError):
+            tco_calculator.calculate_many({})
+
+    def test_calculate_many_opex_parameters(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+
+        # The fuel cost only changes the energy cost, the general price escalation all items based on it
+        result = tco_calculator.calculate_many(
+            {"fuel_cost": [0.3], "pef_general": [np.nan]}
+        )
+        for item_type, value in tco_calculator.tco_by_type.items():
+            if item_type != "ENERGY":
+                assert result.tco_by_type[item_type][0] == pytest.approx(
+                    value, rel=1e-12
+                )
+        assert result.tco_by_type["ENERGY"][0] == pytest.approx(
+            tco_calculator.tco_by_type["ENERGY"] * 0.3 / 0.1794, rel=1e-12
+        )
+
+        result = tco_calculator.calculate_many({"pef_general": [0.03]})
+        assert (
+            result.tco_by_type["MAINTENANCE"][0]
+            > tco_calculator.tco_by_type["MAINTENANCE"]
+        )
+        assert result.tco_by_type["STAFF"][0] == pytest.approx(
+            tco_calculator.tco_by_type["STAFF"], rel=1e-12
+        )
+
+    def test_calculate_many_battery_cost_per_kwh(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        tco_calculator.calculate()
+
+        # The procurement cost of a battery is its cost per kWh, applied to the installed capacity
+        result = tco_calculator.calculate_many(
+            {"Battery type 1.procurement_cost": [95.0]}
+        )
+        battery = next(
+            item for item in facts.capex_items if item.name == "Battery type 1"
+        )
+        halved = (
+            battery.calculate_total_procurement_cost(20, 0.04, 0.02)
+            * battery.quantity
+            / 2
+        )
+        assert (
+            tco_calculator.tco_over_project_duration
+            - result.tco_over_project_duration[0]
+            == pytest.approx(halved, rel=1e-12)
+        )
+
+    def test_profiler(self, facts):
+        records = []
+        profiler = Profiler(trace_memory=True, callback=records.append)
+        tco_calculator = TCOCalculator(facts, profiler=profiler)
+        with profiler.phase("study"):
+            tco_calculator.calculate()
+            tco_calculator.calculate_many({"fuel_cost": np.linspace(0.1, 0.3, 1000)})
+
+        assert [(record["name"], record["depth"]) for record in profiler.report()] == [
+            ("create_opex_items", 0),
+            ("study", 0),
+            ("calculate", 1),
+            ("calculate_many", 1),
+        ]
+        assert records == profiler.records
+        study = profiler.records[-1]
+        assert study.peak_memory >= max(
+            record.peak_memory for record in profiler.records[:-1]
+        )
+
+
+class TestBreakEven:
+    def test_goal_seek(self, facts):
+        from eflips.tco.analysis.break_even import goal_seek
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        result = goal_seek(
+            tco_calculator, "Battery type 1.procurement_cost", 5.5, (0.0, 2000.0)
+        )
+        assert result.tco_unit_distance == pytest.approx(5.5, rel=1e-9)
+
+        with pytest.raises(ValueError):
+            goal_seek(
+                tco_calculator, "Battery type 1.procurement_cost", 100.0, (0.0, 2000.0)
+            )
+
+    def test_break_even(self, facts):
+        from eflips.tco.analysis.break_even import break_even
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        other = tco_calculator.with_parameters(fuel_cost=0.3)
+        other.calculate()
+
+        # The staff cost at which the first configuration is as expensive as the second one with the higher fuel cost
+        result = break_even(tco_calculator, other, "staff_cost", (0.0, 200.0))
+        assert result.tco_unit_distance == pytest.approx(
+            other.tco_unit_distance, rel=1e-9
+        )
+
+        # Varying the staff cost in both configurations does not change the difference of their TCO
+        with pytest.raises(ValueError):
+            break_even(
+                tco_calculator, other, "staff_cost", (0.0, 200.0), vary_other=True
+            )
+
+
+class TestSensitivityAnalysis:
+    def test_parameter_values(self, facts):
+        tco_calculator = TCOCalculator.from_facts(facts)
+        values = tco_calculator.parameter_values()
+
+        assert values["fuel_cost"] == facts.tco_parameters["fuel_cost"]
+        assert values["pef_general"] == facts.tco_parameters["pef_general"]
+        assert values["project_duration"] == 20
+        assert values["Depot Charging Point.useful_life"] == 20
+        assert values["Battery type 2.procurement_cost"] == 190.0
+
+    def test_matches_update_parameters(self, facts):
+        from eflips.tco.analysis.analysis import sensitivity_analysis
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        variation = [-20.0, 0.0, 15.0]
+        result = sensitivity_analysis(tco_calculator, variation=variation)
+
+        base_values = tco_calculator.parameter_values()
+        assert len(result) == len(base_values) * len(variation)
+
+        base = TCOCalculator.from_facts(facts)
+        base.calculate()
+        for row in result:
+            expected = TCOCalculator.from_facts(facts)
+            expected.calculate()
+            value = base_values[row["parameter"]] * (1 + row["parameter_change"] / 100)
+            expected.update_parameters({str(row["parameter"]): value})
+
+            assert row["tco_unit_distance"] == pytest.approx(
+                expected.tco_unit_distance, rel=1e-12
+            )
+            assert row["tco_change"] == pytest.approx(
+                (expected.tco_unit_distance / base.tco_unit_distance - 1) * 100,
+                rel=1e-9,
+                abs=1e-9,
+            )
+
+    def test_parameter_list(self, facts, tmp_path, monkeypatch):
+        import matplotlib
+
+        matplotlib.use("Agg")
+        from eflips.tco.analysis.analysis import (
+            plot_sensitivity_analysis,
+            sensitivity_analysis,
+        )
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        result = sensitivity_analysis(
+            tco_calculator, ["fuel_cost", "Depot.procurement_cost"], [-10.0, 10.0]
+        )
+        assert (
+            list(result["parameter"])
+            == ["fuel_cost"] * 2 + ["Depot.procurement_cost"] * 2
+        )
+        assert result["tco_change"][0] < 0 < result["tco_change"][1]
+
+        with pytest.raises(ValueError):
+            sensitivity_analysis(tco_calculator, ["fuel_price"])
+
+        monkeypatch.chdir(tmp_path)
+        plot_sensitivity_analysis(result, scenario_id=1, save_fig=True)
+        assert (tmp_path / "sensitivity_analysis_scn_1.png").exists()
+
+
+class TestMonteCarlo:
+    @pytest.fixture
+    def distributions(self):
+        from eflips.tco.analysis.monte_carlo import Normal, Triangular, Uniform
+
+        return {
+            "Battery type 1.procurement_cost": Triangular(150.0, 190.0, 260.0),
+            "pef_fuel": Normal(0.038, 0.01),
+            "staff_cost": Uniform(20.0, 30.0),
+        }
+
+    def test_seed(self, facts, distributions):
+        from eflips.tco.analysis.monte_carlo import monte_carlo
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        first = monte_carlo(tco_calculator, distributions, 1000, seed=42)
+        second = monte_carlo(tco_calculator, distributions, 1000, seed=42)
+        other = monte_carlo(tco_calculator, distributions, 1000, seed=43)
+
+        np.testing.assert_array_equal(first.tco_unit_distance, second.tco_unit_distance)
+        assert not np.array_equal(first.tco_unit_distance, other.tco_unit_distance)
+
+        # The samples of a parameter do not depend on the other distributions
+        single = monte_carlo(
+            tco_calculator, {"pef_fuel": distributions["pef_fuel"]}, 1000, seed=42
+        )
+        np.testing.assert_array_equal(
+            single.samples["pef_fuel"], first.samples["pef_fuel"]
+        )
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 333, 5000])
+    def test_chunk_size(self, facts, distributions, chunk_size):
+        from eflips.tco.analysis.monte_carlo import monte_carlo
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        expected = monte_carlo(tco_calculator, distributions, 1000, seed=1)
+        result = monte_carlo(
+            tco_calculator, distributions, 1000, seed=1, chunk_size=chunk_size
+        )
+
+        assert len(result.tco_unit_distance) == 1000
+        for parameter, values in expected.samples.items():
+            np.testing.assert_array_equal(result.samples[parameter], values)
+        assert result.tco_unit_distance == pytest.approx(
+            expected.tco_unit_distance, rel=1e-12
+        )
+        for item_type, values in expected.tco_by_type.items():
+            assert result.tco_by_type[item_type] == pytest.approx(values, rel=1e-12)
+
+    def test_distributions(self):
+        from eflips.tco.analysis.monte_carlo import (
+            Normal,
+            Triangular,
+            Uniform,
+            parameter_rng,
+        )
+
+        size = 200_000
+        normal = Normal(5.0, 2.0).sample(parameter_rng(0, "normal"), size)
+        assert normal.mean() == pytest.approx(5.0, abs=0.02)
+        assert normal.std() == pytest.approx(2.0, rel=0.01)
+
+        uniform = Uniform(-1.0, 3.0).sample(parameter_rng(0, "uniform"), size)
+        assert uniform.mean() == pytest.approx(1.0, abs=0.02)
+        assert uniform.min() >= -1.0 and uniform.max() < 3.0
+
+        triangular = Triangular(1.0, 2.0, 6.0).sample(
+            parameter_rng(0, "triangular"), size
+        )
+        assert triangular.mean() == pytest.approx(3.0, abs=0.02)
+        assert triangular.min() >= 1.0 and triangular.max() <= 6.0
+
+    def test_percentiles(self, facts, distributions):
+        from eflips.tco.analysis.monte_carlo import monte_carlo
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        result = monte_carlo(tco_calculator, distributions, 2000, seed=3)
+
+        percentiles = result.percentiles()
+        np.testing.assert_array_equal(
+            percentiles["tco_unit_distance"],
+            np.percentile(result.tco_unit_distance, [10, 50, 90]),
+        )
+        for item_type, values in result.tco_by_type.items():
+            np.testing.assert_array_equal(
+                result.percentiles([5, 95])[item_type], np.percentile(values, [5, 95])
+            )
+        assert set(percentiles) == {"tco_unit_distance"} | set(result.tco_by_type)
+
+    def test_unknown_parameter(self, facts):
+        from eflips.tco.analysis.monte_carlo import Normal, monte_carlo
+
+        tco_calculator = TCOCalculator.from_facts(facts)
+        with pytest.raises(ValueError):
+            monte_carlo(tco_calculator, {"fuel_price": Normal(0.2, 0.01)}, 10)
+        with pytest.raises(ValueError):
+            monte_carlo(tco_calculator, {}, 10)